@@ -1,5 +1,17 @@
-from .llm_client import get_llm
-from .chat_agent import DocumentChatAgent
+from importlib import import_module
+
+# Exports are resolved on first access so `import src.agent.registry` (done at
+# app start-up) does not pull in smolagents / llama_index.
+_LAZY_EXPORTS = {
+    "get_llm": ".llm_client",
+    "DocumentChatAgent": ".chat_agent",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 __all__ = ["get_llm","DocumentChatAgent"]
@@ -1,28 +1,26 @@
-import os
-import yaml
-from pathlib import Path
 from typing import Any, Dict, Optional
 
-from smolagents import CodeAgent, InferenceClientModel
-from dotenv import load_dotenv
+from smolagents import CodeAgent
 from llama_index.core import VectorStoreIndex
 
-from src.tools.chat_tools import create_structured_fields_tool, create_rag_search_tool
+from src.agent.inference import resilient_model
+from src.agent.registry import get_chat_model
+from src.observability.tracing import (
+    TracedModel,
+    Tracer,
+    step_callback,
+    trace_tools,
+    traced_run,
+)
+from src.tools.chat_tools import (
+    create_rag_search_tool,
+    create_record_lookup_tool,
+    create_record_search_tool,
+    create_structured_fields_tool,
+)
+from src.tools.db_tools import DB_PATH
 from src.config.prompts import CHAT_AGENT_SYSTEM_INSTRUCTIONS
 
-PROJECT_ROOT = Path(__file__).resolve().parent.parent
-load_dotenv(PROJECT_ROOT / ".env")
-
-HF_TOKEN = os.getenv("HF_TOKEN")
-
-# Load configuration
-CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
-with open(CONFIG_PATH) as f:
-    _config = yaml.safe_load(f)
-
-CHAT_MODEL_ID = _config["chat_agent"]["model_id"]
-CHAT_TEMPERATURE = _config["chat_agent"]["temperature"]
-
 
 class DocumentChatAgent:
     """
@@ -31,6 +29,8 @@ class DocumentChatAgent:
     Uses smolagents CodeAgent with tools to:
     - retrieve structured fields from parsed invoice/ticket
     - perform semantic search (RAG) over the document text
+    - keyword-search every stored invoice, ticket and document (FTS5)
+    - look up invoices / suppliers whose ID or name is written differently
     - maintain conversation history
     - answer natural-language questions autonomously
     """
@@ -59,20 +59,31 @@ class DocumentChatAgent:
             raw_text=self.raw_text,
         )
 
-        # Initialize the LLM model
-        self.model = InferenceClientModel(
-            model_id=CHAT_MODEL_ID,
-            token=HF_TOKEN,
-            temperature=CHAT_TEMPERATURE,
-        )
+        record_search_tool = create_record_search_tool(DB_PATH)
+        record_lookup_tool = create_record_lookup_tool(DB_PATH)
+
+        # Tracer of the chat turn in progress
+        self._tracer: Optional[Tracer] = None
+
+        # The LLM model is shared by every chat agent of the process
+        self.model = TracedModel(resilient_model(get_chat_model()), lambda: self._tracer)
 
         # Create the CodeAgent with the tools
         self.agent = CodeAgent(
-            tools=[structured_fields_tool, rag_search_tool],
+            tools=trace_tools(
+                [
+                    structured_fields_tool,
+                    rag_search_tool,
+                    record_search_tool,
+                    record_lookup_tool,
+                ],
+                lambda: self._tracer,
+            ),
             model=self.model,
             instructions=CHAT_AGENT_SYSTEM_INSTRUCTIONS,
             add_base_tools=True,
             max_steps=5,
+            step_callbacks=[step_callback(lambda: self._tracer)],
         )
 
     def chat(
@@ -110,7 +121,12 @@ class DocumentChatAgent:
         )
 
         # Run the agent
-        raw_result = self.agent.run(task)
+        with traced_run("chat", DB_PATH, question_chars=len(question)) as tracer:
+            self._tracer = tracer
+            try:
+                raw_result = self.agent.run(task)
+            finally:
+                self._tracer = None
         answer = str(raw_result) if raw_result else "I couldn't generate an answer."
 
         # Add to conversation history
@@ -0,0 +1,137 @@
+import copy
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import yaml
+
+from src.db.checkpoint_store import CheckpointStore
+from src.db.db_client import ticket_dedup_key
+from src.db.fuzzy_index import normalize_invoice_id
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+CHECKPOINTS_ENABLED = _config["checkpoints"]["enabled"]
+CHECKPOINT_TTL_SECONDS = _config["checkpoints"]["ttl_hours"] * 3600
+
+JSONDict = Dict[str, Any]
+
+# Workflow stage completed by each checkpointed tool. Reusing the LlamaParse
+# output of a PDF is the DocumentStore's job (see parse_document_tool).
+STAGES: Dict[str, str] = {
+    "parse_document_tool": "extraction",
+    "validate_invoice_math_tool": "math",
+    "reconcile_invoice_with_db_tool": "reconciliation",
+    "upsert_invoice_in_db_tool": "upsert",
+    "create_ticket_in_db_tool": "ticket",
+    "draft_email_tool": "email_draft",
+    "send_email_tool": "email",
+}
+
+
+def _hash(*parts: Any) -> str:
+    encoded = json.dumps(parts, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+# Side effects are keyed by what they act on rather than by their exact
+# arguments, so a retried run that rewords an email body or a ticket
+# description does not repeat them, while a second, different ticket or
+# email in the same run still goes through.
+SEMANTIC_KEYS: Dict[str, Callable[[JSONDict], str]] = {
+    "upsert_invoice_in_db_tool": lambda inputs: normalize_invoice_id(
+        (inputs.get("invoice") or {}).get("invoice_id")
+    ),
+    "create_ticket_in_db_tool": lambda inputs: ticket_dedup_key(
+        inputs.get("invoice_id") or "",
+        inputs.get("issue_type") or "",
+        inputs.get("recorded_amount"),
+        inputs.get("document_amount"),
+    )[:16],
+    "send_email_tool": lambda inputs: _hash(
+        (inputs.get("recipient") or "").strip().lower(),
+        " ".join((inputs.get("subject") or "").split()),
+    ),
+}
+
+
+def get_checkpoint_store(db_path: Path) -> Optional[CheckpointStore]:
+    """The checkpoint store, or None when checkpoints are disabled in config.yaml."""
+    if not CHECKPOINTS_ENABLED:
+        return None
+    return CheckpointStore(db_path, ttl_seconds=CHECKPOINT_TTL_SECONDS)
+
+
+def checkpoint_key(tool_name: str, inputs: JSONDict) -> str:
+    """
+    Tool name plus the SEMANTIC_KEYS key of a side effect (ticket dedup
+    key, email recipient + subject, invoice key), or a hash of the inputs.
+    """
+    semantic = SEMANTIC_KEYS.get(tool_name)
+    if semantic is not None:
+        return f"{tool_name}:{semantic(inputs)}"
+    return f"{tool_name}:{_hash(inputs)}"
+
+
+class RunCheckpoint:
+    """The checkpoints of one document, for the duration of one agent run."""
+
+    def __init__(self, store: CheckpointStore, content_hash: str) -> None:
+        self.store = store
+        self.content_hash = content_hash
+        self.replayed: List[str] = []
+
+    def completed_stages(self) -> List[str]:
+        return self.store.stages(self.content_hash)
+
+    def clear(self) -> None:
+        self.store.clear(self.content_hash)
+
+
+def checkpoint_tools(
+    tools: List[Any],
+    get_checkpoint: Callable[[], Optional[RunCheckpoint]],
+) -> List[Any]:
+    """
+    Return copies of `tools` that record each successful call of a stage in
+    the RunCheckpoint returned by `get_checkpoint()`, and answer a repeated
+    call from the recorded output without running the tool.
+
+    Like bind_tools_to_ledger, the shared tool objects are left untouched.
+    """
+    wrapped = []
+    for tool in tools:
+        if tool.name not in STAGES:
+            wrapped.append(tool)
+            continue
+
+        checkpointed = copy.copy(tool)
+        original_forward = tool.forward
+
+        def forward(*args, _tool=tool, _forward=original_forward, **kwargs):
+            checkpoint = get_checkpoint()
+            if checkpoint is None:
+                return _forward(*args, **kwargs)
+
+            inputs = dict(zip(_tool.inputs.keys(), args))
+            inputs.update(kwargs)
+            key = checkpoint_key(_tool.name, inputs)
+
+            found, output = checkpoint.store.get(checkpoint.content_hash, key)
+            if found:
+                checkpoint.replayed.append(_tool.name)
+                return output
+
+            output = _forward(*args, **kwargs)
+            checkpoint.store.save(checkpoint.content_hash, key, STAGES[_tool.name], output)
+            return output
+
+        checkpointed.forward = forward
+        wrapped.append(checkpointed)
+    return wrapped
@@ -0,0 +1,179 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.observability import tracing
+
+JSONDict = Dict[str, Any]
+
+# Stage outcomes
+OK = "ok"
+SKIPPED = "skipped"   # its `when` returned False, or an input stage failed
+ERROR = "error"
+
+
+@dataclass
+class Stage:
+    """
+    One node of a DagExecutor.
+
+    `fn` is called with one keyword argument per name in `inputs` (the
+    outputs of those stages, or run() arguments). If `when` is given it is
+    called with the same arguments first; False skips the stage, whose
+    output is then None.
+    """
+
+    name: str
+    fn: Callable[..., Any]
+    inputs: Tuple[str, ...] = ()
+    when: Optional[Callable[..., bool]] = None
+
+
+@dataclass
+class StageTiming:
+    status: str
+    start: float = 0.0     # seconds since the start of the run
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+@dataclass
+class DagRun:
+    """Outputs and per-stage timings of one DagExecutor.run()."""
+
+    outputs: JSONDict
+    timings: Dict[str, StageTiming]
+    inputs: Dict[str, Tuple[str, ...]]
+    wall_seconds: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    def critical_path(self) -> List[str]:
+        """
+        Stages on the longest dependency chain (by finishing time): the
+        ones whose latency the run's latency is made of.
+        """
+        finished = {
+            name: t.start + t.seconds for name, t in self.timings.items() if t.status != SKIPPED
+        }
+        if not finished:
+            return []
+        path = [max(finished, key=finished.get)]  # type: ignore[arg-type]
+        while True:
+            upstream = [i for i in self.inputs.get(path[-1], ()) if i in finished]
+            if not upstream:
+                break
+            path.append(max(upstream, key=finished.get))  # type: ignore[arg-type]
+        return list(reversed(path))
+
+    def timing_summary(self) -> List[JSONDict]:
+        """Per-stage timing rows, in start order (for the workflow summary)."""
+        rows = [
+            {
+                "stage": name,
+                "status": t.status,
+                "start_ms": round(t.start * 1000, 1),
+                "ms": round(t.seconds * 1000, 1),
+                "error": t.error,
+            }
+            for name, t in self.timings.items()
+        ]
+        return sorted(rows, key=lambda r: (r["status"] == SKIPPED, r["start_ms"]))
+
+
+class DagExecutor:
+    """
+    Runs stages as soon as the stages they depend on are done, independent
+    ones concurrently on a thread pool of `max_workers`.
+
+    A failing stage does not stop independent branches; stages depending
+    on it are skipped and the error is reported in DagRun.errors.
+    """
+
+    def __init__(self, stages: List[Stage], max_workers: int = 4) -> None:
+        names = [s.name for s in stages]
+        if len(set(names)) != len(names):
+            raise ValueError("Stage names must be unique")
+        self.stages = {s.name: s for s in stages}
+        self.max_workers = max_workers
+        self._check_acyclic()
+
+    def _check_acyclic(self) -> None:
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str) -> None:
+            if state.get(name) == 2 or name not in self.stages:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Dependency cycle through stage {name!r}")
+            state[name] = 1
+            for dep in self.stages[name].inputs:
+                visit(dep)
+            state[name] = 2
+
+        for name in self.stages:
+            visit(name)
+
+    def run(self, **initial: Any) -> DagRun:
+        """Run every stage once; keyword arguments are the non-stage inputs."""
+        for stage in self.stages.values():
+            missing = [i for i in stage.inputs if i not in self.stages and i not in initial]
+            if missing:
+                raise ValueError(f"Stage {stage.name!r} has unknown inputs: {missing}")
+
+        values: JSONDict = dict(initial)
+        result = DagRun(
+            outputs={},
+            timings={},
+            inputs={name: s.inputs for name, s in self.stages.items()},
+        )
+        pending = dict(self.stages)
+        running: Dict[Future, str] = {}
+        tracer = tracing.current_tracer()
+        run_start = time.perf_counter()
+
+        def execute(stage: Stage, kwargs: JSONDict) -> Tuple[str, Any, float, float]:
+            start = time.perf_counter()
+            # Spans of the worker threads belong to the caller's run
+            with tracing.activate(tracer):
+                try:
+                    if stage.when is not None and not stage.when(**kwargs):
+                        return SKIPPED, None, start, time.perf_counter()
+                    with tracing.span(stage.name, tracing.STEP):
+                        output = stage.fn(**kwargs)
+                except Exception as e:
+                    return ERROR, str(e), start, time.perf_counter()
+            return OK, output, start, time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="dag") as pool:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    deps = [d for d in stage.inputs if d in self.stages]
+                    if any(d in pending or d in running.values() for d in deps):
+                        continue
+                    del pending[name]
+                    # Failures propagate through stages skipped because of them
+                    failed = [d for d in deps if result.timings[d].error is not None]
+                    if failed:
+                        result.timings[name] = StageTiming(SKIPPED, error=f"input {failed[0]} failed")
+                        values[name] = None
+                        continue
+                    kwargs = {i: values[i] for i in stage.inputs}
+                    running[pool.submit(execute, stage, kwargs)] = name
+
+                if not running:
+                    continue
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    status, output, start, end = future.result()
+                    timing = StageTiming(status, start - run_start, end - start)
+                    if status == ERROR:
+                        timing.error = result.errors[name] = output
+                        output = None
+                    values[name] = output
+                    result.outputs[name] = output
+                    result.timings[name] = timing
+
+        result.wall_seconds = time.perf_counter() - run_start
+        return result
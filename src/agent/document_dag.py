@@ -0,0 +1,221 @@
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from src.agent.checkpoints import RunCheckpoint, checkpoint_tools, get_checkpoint_store
+from src.agent.dag import DagExecutor, Stage
+from src.agent.run_ledger import bind_tools_to_ledger, RunLedger
+from src.db.document_store import file_content_hash
+from src.observability import metrics
+from src.observability.tracing import mark_error, traced_run
+from src.tools.db_tools import DB_PATH
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+DAG_MAX_WORKERS = _config["document_agent"]["dag_max_workers"]
+
+JSONDict = Dict[str, Any]
+
+
+def _invoice(parse: Optional[JSONDict]) -> Optional[JSONDict]:
+    if parse and parse.get("doc_type") == "invoice":
+        return parse.get("parsed_invoice")
+    return None
+
+
+def _ticket(parse: Optional[JSONDict]) -> Optional[JSONDict]:
+    if parse and parse.get("doc_type") == "ticket":
+        return parse.get("parsed_ticket")
+    return None
+
+
+def _math_failed(math: Optional[JSONDict]) -> bool:
+    return bool(math) and math.get("is_valid") is False
+
+
+def _mismatch(reconcile: Optional[JSONDict]) -> bool:
+    return bool(reconcile) and reconcile.get("is_match") is False
+
+
+def build_document_stages(tools: List[Any]) -> List[Stage]:
+    """
+    The document workflow of SMOL_SYSTEM_INSTRUCTIONS as DAG stages over
+    the document tools (looked up by name):
+
+        parse -> math ------------> reconcile -> upsert | ticket
+              -> db_invoice ----/
+                    math error -> draft_email -> send_email
+
+    The math check and the DB lookup run concurrently. As in the agent's
+    policy, a math error is emailed to the supplier and an amount mismatch
+    gets a ticket. It takes no user instruction: following one takes the
+    LLM agent.
+    """
+    tool = {t.name: t for t in tools}
+
+    def parse(file_path: str) -> JSONDict:
+        return tool["parse_document_tool"](file_path=file_path)
+
+    def math(parse: JSONDict) -> JSONDict:
+        return tool["validate_invoice_math_tool"](
+            parsed_invoice=_invoice(parse), document=parse["document"]
+        )
+
+    def db_invoice(parse: JSONDict) -> Optional[JSONDict]:
+        return tool["get_invoice_from_db_tool"](invoice_id=_invoice(parse)["invoice_id"])
+
+    def reconcile(parse: JSONDict, math: JSONDict, db_invoice: Optional[JSONDict]) -> JSONDict:
+        return tool["reconcile_invoice_with_db_tool"](
+            parsed_invoice=_invoice(parse), db_invoice=db_invoice
+        )
+
+    def upsert(parse: JSONDict, reconcile: JSONDict) -> str:
+        return tool["upsert_invoice_in_db_tool"](invoice=_invoice(parse))
+
+    def ticket(
+        parse: JSONDict, reconcile: Optional[JSONDict], db_invoice: Optional[JSONDict]
+    ) -> JSONDict:
+        parsed_ticket = _ticket(parse)
+        if parsed_ticket is not None:
+            return tool["create_ticket_in_db_tool"](
+                invoice_id=parsed_ticket.get("invoice_id") or "",
+                issue_type=parsed_ticket.get("issue_type") or "Unknown",
+                description=parsed_ticket.get("description") or "",
+                recorded_amount=parsed_ticket.get("recorded_amount"),
+                document_amount=parsed_ticket.get("document_amount"),
+            )
+        invoice = _invoice(parse)
+        return tool["create_ticket_in_db_tool"](
+            invoice_id=invoice["invoice_id"],
+            issue_type="Amount mismatch",
+            description="; ".join(reconcile.get("differences") or []),
+            recorded_amount=(db_invoice or {}).get("total_amount"),
+            document_amount=invoice.get("total_amount"),
+        )
+
+    def draft_email(parse: JSONDict, math: JSONDict) -> str:
+        return tool["draft_email_tool"](
+            recipient=_invoice(parse)["contact_email"],
+            context={"parsed_invoice": _invoice(parse), "math_check": math},
+        )
+
+    def send_email(parse: JSONDict, draft_email: str) -> str:
+        invoice = _invoice(parse)
+        return tool["send_email_tool"](
+            recipient=invoice["contact_email"],
+            subject=f"Invoice {invoice.get('invoice_id')}: calculation error",
+            body=draft_email,
+        )
+
+    return [
+        Stage("parse", parse, ("file_path",)),
+        Stage("math", math, ("parse",), when=lambda parse: _invoice(parse) is not None),
+        Stage(
+            "db_invoice",
+            db_invoice,
+            ("parse",),
+            when=lambda parse: bool((_invoice(parse) or {}).get("invoice_id")),
+        ),
+        Stage(
+            "reconcile",
+            reconcile,
+            ("parse", "math", "db_invoice"),
+            when=lambda parse, math, db_invoice: (
+                _invoice(parse) is not None and math is not None and not _math_failed(math)
+            ),
+        ),
+        Stage(
+            "upsert",
+            upsert,
+            ("parse", "reconcile"),
+            when=lambda parse, reconcile: bool(reconcile) and reconcile.get("is_match") is None,
+        ),
+        Stage(
+            "ticket",
+            ticket,
+            ("parse", "reconcile", "db_invoice"),
+            when=lambda parse, reconcile, db_invoice: (
+                _ticket(parse) is not None or _mismatch(reconcile)
+            ),
+        ),
+        Stage(
+            "draft_email",
+            draft_email,
+            ("parse", "math"),
+            when=lambda parse, math: (
+                bool((_invoice(parse) or {}).get("contact_email")) and _math_failed(math)
+            ),
+        ),
+        Stage(
+            "send_email",
+            send_email,
+            ("parse", "draft_email"),
+            when=lambda parse, draft_email: bool(draft_email),
+        ),
+    ]
+
+
+def run_document_dag(
+    file_path: Path,
+    tools: Optional[List[Any]] = None,
+    max_workers: int = DAG_MAX_WORKERS,
+) -> JSONDict:
+    """
+    Run the document workflow without the LLM agent: the same tools, with
+    independent stages overlapping, so latency follows the critical path.
+
+    Like SmolDocumentAgent.run, stages completed by an earlier, failed run
+    on the same PDF are replayed from their checkpoints, so a retry does
+    not send the same email or create the same ticket again.
+
+    Returns the same summary as SmolDocumentAgent.run (built from the tool
+    calls), plus `stage_timings`, `critical_path` and `wall_ms`.
+    """
+    if tools is None:
+        from src.agent.registry import get_document_tools
+
+        tools = get_document_tools()
+
+    store = get_checkpoint_store(DB_PATH)
+    checkpoint = (
+        RunCheckpoint(store, file_content_hash(file_path))
+        if store is not None and Path(file_path).exists()
+        else None
+    )
+    ledger = RunLedger()
+    bound = bind_tools_to_ledger(checkpoint_tools(tools, lambda: checkpoint), lambda: ledger)
+    executor = DagExecutor(build_document_stages(bound), max_workers)
+
+    with traced_run("document_dag", DB_PATH, file=Path(file_path).name) as tracer:
+        run = executor.run(file_path=str(file_path))
+
+        summary = ledger.build_summary()
+        summary["agent_note"] = None
+        summary["stage_timings"] = run.timing_summary()
+        summary["critical_path"] = run.critical_path()
+        summary["wall_ms"] = round(run.wall_seconds * 1000, 1)
+
+        if run.errors:
+            summary["error"] = "; ".join(f"{stage}: {error}" for stage, error in run.errors.items())
+        if summary["doc_type"] is None:
+            summary["doc_type"] = "error"
+            summary.setdefault("error", "The document could not be parsed.")
+
+        if checkpoint is not None:
+            summary["resumed_stages"] = sorted(set(checkpoint.replayed))
+            if "error" not in summary:
+                # Finished: a later run of this PDF starts from scratch
+                checkpoint.clear()
+
+        if "error" in summary:
+            mark_error(tracer, summary["error"])
+        summary["run_id"] = tracer.run_id if tracer is not None else None
+
+    metrics.record_document("dag", summary, run.wall_seconds)
+    return summary
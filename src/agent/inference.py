@@ -0,0 +1,285 @@
+import queue
+import threading
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+import yaml
+from llama_index.core.llms import ChatMessage as LlamaChatMessage
+from smolagents.models import (
+    ChatMessage,
+    MessageRole,
+    Model,
+    get_clean_message_list,
+    remove_content_after_stop_sequences,
+    tool_role_conversions,
+)
+from smolagents.monitoring import TokenUsage
+
+from src.agent.rate_limits import GovernedModel
+from src.agent.registry import get_ollama_llm
+from src.observability import tracing
+from src.observability.stats import percentile
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+DEADLINE_SECONDS = _config["inference"]["deadline_seconds"]
+HEDGE_ENABLED = _config["inference"]["hedge"]
+HEDGE_PERCENTILE = _config["inference"]["hedge_percentile"]
+HEDGE_MIN_SECONDS = _config["inference"]["hedge_min_seconds"]
+HEDGE_DEFAULT_SECONDS = _config["inference"]["hedge_default_seconds"]
+MIN_SAMPLES = _config["inference"]["min_samples"]
+LATENCY_WINDOW = _config["inference"]["latency_window"]
+FALLBACK_ENABLED = _config["inference"]["fallback"]
+
+# How a ResilientModel call was answered
+PRIMARY = "primary"      # the first request
+HEDGE = "hedge"          # the duplicate request sent after the hedge delay
+FALLBACK = "fallback"    # the local model, after the deadline or remote errors
+
+
+class LatencyWindow:
+    """Latencies of the last `size` calls to one model, shared by the process."""
+
+    def __init__(self, size: int = LATENCY_WINDOW) -> None:
+        self._values: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._values.append(seconds)
+
+    def percentile(self, q: float, min_samples: Optional[int] = None) -> Optional[float]:
+        """q-th percentile of the window, None until it holds `min_samples` values."""
+        with self._lock:
+            values = sorted(self._values)
+        if len(values) < (MIN_SAMPLES if min_samples is None else min_samples):
+            return None
+        return percentile(values, q)
+
+
+_WINDOWS: Dict[str, LatencyWindow] = {}
+_OUTCOMES: Counter = Counter()
+_STATS_LOCK = threading.Lock()
+
+
+def latency_window(model_id: str) -> LatencyWindow:
+    with _STATS_LOCK:
+        if model_id not in _WINDOWS:
+            _WINDOWS[model_id] = LatencyWindow()
+        return _WINDOWS[model_id]
+
+
+def inference_stats() -> Dict[str, int]:
+    """How the remote model calls of this process were answered, plus failures."""
+    with _STATS_LOCK:
+        return dict(_OUTCOMES)
+
+
+def _count(*outcomes: str) -> None:
+    with _STATS_LOCK:
+        _OUTCOMES.update(outcomes)
+
+
+class OllamaAgentModel(Model):
+    """
+    smolagents model over the shared llama_index Ollama client (`llm` in
+    config.yaml), used as the local fallback of the agents' HF model.
+    """
+
+    def __init__(self, llm: Any, **kwargs: Any) -> None:
+        super().__init__(model_id=llm.model, flatten_messages_as_text=True, **kwargs)
+        self._llm = llm
+
+    def generate(
+        self,
+        messages: List[Any],
+        stop_sequences: Optional[List[str]] = None,
+        response_format: Optional[Dict[str, str]] = None,
+        tools_to_call_from: Optional[List[Any]] = None,
+        **kwargs: Any,
+    ) -> ChatMessage:
+        clean = get_clean_message_list(
+            messages,
+            role_conversions=tool_role_conversions,
+            flatten_messages_as_text=True,
+        )
+        response = self._llm.chat(
+            [
+                LlamaChatMessage(role=MessageRole(m["role"]).value, content=m["content"])
+                for m in clean
+            ]
+        )
+
+        # Same usage fields as tracing.record_llm_usage reads
+        raw = response.raw if isinstance(response.raw, dict) else {}
+        usage = None
+        if isinstance(raw.get("usage"), dict):
+            usage = TokenUsage(
+                input_tokens=raw["usage"].get("prompt_tokens") or 0,
+                output_tokens=raw["usage"].get("completion_tokens") or 0,
+            )
+        return ChatMessage(
+            role=MessageRole.ASSISTANT,
+            content=remove_content_after_stop_sequences(
+                str(response.message.content or ""), stop_sequences
+            ),
+            raw=raw,
+            token_usage=usage,
+        )
+
+
+class ResilientModel:
+    """
+    Wraps a remote smolagents model so one slow or failing call cannot
+    hold a document for long:
+
+    - deadline: a call not answered within `deadline_seconds` is abandoned;
+    - hedging: if the first request is slower than the recent p95 (or
+      `hedge_default_seconds` until enough calls were seen), an identical
+      request is sent and whichever answers first wins;
+    - fallback: on deadline, or when every request failed, the `fallback`
+      model (the local Ollama one) answers instead.
+
+    How the last call of a thread was answered is in `last_call`; TracedModel
+    copies it into the LLM span. Everything else is delegated, like TracedModel.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        fallback: Optional[Any] = None,
+        deadline_seconds: float = DEADLINE_SECONDS,
+        hedge: bool = HEDGE_ENABLED,
+    ) -> None:
+        self._model = model
+        self._fallback = fallback
+        self._deadline_seconds = deadline_seconds
+        self._hedge = hedge
+        model_id = getattr(model, "model_id", None) or type(model).__name__
+        self._window = latency_window(str(model_id))
+        self._local = threading.local()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_model":
+            raise AttributeError(name)
+        return getattr(self._model, name)
+
+    @property
+    def last_call(self) -> Optional[Dict[str, Any]]:
+        return getattr(self._local, "last_call", None)
+
+    def hedge_after_seconds(self) -> Optional[float]:
+        """Delay before the hedged request (None: hedging off)."""
+        if not self._hedge:
+            return None
+        delay = self._window.percentile(HEDGE_PERCENTILE)
+        if delay is None:
+            delay = HEDGE_DEFAULT_SECONDS
+        return max(HEDGE_MIN_SECONDS, delay)
+
+    def generate(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        self._local.last_call = None
+        start = time.monotonic()
+        deadline = start + self._deadline_seconds
+        hedge_at = self.hedge_after_seconds()
+        answers: "queue.Queue[Any]" = queue.Queue()
+        abandoned = threading.Event()
+        tracer = tracing.current_tracer()
+
+        def request(attempt: str) -> None:
+            # Spans of the worker threads (rate-limit waits) belong to the caller's run
+            with tracing.activate(tracer):
+                sent = time.monotonic()
+                try:
+                    message = self._model.generate(messages, *args, **kwargs)
+                except Exception as e:
+                    answers.put((attempt, False, e))
+                    return
+                if not abandoned.is_set():
+                    self._window.add(time.monotonic() - sent)
+                answers.put((attempt, True, message))
+
+        def send(attempt: str) -> None:
+            threading.Thread(
+                target=request, args=(attempt,), name=f"inference-{attempt}", daemon=True
+            ).start()
+
+        send(PRIMARY)
+        sent = [PRIMARY]
+        errors: List[Exception] = []
+
+        while len(errors) < len(sent):
+            now = time.monotonic()
+            wait_until = deadline
+            if hedge_at is not None and HEDGE not in sent:
+                wait_until = min(deadline, start + hedge_at)
+            try:
+                attempt, ok, value = answers.get(timeout=max(0.0, wait_until - now))
+            except queue.Empty:
+                if time.monotonic() >= deadline:
+                    break
+                send(HEDGE)
+                sent.append(HEDGE)
+                continue
+            if ok:
+                return self._done(attempt, sent, start, value)
+            errors.append(value)
+
+        timed_out = len(errors) < len(sent)
+        if timed_out:
+            # Abandoned requests answer late, if ever: counted at the deadline,
+            # or the window would only ever see the fast calls
+            abandoned.set()
+            self._window.add(self._deadline_seconds)
+        reason = (
+            f"no answer within {self._deadline_seconds:.0f}s"
+            if timed_out
+            else f"{type(errors[-1]).__name__}: {errors[-1]}"
+        )
+
+        if self._fallback is None:
+            _count("timeout" if timed_out else "error")
+            if timed_out:
+                raise TimeoutError(f"Remote model gave {reason}")
+            raise errors[-1]
+
+        message = self._fallback.generate(messages, *args, **kwargs)
+        return self._done(FALLBACK, sent, start, message, fallback_reason=reason)
+
+    def _done(
+        self,
+        answered_by: str,
+        sent: List[str],
+        start: float,
+        message: Any,
+        **extra: Any,
+    ) -> Any:
+        _count(answered_by)
+        self._local.last_call = {
+            "answered_by": answered_by,
+            "requests": len(sent),
+            "seconds": round(time.monotonic() - start, 3),
+            **extra,
+        }
+        return message
+
+    def __call__(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.generate(messages, *args, **kwargs)
+
+
+def resilient_model(model: Any) -> ResilientModel:
+    """
+    The agents' view of a shared HF model: rate-limited, with deadline,
+    hedging and (if enabled in config.yaml) the local Ollama fallback.
+    """
+    fallback = None
+    if FALLBACK_ENABLED:
+        fallback = GovernedModel(OllamaAgentModel(get_ollama_llm()), backend="ollama")
+    return ResilientModel(GovernedModel(model, backend="hf_inference"), fallback=fallback)
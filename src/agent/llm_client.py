@@ -1,20 +1,13 @@
-from llama_index.llms.ollama import Ollama
-import yaml
-from pathlib import Path
+from typing import TYPE_CHECKING
 
-CONFIG_PATH = Path(__file__).resolve().parent.parent / "config" / "config.yaml"
+from src.agent.registry import get_ollama_llm
 
-with open(CONFIG_PATH) as f:
-    _config = yaml.safe_load(f)
+if TYPE_CHECKING:
+    from llama_index.llms.ollama import Ollama
 
-LLM_MODEL = _config["llm"]["model"]
-LLM_REQUEST_TIMEOUT = _config["llm"]["request_timeout"]
 
-def get_llm() -> Ollama:
+def get_llm() -> "Ollama":
     """
-    Returns a local Ollama LLM instance.
+    Returns the local Ollama LLM instance, shared by the whole process.
     """
-    return Ollama(
-        model=LLM_MODEL,
-        timeout=LLM_REQUEST_TIMEOUT,
-    )
+    return get_ollama_llm()
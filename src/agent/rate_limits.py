@@ -0,0 +1,86 @@
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import yaml
+
+from src.db.rate_limiter import BackendLimit, RateLimiter
+from src.observability import tracing
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+RATE_LIMITS_ENABLED = _config["rate_limits"]["enabled"]
+RATE_LIMITS_DB_PATH = PROJECT_ROOT.parent / _config["rate_limits"]["db_file"]
+LEASE_SECONDS = _config["rate_limits"]["lease_seconds"]
+MAX_WAIT_SECONDS = _config["rate_limits"]["max_wait_seconds"]
+BACKEND_LIMITS = {
+    name: BackendLimit.from_config(settings or {})
+    for name, settings in _config["rate_limits"]["backends"].items()
+}
+
+# Waits shorter than this are not worth a span
+_MIN_TRACED_WAIT_SECONDS = 0.01
+
+_LIMITERS: Dict[Path, RateLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_rate_limiter() -> Optional[RateLimiter]:
+    """The process-wide limiter, or None when rate limits are disabled in config.yaml."""
+    if not RATE_LIMITS_ENABLED:
+        return None
+    key = Path(RATE_LIMITS_DB_PATH).resolve()
+    with _LIMITERS_LOCK:
+        if key not in _LIMITERS:
+            _LIMITERS[key] = RateLimiter(key, BACKEND_LIMITS, lease_seconds=LEASE_SECONDS)
+        return _LIMITERS[key]
+
+
+@contextmanager
+def governed(backend: str, cost: float = 1.0) -> Iterator[None]:
+    """
+    Run the block as one call to `backend` ("llamaparse", "hf_inference",
+    "ollama", "gmail"), once its shared quota allows it. Time spent waiting
+    is recorded as a span of the current run.
+    """
+    limiter = get_rate_limiter()
+    if limiter is None:
+        yield
+        return
+
+    start = time.time()
+    with limiter.slot(backend, cost, timeout=MAX_WAIT_SECONDS) as waited:
+        tracer = tracing.current_tracer()
+        if tracer is not None and waited >= _MIN_TRACED_WAIT_SECONDS:
+            tracer.add_span(f"wait:{backend}", tracing.IO, start, start + waited, backend=backend)
+        yield
+
+
+class GovernedModel:
+    """
+    Wraps a smolagents model so every `generate` call goes through the
+    shared quota of `backend`. Everything else is delegated, like TracedModel.
+    """
+
+    def __init__(self, model: Any, backend: str = "hf_inference") -> None:
+        self._model = model
+        self._backend = backend
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_model":
+            raise AttributeError(name)
+        return getattr(self._model, name)
+
+    def generate(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        with governed(self._backend):
+            return self._model.generate(messages, *args, **kwargs)
+
+    def __call__(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.generate(messages, *args, **kwargs)
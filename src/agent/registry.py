@@ -0,0 +1,346 @@
+import json
+import math
+import os
+import queue
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List
+
+import yaml
+from dotenv import load_dotenv
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+load_dotenv(PROJECT_ROOT / ".env")
+
+HF_TOKEN = os.getenv("HF_TOKEN")
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+LLM_MODEL = _config["llm"]["model"]
+LLM_REQUEST_TIMEOUT = _config["llm"]["request_timeout"]
+EMBED_MODEL = _config["embedding"]["model"]
+CHAT_MODEL_ID = _config["chat_agent"]["model_id"]
+CHAT_TEMPERATURE = _config["chat_agent"]["temperature"]
+DOCUMENT_MODEL_ID = _config["document_agent"]["model_id"]
+DOCUMENT_TEMPERATURE = _config["document_agent"]["temperature"]
+DOCUMENT_EXECUTOR = _config["document_agent"]["executor"]
+INFERENCE_DEADLINE_SECONDS = _config["inference"]["deadline_seconds"]
+KEEP_ALIVE = _config["warmup"]["keep_alive"]
+AGENT_POOL_SIZE = _config["warmup"]["agent_pool_size"]
+AGENT_LEASE_TIMEOUT_SECONDS = _config["warmup"]["agent_lease_timeout_seconds"]
+
+
+def _ollama_base_url() -> str:
+    """OLLAMA_HOST from the environment, as a full URL."""
+    host = os.getenv("OLLAMA_HOST") or "http://localhost:11434"
+    if not host.startswith(("http://", "https://")):
+        host = f"http://{host}"
+    return host.rstrip("/")
+
+
+OLLAMA_BASE_URL = _ollama_base_url()
+
+
+class ResourceRegistry:
+    """
+    Process-wide registry of expensive objects (models, tool sets, agents).
+
+    Each resource is built at most once per process by its factory, even
+    when several Streamlit sessions ask for it at the same time, and its
+    readiness is tracked so the UI can report it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._resources: Dict[str, Any] = {}
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+
+    def _set_status(self, name: str, state: str, **extra: Any) -> None:
+        with self._lock:
+            self._status[name] = {"state": state, **extra}
+
+    def get(self, name: str, factory: Callable[[], Any]) -> Any:
+        """Return the resource `name`, building it with `factory` on first use."""
+        if name in self._resources:
+            return self._resources[name]
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(name, threading.Lock())
+
+        with build_lock:
+            # Another thread may have built it while we waited
+            if name in self._resources:
+                return self._resources[name]
+
+            self._set_status(name, "loading")
+            start = time.perf_counter()
+            try:
+                resource = factory()
+            except Exception as e:
+                self._set_status(name, "failed", error=str(e))
+                raise
+            self._resources[name] = resource
+            self._set_status(name, "ready", seconds=round(time.perf_counter() - start, 3))
+            return resource
+
+    def run_check(self, name: str, check: Callable[[], Any]) -> bool:
+        """Run a warm-up step and record its outcome under `name`."""
+        self._set_status(name, "loading")
+        start = time.perf_counter()
+        try:
+            check()
+        except Exception as e:
+            self._set_status(name, "failed", error=str(e))
+            return False
+        self._set_status(name, "ready", seconds=round(time.perf_counter() - start, 3))
+        return True
+
+    @contextmanager
+    def override(self, name: str, resource: Any) -> Iterator[None]:
+        """
+        Serve `resource` as `name` for the duration of the block (offline
+        benchmarks point the shared clients at local stand-ins this way).
+        """
+        with self._lock:
+            had_previous = name in self._resources
+            previous = self._resources.get(name)
+            self._resources[name] = resource
+        try:
+            yield
+        finally:
+            with self._lock:
+                if had_previous:
+                    self._resources[name] = previous
+                else:
+                    self._resources.pop(name, None)
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        """Snapshot of the readiness of every known resource."""
+        with self._lock:
+            return {name: dict(s) for name, s in self._status.items()}
+
+
+REGISTRY = ResourceRegistry()
+
+
+# Models
+
+def get_ollama_llm():
+    """Shared local Ollama LLM (kept loaded for `warmup.keep_alive`)."""
+
+    def _build():
+        from llama_index.llms.ollama import Ollama
+
+        return Ollama(
+            model=LLM_MODEL,
+            base_url=OLLAMA_BASE_URL,
+            request_timeout=LLM_REQUEST_TIMEOUT,
+            keep_alive=KEEP_ALIVE,
+        )
+
+    return REGISTRY.get("ollama_llm", _build)
+
+
+def get_embed_model(model_name: str = EMBED_MODEL):
+    """Shared Ollama embedding model used for RAG over documents."""
+
+    def _build():
+        from llama_index.embeddings.ollama import OllamaEmbedding
+
+        return OllamaEmbedding(
+            model_name=model_name,
+            base_url=OLLAMA_BASE_URL,
+            keep_alive=KEEP_ALIVE,
+        )
+
+    return REGISTRY.get(f"embed_model:{model_name}", _build)
+
+
+def get_document_model():
+    """Shared HF inference model driving SmolDocumentAgent."""
+
+    def _build():
+        from smolagents import InferenceClientModel
+
+        return InferenceClientModel(
+            model_id=DOCUMENT_MODEL_ID,
+            token=HF_TOKEN,
+            temperature=DOCUMENT_TEMPERATURE,
+            # Past the deadline the answer is not waited for (see ResilientModel)
+            timeout=math.ceil(INFERENCE_DEADLINE_SECONDS),
+        )
+
+    return REGISTRY.get("document_model", _build)
+
+
+def get_chat_model():
+    """Shared HF inference model driving DocumentChatAgent."""
+
+    def _build():
+        from smolagents import InferenceClientModel
+
+        return InferenceClientModel(
+            model_id=CHAT_MODEL_ID,
+            token=HF_TOKEN,
+            temperature=CHAT_TEMPERATURE,
+            timeout=math.ceil(INFERENCE_DEADLINE_SECONDS),
+        )
+
+    return REGISTRY.get("chat_model", _build)
+
+
+# Tool sets
+
+def get_document_tools() -> List[Any]:
+    """The tools of the document workflow, imported once."""
+
+    def _build():
+        from src.tools.parsing_tools import parse_document_tool
+        from src.tools.math_tools import validate_invoice_math_tool
+        from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
+        from src.tools.email_tools import draft_email_tool, send_email_tool
+        from src.tools.db_tools import (
+            get_invoice_from_db_tool,
+            upsert_invoice_in_db_tool,
+            create_ticket_in_db_tool,
+        )
+
+        return [
+            parse_document_tool,
+            validate_invoice_math_tool,
+            reconcile_invoice_with_db_tool,
+            get_invoice_from_db_tool,
+            upsert_invoice_in_db_tool,
+            create_ticket_in_db_tool,
+            draft_email_tool,
+            send_email_tool,
+        ]
+
+    return REGISTRY.get("document_tools", _build)
+
+
+# Agents
+
+class AgentPoolBusy(TimeoutError):
+    """Every pooled agent stayed leased for the whole lease timeout."""
+
+
+_AGENT_POOL: "queue.Queue[Any]" = queue.Queue()
+_AGENT_POOL_CREATED = 0
+_AGENT_POOL_LOCK = threading.Lock()
+
+
+def _build_document_agent():
+    from src.agent.smol_document_agent import SmolDocumentAgent
+
+    return SmolDocumentAgent()
+
+
+@contextmanager
+def lease_document_agent(timeout: float = AGENT_LEASE_TIMEOUT_SECONDS) -> Iterator[Any]:
+    """
+    Borrow a SmolDocumentAgent from the process-wide pool.
+
+    A CodeAgent keeps per-run memory, so an instance serves one run at a
+    time; up to `warmup.agent_pool_size` instances are built on demand and
+    then reused by every session. When all of them are leased, waits up to
+    `timeout` seconds for one, then raises AgentPoolBusy rather than
+    blocking the session behind a hung run.
+    """
+    global _AGENT_POOL_CREATED
+
+    try:
+        agent = _AGENT_POOL.get_nowait()
+    except queue.Empty:
+        with _AGENT_POOL_LOCK:
+            can_build = _AGENT_POOL_CREATED < AGENT_POOL_SIZE
+            if can_build:
+                _AGENT_POOL_CREATED += 1
+                slot = _AGENT_POOL_CREATED
+        if can_build:
+            try:
+                agent = REGISTRY.get(f"document_agent:{slot}", _build_document_agent)
+            except Exception:
+                with _AGENT_POOL_LOCK:
+                    _AGENT_POOL_CREATED -= 1
+                raise
+        else:
+            try:
+                agent = _AGENT_POOL.get(timeout=timeout)
+            except queue.Empty:
+                raise AgentPoolBusy(
+                    f"All {AGENT_POOL_SIZE} document agents are busy "
+                    f"(waited {timeout:.0f}s), please try again later."
+                ) from None
+
+    try:
+        yield agent
+    finally:
+        _AGENT_POOL.put(agent)
+
+
+# Warm-up
+
+def _post_ollama(path: str, payload: Dict[str, Any]) -> None:
+    req = urllib.request.Request(
+        f"{OLLAMA_BASE_URL}{path}",
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+    )
+    with urllib.request.urlopen(req, timeout=LLM_REQUEST_TIMEOUT) as resp:
+        resp.read()
+
+
+def warm_up() -> None:
+    """
+    Load both Ollama models (with keep_alive) and build the shared models,
+    tools and one document agent, recording readiness for each step.
+    """
+    # An empty prompt makes Ollama load the model without generating
+    REGISTRY.run_check(
+        f"ollama:{LLM_MODEL}",
+        lambda: _post_ollama(
+            "/api/generate", {"model": LLM_MODEL, "prompt": "", "keep_alive": KEEP_ALIVE}
+        ),
+    )
+    REGISTRY.run_check(
+        f"ollama:{EMBED_MODEL}",
+        lambda: _post_ollama(
+            "/api/embed", {"model": EMBED_MODEL, "input": "warm-up", "keep_alive": KEEP_ALIVE}
+        ),
+    )
+
+    for build in (get_ollama_llm, get_embed_model, get_document_model, get_chat_model, get_document_tools):
+        try:
+            build()
+        except Exception:
+            # Failure is recorded in the registry status
+            pass
+
+    try:
+        with lease_document_agent():
+            pass
+    except Exception:
+        pass
+
+
+_WARM_UP_STARTED = False
+_WARM_UP_LOCK = threading.Lock()
+
+
+def start_warm_up() -> None:
+    """Fire warm_up() in a background thread, once per process."""
+    global _WARM_UP_STARTED
+    with _WARM_UP_LOCK:
+        if _WARM_UP_STARTED:
+            return
+        _WARM_UP_STARTED = True
+
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
@@ -0,0 +1,200 @@
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from src.db.db_client import DBClient, normalize_issue_type
+from src.db.fuzzy_index import normalize_invoice_id
+from src.db.invoice_changes import InvoiceChangeQueue
+from src.db.upload_store import UploadStore
+from src.observability import tracing
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+RERECONCILE_ENABLED = _config["rereconcile"]["enabled"]
+RERECONCILE_BATCH_SIZE = _config["rereconcile"]["batch_size"]
+RERECONCILE_POLL_INTERVAL_SECONDS = _config["rereconcile"]["poll_interval_seconds"]
+RERECONCILE_LEASE_SECONDS = _config["rereconcile"]["lease_seconds"]
+
+JSONDict = Dict[str, Any]
+
+# Same tolerance as reconcile_invoice_with_db_tool
+AMOUNT_TOLERANCE = 0.01
+
+# Open tickets the worker may close on its own, by normalized issue type,
+# and the invoice field whose stored value settles them. The other issue
+# types (math errors on the document itself, duplicates, missing PO, ...)
+# are not about a stored amount: a corrected row says nothing about them,
+# so they stay with a person.
+AUTO_RESOLVE_FIELDS = {
+    "amount mismatch": "total_amount",
+    "total mismatch": "total_amount",
+    "discrepancy": "total_amount",
+    "tax mismatch": "tax_amount",
+    "tax issue": "tax_amount",
+}
+OPEN_STATUSES = ("Open", "In Progress")
+
+
+def _amounts_match(a: Optional[float], b: Optional[float]) -> bool:
+    return a is not None and b is not None and abs(float(a) - float(b)) <= AMOUNT_TOLERANCE
+
+
+class Rereconciler:
+    """
+    Re-checks what depends on an invoice after its row changed, instead of
+    waiting for the PDF to be uploaded again:
+
+      - the stored workflow result of every document of that invoice gets a
+        fresh reconciliation against the current row. When that calls for
+        no new action (the invoice now matches, or differs exactly as
+        before), the result is tagged with the new row_version, so a
+        re-upload of the PDF is answered from it; otherwise the re-upload
+        re-runs the workflow, which opens the new ticket / email;
+      - open amount / tax mismatch tickets whose document amount now equals
+        the stored total / tax are resolved, with the reason.
+
+    Changed invoices come from the `invoice_changes` dirty queue, so the cost
+    follows the number of edits, not the size of the history.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        batch_size: int = RERECONCILE_BATCH_SIZE,
+        poll_interval_seconds: float = RERECONCILE_POLL_INTERVAL_SECONDS,
+        lease_seconds: float = RERECONCILE_LEASE_SECONDS,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.queue = InvoiceChangeQueue(db_path)
+        self.db = DBClient(db_path)
+        # Only workflow_results is used: the upload directory is not touched
+        self.results = UploadStore(db_path, Path(db_path).parent / "uploads")
+        self.batch_size = batch_size
+        self.poll_interval_seconds = poll_interval_seconds
+        self.lease_seconds = lease_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def recheck(self, invoice_id: str) -> JSONDict:
+        """Re-reconcile the documents and tickets of one invoice. Returns what changed."""
+        # Deferred: smolagents is not needed until there is something to re-check
+        from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
+
+        outcome: JSONDict = {
+            "invoice_id": invoice_id,
+            "documents": 0,
+            "mismatches": 0,
+            "resolved_tickets": [],
+        }
+        invoice = self.db.get_invoice(invoice_id)
+        if invoice is None:
+            return outcome
+
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        for content_hash, result in self.results.results_for_invoice(invoice_id):
+            parsed = result.get("parsed_invoice")
+            if not isinstance(parsed, dict) or normalize_invoice_id(
+                parsed.get("invoice_id")
+            ) != normalize_invoice_id(invoice_id):
+                # Ticket documents reference the invoice but have nothing to reconcile
+                continue
+            reconciliation = reconcile_invoice_with_db_tool(
+                parsed_invoice=parsed, db_invoice=invoice
+            )
+            previous = result.get("reconciliation") or {}
+            still_valid = reconciliation["is_match"] is True or (
+                previous.get("differences") == reconciliation["differences"]
+            )
+            result["db_invoice"] = invoice
+            result["reconciliation"] = reconciliation
+            result["rereconciled_at"] = now
+            # Tagged with the version it was checked against, not whatever
+            # version the invoice has by the time this is written
+            self.results.update_result(
+                content_hash, result, invoice["row_version"] if still_valid else None
+            )
+            outcome["documents"] += 1
+            if reconciliation["is_match"] is False:
+                outcome["mismatches"] += 1
+
+        for ticket in self.db.list_tickets_for_invoice(invoice_id):
+            field = AUTO_RESOLVE_FIELDS.get(normalize_issue_type(ticket["issue_type"]))
+            if (
+                ticket["status"] in OPEN_STATUSES
+                and field is not None
+                and _amounts_match(ticket["document_amount"], invoice.get(field))
+            ):
+                resolution = (
+                    f"Auto-resolved: the stored {field} ({float(invoice[field]):.2f}) now "
+                    f"matches the document (invoice row_version {invoice['row_version']})."
+                )
+                if self.db.resolve_ticket(ticket["ticket_id"], resolution):
+                    outcome["resolved_tickets"].append(ticket["ticket_id"])
+        return outcome
+
+    def process_once(self) -> List[JSONDict]:
+        """Claim and re-check one batch of changed invoices. Returns their outcomes."""
+        changes = self.queue.claim(self.batch_size, self.lease_seconds)
+        if not changes:
+            return []
+
+        outcomes = []
+        with tracing.traced_run("rereconcile", self.db_path, invoices=len(changes)):
+            for change in changes:
+                with tracing.span("recheck", invoice_id=change["invoice_id"]) as s:
+                    outcome = self.recheck(change["invoice_id"])
+                    s["attrs"].update(
+                        documents=outcome["documents"],
+                        resolved=len(outcome["resolved_tickets"]),
+                    )
+                self.queue.done(change["invoice_id"], change["row_version"])
+                outcomes.append(outcome)
+        return outcomes
+
+    def run(self) -> None:
+        """Loop until stop(): process full batches back to back, then poll."""
+        while not self._stop.is_set():
+            try:
+                handled = len(self.process_once())
+            except Exception:
+                # e.g. database locked; try again on the next poll
+                handled = 0
+            if handled < self.batch_size:
+                self._stop.wait(self.poll_interval_seconds)
+
+    def start(self) -> None:
+        """Run the worker in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="rereconciler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_WORKER: Optional[Rereconciler] = None
+_WORKER_LOCK = threading.Lock()
+
+
+def start_rereconciler(db_path: Path) -> Optional[Rereconciler]:
+    """Start the background worker for `db_path`, once per process (None if disabled)."""
+    global _WORKER
+    if not RERECONCILE_ENABLED:
+        return None
+    with _WORKER_LOCK:
+        if _WORKER is None:
+            _WORKER = Rereconciler(db_path)
+            _WORKER.start()
+        return _WORKER
@@ -0,0 +1,146 @@
+import copy
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+JSONDict = Dict[str, Any]
+
+# Which summary key each tool's output fills. parse_document_tool returns a
+# dict whose keys are copied as-is.
+SUMMARY_KEYS: Dict[str, str] = {
+    "validate_invoice_math_tool": "math_check",
+    "get_invoice_from_db_tool": "db_invoice",
+    "reconcile_invoice_with_db_tool": "reconciliation",
+    "upsert_invoice_in_db_tool": "db_upsert",
+    "create_ticket_in_db_tool": "ticket",
+    "draft_email_tool": "email_draft",
+    "send_email_tool": "email_status",
+}
+PARSE_KEYS = ("doc_type", "document", "parsed_invoice", "parsed_ticket")
+
+
+class RunLedger:
+    """
+    Records every tool invocation of one agent run (inputs, output or
+    error, wall time) so the run summary can be assembled from what the
+    tools actually returned instead of from the model's final answer.
+    """
+
+    def __init__(self) -> None:
+        self.calls: List[JSONDict] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        tool_name: str,
+        inputs: JSONDict,
+        output: Any = None,
+        error: Optional[str] = None,
+        seconds: float = 0.0,
+    ) -> None:
+        with self._lock:
+            self.calls.append(
+                {
+                    "tool": tool_name,
+                    "inputs": inputs,
+                    "output": output,
+                    "error": error,
+                    "seconds": round(seconds, 4),
+                }
+            )
+
+    def last_output(self, tool_name: str) -> Any:
+        """Output of the last successful call of `tool_name`, or None."""
+        with self._lock:
+            for call in reversed(self.calls):
+                if call["tool"] == tool_name and call["error"] is None:
+                    return call["output"]
+        return None
+
+    def build_summary(self) -> JSONDict:
+        """
+        The workflow summary dict (same keys the UI always used), built from
+        the last successful output of each tool.
+        """
+        summary: JSONDict = {
+            "doc_type": None,
+            "document": None,
+            "parsed_invoice": None,
+            "parsed_ticket": None,
+            "math_check": None,
+            "db_invoice": None,
+            "reconciliation": None,
+            "db_upsert": None,
+            "ticket": None,
+            "email_draft": None,
+            "email_status": None,
+        }
+
+        parsed = self.last_output("parse_document_tool")
+        if isinstance(parsed, dict):
+            for key in PARSE_KEYS:
+                summary[key] = parsed.get(key)
+
+        for tool_name, key in SUMMARY_KEYS.items():
+            output = self.last_output(tool_name)
+            if output is not None:
+                summary[key] = output
+
+        with self._lock:
+            summary["tool_calls"] = [
+                {"tool": c["tool"], "seconds": c["seconds"], "error": c["error"]}
+                for c in self.calls
+            ]
+        return summary
+
+
+def _named_inputs(tool: Any, args: tuple, kwargs: JSONDict) -> JSONDict:
+    inputs = dict(zip(tool.inputs.keys(), args))
+    inputs.update(kwargs)
+    return inputs
+
+
+def bind_tools_to_ledger(
+    tools: List[Any],
+    get_ledger: Callable[[], Optional[RunLedger]],
+) -> List[Any]:
+    """
+    Return copies of `tools` whose calls are recorded in the ledger returned
+    by `get_ledger()` at call time (no recording when it returns None).
+
+    The shared tool objects are left untouched. The ledger is looked up
+    through a callable rather than a context variable because smolagents
+    runs the generated code in a worker thread.
+    """
+    bound = []
+    for tool in tools:
+        recorded = copy.copy(tool)
+        original_forward = tool.forward
+
+        def forward(*args, _tool=tool, _forward=original_forward, **kwargs):
+            start = time.perf_counter()
+            try:
+                output = _forward(*args, **kwargs)
+            except Exception as e:
+                ledger = get_ledger()
+                if ledger is not None:
+                    ledger.record(
+                        _tool.name,
+                        _named_inputs(_tool, args, kwargs),
+                        error=str(e),
+                        seconds=time.perf_counter() - start,
+                    )
+                raise
+            ledger = get_ledger()
+            if ledger is not None:
+                ledger.record(
+                    _tool.name,
+                    _named_inputs(_tool, args, kwargs),
+                    output=output,
+                    seconds=time.perf_counter() - start,
+                )
+            return output
+
+        recorded.forward = forward
+        bound.append(recorded)
+    return bound
@@ -1,26 +1,35 @@
-import json
+import time
 from pathlib import Path
 from typing import Any, Dict, Optional
 
-from smolagents import CodeAgent, InferenceClientModel
-from dotenv import load_dotenv
-import os
-
-from src.tools.parsing_tools import parse_document_tool
-from src.tools.math_tools import validate_invoice_math_tool
-from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
-from src.tools.email_tools import draft_email_tool, send_email_tool
-from src.tools.db_tools import (
-    get_invoice_from_db_tool,
-    upsert_invoice_in_db_tool,
-    create_ticket_in_db_tool,
+import yaml
+from smolagents import CodeAgent
+
+from src.agent.checkpoints import RunCheckpoint, checkpoint_tools, get_checkpoint_store
+from src.agent.inference import resilient_model
+from src.agent.registry import get_document_model, get_document_tools
+from src.agent.run_ledger import RunLedger, bind_tools_to_ledger
+from src.db.document_store import file_content_hash
+from src.observability import metrics
+from src.observability.tracing import (
+    TracedModel,
+    Tracer,
+    mark_error,
+    step_callback,
+    trace_tools,
+    traced_run,
 )
+from src.tools.db_tools import DB_PATH
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
-load_dotenv(PROJECT_ROOT / ".env")
 
-HF_TOKEN = os.getenv("HF_TOKEN")
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+DOCUMENT_MAX_STEPS = _config["document_agent"]["max_steps"]
 
 SMOL_SYSTEM_INSTRUCTIONS = """
 You are an AI agent that processes supplier invoices and discrepancy tickets.
@@ -35,14 +44,17 @@ You have access to the following tools (always use tools, never make up data):
 - get_invoice_from_db_tool: Retrieves invoice from database
 - upsert_invoice_in_db_tool: Inserts or updates invoice in database
 - create_ticket_in_db_tool: Creates discrepancy ticket in database
-- draft_email_tool: Composes email text
+- draft_email_tool: Composes email text (put parsed_invoice, math_check, reconciliation
+  and ticket results in `context`, standard cases are then drafted from a template)
 - send_email_tool: Sends email via Gmail
-- final_answer: CALL THIS LAST with a complete summary dict
+- final_answer: CALL THIS LAST with a one-sentence note
 
 === WORKFLOW POLICY ===
-1. First, use parse_document_tool with the file_path to extract document data
+1. First, use parse_document_tool with the file_path to extract document data.
+   It returns a `document` handle ("doc://...") instead of the text: pass the handle
+   to tools, never try to read or copy the text yourself.
 2. For INVOICES:
-   - Use validate_invoice_math_tool to check if math is correct
+   - Use validate_invoice_math_tool(parsed_invoice, document) to check if math is correct
    - If math is WRONG: Draft and send email to supplier
    - If math is CORRECT: 
      - Use reconcile_invoice_with_db_tool to check for discrepancies
@@ -50,51 +62,44 @@ You have access to the following tools (always use tools, never make up data):
      - If is_match is False (discrepancies found): Use create_ticket_in_db_tool
      - If is_match is True (matches DB): No further action needed
 3. For TICKETS: Use create_ticket_in_db_tool with parsed ticket data
-
-=== FINAL ANSWER (CRITICAL) ===
-ALWAYS end by calling final_answer() with a Python dict containing:
-{
-  "raw_text": "<full PDF text>",
-  "doc_type": "invoice|ticket|unknown",
-  "parsed_invoice": <dict or null>,
-  "parsed_ticket": <dict or null>,
-  "math_check": <result or null>,
-  "db_invoice": <result or null>,
-  "reconciliation": <result or null>,
-  "ticket": <result or null>,
-  "email_draft": "<text or null>",
-  "email_status": "<status or null>"
-}
-
-DO NOT pass a string to final_answer. Pass the complete dict object above.
-Your output will be parsed as JSON, so the dict must contain all required keys.
+4. For UNKNOWN documents (doc_type "unknown"): nothing to process, call final_answer
+5. create_ticket_in_db_tool is idempotent: if it returns already_existed=True the
+   issue was handled by an earlier run, so do NOT draft or send another email for it
+
+=== FINAL ANSWER ===
+Every tool result is recorded automatically and the workflow summary is built
+from those records, so do NOT repeat tool results or document text.
+When the workflow is complete, call final_answer with a one-sentence note, e.g.
+final_answer("Invoice INV-2025-001 matches the database, nothing else to do.")
 """.strip()
 
 
 class SmolDocumentAgent:
     def __init__(self) -> None:
-        self.model = InferenceClientModel(
-            model_id="meta-llama/Meta-Llama-3.1-70B-Instruct",
-            token=HF_TOKEN,
-            temperature=0.1,  # deterministic
+        # Ledger and tracer of the run in progress; this agent's copies of
+        # the shared model and tools record into them
+        self._ledger: Optional[RunLedger] = None
+        self._tracer: Optional[Tracer] = None
+        self._checkpoint: Optional[RunCheckpoint] = None
+
+        # Model and tools are built once per process and shared by all agents
+        self.model = TracedModel(resilient_model(get_document_model()), lambda: self._tracer)
+        tools = trace_tools(
+            bind_tools_to_ledger(
+                checkpoint_tools(get_document_tools(), lambda: self._checkpoint),
+                lambda: self._ledger,
+            ),
+            lambda: self._tracer,
         )
 
         self.agent = CodeAgent(
-            tools=[
-                parse_document_tool,
-                validate_invoice_math_tool,
-                reconcile_invoice_with_db_tool,
-                get_invoice_from_db_tool,
-                upsert_invoice_in_db_tool,
-                create_ticket_in_db_tool,
-                draft_email_tool,
-                send_email_tool,
-            ],
+            tools=tools,
             model=self.model,
             # domain-specific system instructions
             instructions=SMOL_SYSTEM_INSTRUCTIONS,
             add_base_tools=True,
-            max_steps=20,
+            max_steps=DOCUMENT_MAX_STEPS,
+            step_callbacks=[step_callback(lambda: self._tracer)],
         )
 
     def run(
@@ -105,6 +110,11 @@ class SmolDocumentAgent:
         """
         Run the full invoice/ticket workflow on a single PDF.
 
+        The summary is assembled from the tool calls recorded during the run,
+        so a malformed or missing final answer never loses finished work.
+        Stages completed by an earlier, failed run on the same PDF are
+        replayed from their checkpoints instead of being redone.
+
         Returns:
             A JSON-serializable dict summarizing the parsed document,
             math check, DB reconciliation, tickets and emails.
@@ -119,31 +129,67 @@ class SmolDocumentAgent:
             f"- user_instruction = {user_instruction or ''!r}\n\n"
             "Use the tools to parse the document, validate math, reconcile with the DB,\n"
             "and send emails or create tickets as needed, following your instructions.\n\n"
-            "When you are done, call final_answer(summary_dict) where summary_dict is a Python dict\n"
-            "with the structure described in your instructions."
+            "When you are done, call final_answer with a one-sentence note."
         )
 
-        # Plan how to solve the task
-        raw_result = self.agent.run(
-            task,
-            additional_args={
-                "file_path": file_path_str,
-                "user_instruction": user_instruction or "",
-            },
+        store = get_checkpoint_store(DB_PATH)
+        checkpoint = (
+            RunCheckpoint(store, file_content_hash(file_path))
+            if store is not None and Path(file_path).exists()
+            else None
         )
-
-        # Try to parse as JSON, but fall back to the raw output in case of errors.
-        if isinstance(raw_result, dict):
-            return raw_result
-
-        try:
-            return json.loads(raw_result)
-        except (json.JSONDecodeError, TypeError) as e:
-            # Agent returned invalid JSON - log the raw result for debugging
-            return {
-                "error": f"Agent returned invalid JSON: {str(e)}",
-                "raw_output": str(raw_result),
-                "doc_type": "error",
-                "parsed_invoice": None,
-                "parsed_ticket": None,
-            }
+        completed = checkpoint.completed_stages() if checkpoint is not None else []
+        if completed:
+            task += (
+                "\n\nA previous attempt on this document failed after completing: "
+                f"{', '.join(completed)}. Call the tools as usual: completed stages "
+                "return their recorded results at once, and emails or tickets are "
+                "not sent or created twice."
+            )
+
+        start = time.perf_counter()
+        ledger = RunLedger()
+        raw_result: Any = None
+        error: Optional[str] = None
+        with traced_run("document_workflow", DB_PATH, file=Path(file_path).name) as tracer:
+            self._ledger = ledger
+            self._tracer = tracer
+            self._checkpoint = checkpoint
+            try:
+                # Plan how to solve the task
+                raw_result = self.agent.run(
+                    task,
+                    additional_args={
+                        "file_path": file_path_str,
+                        "user_instruction": user_instruction or "",
+                    },
+                )
+            except Exception as e:
+                error = f"Agent run failed: {e}"
+            finally:
+                self._ledger = None
+                self._tracer = None
+                self._checkpoint = None
+
+            summary = ledger.build_summary()
+            summary["agent_note"] = str(raw_result) if raw_result is not None else None
+
+            if error is not None:
+                summary["error"] = error
+            if summary["doc_type"] is None:
+                # The document was never parsed, nothing usable came out of the run
+                summary["doc_type"] = "error"
+                summary.setdefault("error", "The agent finished without parsing the document.")
+
+            if checkpoint is not None:
+                summary["resumed_stages"] = sorted(set(checkpoint.replayed))
+                if "error" not in summary:
+                    # Finished: a later run of this PDF starts from scratch
+                    checkpoint.clear()
+
+            if "error" in summary:
+                mark_error(tracer, summary["error"])
+            summary["run_id"] = tracer.run_id if tracer is not None else None
+
+        metrics.record_document("agent", summary, time.perf_counter() - start)
+        return summary
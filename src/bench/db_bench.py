@@ -0,0 +1,230 @@
+"""
+Micro-benchmarks of DBClient on a large finance DB.
+
+Times get_invoice, upsert_invoice, create_ticket, list_tickets_for_invoice,
+find_invoice (IDs spelled differently) and lookup_invoices (fuzzy), each with 1..N threads sharing the DB file the
+way Streamlit sessions do, and prints ops/sec and latency percentiles as
+JSON. Without --db a temporary DB is filled by src.bench.db_load first.
+Note that the write benchmarks add rows to the DB.
+
+Usage:
+    python -m src.bench.db_bench --invoices 200000 --ops 2000 --threads 1 4 8
+    python -m src.bench.db_bench --db data/finance_load.db --ops 5000
+"""
+import argparse
+import itertools
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from src.bench.db_load import populate_finance_db
+from src.bench.stats import latency_summary
+from src.db.db_client import DBClient
+from src.db.init_db import apply_schema
+
+OPERATIONS = (
+    "get_invoice",
+    "upsert_invoice",
+    "create_ticket",
+    "list_tickets_for_invoice",
+    "find_invoice",
+    "lookup_invoices",
+)
+
+
+def _sample_column(db_path: Path, table: str, column: str, size: int, seed: int) -> List[str]:
+    """
+    `size` values of `column` drawn by random rowid. Sampling tickets this
+    way weights invoices by their ticket count, like real lookups would.
+    """
+    rng = random.Random(seed)
+    with sqlite3.connect(db_path) as conn:
+        max_rowid = conn.execute(f"SELECT MAX(rowid) FROM {table}").fetchone()[0] or 0
+        if max_rowid == 0:
+            return []
+        rowids = [rng.randint(1, max_rowid) for _ in range(size)]
+        values: List[str] = []
+        for start in range(0, len(rowids), 500):
+            chunk = rowids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            values.extend(
+                row[0]
+                for row in conn.execute(
+                    f"SELECT {column} FROM {table} WHERE rowid IN ({placeholders})", chunk
+                )
+            )
+    return values
+
+
+def run_operation(
+    name: str,
+    op: Callable[[int], Any],
+    ops: int,
+    threads: int,
+) -> Dict[str, Any]:
+    """Call `op(i)` for i in range(ops) from `threads` threads and time every call."""
+    latencies: List[float] = []
+    errors: List[str] = []
+    lock = threading.Lock()
+
+    def _call(i: int) -> None:
+        start = time.perf_counter()
+        try:
+            op(i)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            return
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(_call, range(ops)))
+    wall = time.perf_counter() - start
+
+    return {
+        "operation": name,
+        "threads": threads,
+        "ops": ops,
+        "errors": len(errors),
+        "error_examples": sorted(set(errors))[:3],
+        "wall_seconds": round(wall, 3),
+        "ops_per_sec": round(len(latencies) / wall, 1) if wall else None,
+        "latency": latency_summary(latencies),
+    }
+
+
+def _operations(db_path: Path, sample_size: int, seed: int) -> Dict[str, Callable[[int], Any]]:
+    db = DBClient(db_path)
+    invoice_ids = _sample_column(db_path, "invoices", "invoice_id", sample_size, seed)
+    ticketed_ids = _sample_column(db_path, "tickets", "invoice_id", sample_size, seed) or invoice_ids
+    if not invoice_ids:
+        raise ValueError(f"No invoices in {db_path}, fill it with src.bench.db_load first")
+
+    # Unique across runs and threads
+    new_ids = itertools.count()
+    run_tag = f"{int(time.time()):x}"
+
+    def get_invoice(i: int) -> Any:
+        return db.get_invoice(invoice_ids[i % len(invoice_ids)])
+
+    def upsert_invoice(i: int) -> Any:
+        # Half updates of existing rows, half inserts
+        if i % 2:
+            invoice_id = invoice_ids[i % len(invoice_ids)]
+        else:
+            invoice_id = f"INV-BENCH-{run_tag}-{next(new_ids):08d}"
+        return db.upsert_invoice(
+            {
+                "invoice_id": invoice_id,
+                "supplier_name": "BENCH SUPPLIER",
+                "customer_name": "ACME ANALYTICS LLC",
+                "invoice_date": "2025-01-15",
+                "due_date": "2025-02-14",
+                "total_amount": 100.0 + i,
+                "tax_amount": 8.88,
+                "currency": "USD",
+            }
+        )
+
+    def create_ticket(i: int) -> Any:
+        return db.create_ticket(
+            invoice_id=invoice_ids[i % len(invoice_ids)],
+            issue_type="Amount mismatch",
+            description="Benchmark ticket",
+            recorded_amount=100.0,
+            # Distinct amounts, otherwise every call after the first is a dedup hit
+            document_amount=101.0 + i,
+        )
+
+    def list_tickets_for_invoice(i: int) -> Any:
+        return db.list_tickets_for_invoice(ticketed_ids[i % len(ticketed_ids)])
+
+    def find_invoice(i: int) -> Any:
+        # As extracted from a file name: INV_2025_0000042
+        return db.find_invoice(invoice_ids[i % len(invoice_ids)].replace("-", "_"))
+
+    def lookup_invoices(i: int) -> Any:
+        # One digit off, so the exact key misses
+        invoice_id = invoice_ids[i % len(invoice_ids)]
+        return db.lookup_invoices(invoice_id[:-1] + str((int(invoice_id[-1]) + 1) % 10))
+
+    return {
+        "get_invoice": get_invoice,
+        "upsert_invoice": upsert_invoice,
+        "create_ticket": create_ticket,
+        "list_tickets_for_invoice": list_tickets_for_invoice,
+        "find_invoice": find_invoice,
+        "lookup_invoices": lookup_invoices,
+    }
+
+
+def run_db_bench(
+    db_path: Optional[Path] = None,
+    invoices: int = 100_000,
+    ops: int = 2000,
+    threads: Sequence[int] = (1, 4),
+    operations: Sequence[str] = OPERATIONS,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """Benchmark `operations` on `db_path` (or on a fresh DB of `invoices` invoices)."""
+    tmp_dir = None
+    load_report = None
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = Path(tmp_dir.name) / "db_bench.db"
+        load_report = populate_finance_db(db_path, invoices=invoices, seed=seed)
+    else:
+        # Bring an older DB up to the current schema (indexes, new tables)
+        apply_schema(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        sizes = {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("invoices", "tickets")
+        }
+
+    funcs = _operations(Path(db_path), sample_size=min(ops, 10_000), seed=seed)
+    results = [
+        run_operation(name, funcs[name], ops, n)
+        for name in operations
+        for n in threads
+    ]
+
+    report = {"db_rows": sizes, "load": load_report, "results": results}
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, default=None, help="existing DB (default: fresh temporary DB)")
+    parser.add_argument("--invoices", type=int, default=100_000, help="size of the temporary DB")
+    parser.add_argument("--ops", type=int, default=2000, help="calls per operation and thread count")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4])
+    parser.add_argument("--operations", nargs="+", choices=OPERATIONS, default=list(OPERATIONS))
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run_db_bench(
+        db_path=args.db,
+        invoices=args.invoices,
+        ops=args.ops,
+        threads=args.threads,
+        operations=args.operations,
+        seed=args.seed,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Fill a finance DB with realistic invoices and tickets at scale.
+
+Suppliers follow a Zipf-like distribution (a few suppliers send most of the
+invoices) and tickets are heavy-tailed: most invoices have none or a few,
+a small share of "hot" invoices collects hundreds.
+
+Usage:
+    python -m src.bench.db_load --db data/finance_load.db --invoices 1000000
+"""
+import argparse
+import json
+import random
+import sqlite3
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Tuple
+
+from src.bench.synthetic_invoices import CUSTOMER, ISSUE_TYPES, SUPPLIERS, supplier_weights
+from src.db.fuzzy_index import (
+    add_invoice_keys,
+    add_supplier_keys,
+    normalize_invoice_id,
+    normalize_supplier_name,
+)
+from src.db.init_db import apply_schema
+
+CHUNK_SIZE = 50_000
+
+
+def _invoice_rows(
+    count: int,
+    rng: random.Random,
+    start_index: int,
+) -> Iterator[Tuple[Any, ...]]:
+    weights = supplier_weights()
+    suppliers = [name for name, _ in SUPPLIERS]
+    first_day = date(2023, 1, 1)
+    for i in range(start_index, start_index + count):
+        issued = first_day + timedelta(days=rng.randrange(3 * 365))
+        subtotal = round(rng.lognormvariate(7.0, 1.0), 2)
+        tax = round(subtotal * 0.08875, 2)
+        yield (
+            f"INV-{issued.year}-{i:07d}",
+            rng.choices(suppliers, weights=weights)[0],
+            CUSTOMER,
+            issued.isoformat(),
+            (issued + timedelta(days=30)).isoformat(),
+            round(subtotal + tax, 2),
+            tax,
+            "USD",
+            rng.choice(["recorded", "recorded", "paid", "pending"]),
+        )
+
+
+def _ticket_count(
+    rng: random.Random,
+    tickets_per_invoice: float,
+    hot_invoice_share: float,
+    hot_tickets: int,
+) -> int:
+    if rng.random() < hot_invoice_share:
+        return rng.randint(hot_tickets // 2, hot_tickets * 2)
+    return int(rng.expovariate(1.0 / tickets_per_invoice)) if tickets_per_invoice > 0 else 0
+
+
+def populate_finance_db(
+    db_path: Path,
+    invoices: int = 100_000,
+    tickets_per_invoice: float = 2.0,
+    hot_invoice_share: float = 0.005,
+    hot_tickets: int = 200,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Append `invoices` invoices and their tickets to `db_path` (schema is
+    applied first). Rows are written in chunks of executemany.
+
+    Returns counts and timing of the load.
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    apply_schema(db_path)
+    rng = random.Random(seed)
+
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_path)
+    try:
+        # Bulk load: durability of a throw-away benchmark DB does not matter
+        conn.execute("PRAGMA synchronous = OFF")
+
+        start_index = conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+        ticket_seq = conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+        ticket_total = 0
+        max_tickets = 0
+
+        invoice_chunk: List[Tuple[Any, ...]] = []
+        ticket_chunk: List[Tuple[Any, ...]] = []
+
+        def _flush() -> None:
+            # Matching keys as DBClient.upsert_invoice would write them
+            keyed = [
+                (*row, normalize_invoice_id(row[0]), normalize_supplier_name(row[1]))
+                for row in invoice_chunk
+            ]
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO invoices (
+                    invoice_id, supplier_name, customer_name, invoice_date,
+                    due_date, total_amount, tax_amount, currency, status,
+                    invoice_key, supplier_key
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                keyed,
+            )
+            add_invoice_keys(conn, (row[-2] for row in keyed))
+            add_supplier_keys(conn, (row[-1] for row in keyed))
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO tickets (
+                    ticket_id, invoice_id, created_date, created_by, department,
+                    status, priority, issue_type, recorded_amount, document_amount,
+                    description
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                ticket_chunk,
+            )
+            conn.commit()
+            invoice_chunk.clear()
+            ticket_chunk.clear()
+
+        for row in _invoice_rows(invoices, rng, start_index):
+            invoice_chunk.append(row)
+            invoice_id, issued, total = row[0], date.fromisoformat(row[3]), row[5]
+
+            count = _ticket_count(rng, tickets_per_invoice, hot_invoice_share, hot_tickets)
+            max_tickets = max(max_tickets, count)
+            for _ in range(count):
+                ticket_seq += 1
+                created = issued + timedelta(days=rng.randrange(1, 90))
+                ticket_chunk.append(
+                    (
+                        f"TCK-LOAD-{ticket_seq:09d}",
+                        invoice_id,
+                        created.isoformat(),
+                        "Load generator",
+                        "Finance",
+                        rng.choice(["Open", "In Progress", "Resolved", "Closed"]),
+                        rng.choice(["Low", "Medium", "High"]),
+                        rng.choice(ISSUE_TYPES),
+                        round(total - rng.uniform(1, 200), 2),
+                        total,
+                        f"Synthetic discrepancy on {invoice_id}.",
+                    )
+                )
+            ticket_total += count
+
+            if len(invoice_chunk) + len(ticket_chunk) >= CHUNK_SIZE:
+                _flush()
+        _flush()
+    finally:
+        conn.close()
+
+    seconds = time.perf_counter() - start
+    return {
+        "db_path": str(db_path),
+        "invoices": invoices,
+        "tickets": ticket_total,
+        "max_tickets_per_invoice": max_tickets,
+        "seconds": round(seconds, 2),
+        "rows_per_sec": round((invoices + ticket_total) / seconds, 1) if seconds else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--db", type=Path, required=True, help="database to fill (created if missing)")
+    parser.add_argument("--invoices", type=int, default=100_000)
+    parser.add_argument("--tickets-per-invoice", type=float, default=2.0, help="mean for ordinary invoices")
+    parser.add_argument("--hot-invoice-share", type=float, default=0.005)
+    parser.add_argument("--hot-tickets", type=int, default=200, help="typical tickets of a hot invoice")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = populate_finance_db(
+        args.db,
+        invoices=args.invoices,
+        tickets_per_invoice=args.tickets_per_invoice,
+        hot_invoice_share=args.hot_invoice_share,
+        hot_tickets=args.hot_tickets,
+        seed=args.seed,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
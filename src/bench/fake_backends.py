@@ -0,0 +1,265 @@
+"""
+Local stand-ins for the external backends of the document pipeline.
+
+- FakeOllamaServer: an HTTP server speaking the subset of the Ollama API
+  the app uses (/api/chat, /api/show, /api/generate, /api/embed). Structured
+  extraction requests (single or batched) are answered by reading the
+  fields out of the prompt with regexes, after a configurable latency.
+- CannedParser: returns canned LlamaParse markdown for a document name
+  instead of uploading the PDF to LlamaCloud.
+"""
+import json
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+CANNED_DIR = Path(__file__).resolve().parent / "canned"
+
+_TEXT_MARKERS = ("INVOICE TEXT:\n", "TICKET TEXT:\n", "INVOICES:\n", "TICKETS:\n")
+_DOCUMENT_SEPARATOR_RE = re.compile(r"^=== DOCUMENT (\d+) ===$", re.MULTILINE)
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    match = re.search(r"-?[\d,]+(?:\.\d+)?", value)
+    return float(match.group().replace(",", "")) if match else None
+
+
+def _search(pattern: str, text: str) -> Optional[str]:
+    match = re.search(pattern, text, re.MULTILINE)
+    return match.group(1).strip() if match else None
+
+
+def _table_amount(label_prefix: str, text: str) -> Optional[float]:
+    """Last non-empty cell of the table row whose first cell starts with `label_prefix`."""
+    for line in text.splitlines():
+        cells = [c.strip() for c in line.strip().strip("|").split("|")]
+        if line.strip().startswith("|") and cells[0].lower().startswith(label_prefix.lower()):
+            values = [c for c in cells[1:] if c]
+            return _number(values[-1]) if values else None
+    return None
+
+
+def _field_rows(text: str) -> Dict[str, str]:
+    """`| Label | Value |` rows of the ticket tables."""
+    rows = {}
+    for line in text.splitlines():
+        cells = [c.strip() for c in line.strip().strip("|").split("|")]
+        if line.strip().startswith("|") and len(cells) == 2:
+            rows[cells[0].lower()] = cells[1]
+    return rows
+
+
+def extract_invoice_fields(text: str) -> Dict[str, Any]:
+    supplier = None
+    for heading in re.findall(r"^# (.+)$", text, re.MULTILINE):
+        if heading.strip().upper() != "INVOICE":
+            supplier = heading.strip()
+            break
+    email = _search(r"contact: (\S+@\S+)", text)
+    return {
+        "invoice_id": _search(r"Invoice #: (\S+)", text),
+        "supplier_name": supplier,
+        "customer_name": _search(r"^\*\*Bill To:\*\*\n(.+)$", text),
+        "invoice_date": _search(r"Invoice Date: (.+)$", text),
+        "due_date": _search(r"Due Date: (.+)$", text),
+        "total_amount": _table_amount("Total", text),
+        "tax_amount": _table_amount("Sales Tax", text) or _table_amount("VAT", text),
+        "currency": _search(r"Currency: (\w+)", text),
+        "contact_email": email.rstrip(".") if email else None,
+    }
+
+
+def extract_ticket_fields(text: str) -> Dict[str, Any]:
+    rows = _field_rows(text)
+    description = text.split("## Description", 1)[1].strip() if "## Description" in text else None
+    return {
+        "ticket_id": rows.get("ticket id"),
+        "invoice_id": rows.get("invoice id"),
+        "created_date": rows.get("created date"),
+        "created_by": rows.get("created by"),
+        "department": rows.get("department"),
+        "status": rows.get("status"),
+        "priority": rows.get("priority"),
+        "issue_type": rows.get("issue type"),
+        "recorded_amount": _number(rows.get("recorded amount")),
+        "document_amount": _number(rows.get("document amount")),
+        "description": description,
+    }
+
+
+def fake_completion(prompt: str, schema: Any) -> str:
+    """What the fake model answers: JSON fields for extraction prompts, a stock reply otherwise."""
+    text = prompt
+    for marker in _TEXT_MARKERS:
+        if marker in prompt:
+            text = prompt.split(marker, 1)[1]
+
+    title = schema.get("title") if isinstance(schema, dict) else None
+    if title in ("ParsedInvoiceBatch", "ParsedTicketBatch"):
+        # Batch prompt: one item per "=== DOCUMENT n ===" section
+        extract = extract_invoice_fields if title == "ParsedInvoiceBatch" else extract_ticket_fields
+        parts = _DOCUMENT_SEPARATOR_RE.split(text)[1:]
+        items = [
+            {"index": int(number), **extract(section)}
+            for number, section in zip(parts[::2], parts[1::2])
+        ]
+        return json.dumps({"items": items})
+    if title == "ParsedInvoice":
+        fields = extract_invoice_fields(text)
+    elif title == "ParsedTicket":
+        fields = extract_ticket_fields(text)
+    else:
+        return "Hello,\n\nPlease review the attached discrepancy.\n\nBest regards,\nAccounts Payable"
+
+    properties = schema.get("properties", {})
+    return json.dumps({k: v for k, v in fields.items() if k in properties})
+
+
+class FakeOllamaServer:
+    """
+    Threaded local server answering like Ollama after `latency_seconds`
+    (plus up to `jitter_seconds` of uniform noise) per request.
+
+    Use as a context manager; `base_url` is what Ollama(base_url=...) needs.
+    """
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        jitter_seconds: float = 0.0,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        seed: int = 0,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.jitter_seconds = jitter_seconds
+        self.requests = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _delay(self) -> None:
+        with self._lock:
+            self.requests += 1
+            delay = self.latency_seconds + self._rng.uniform(0, self.jitter_seconds)
+        if delay > 0:
+            time.sleep(delay)
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def _reply(self, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                request = json.loads(self.rfile.read(length) or b"{}")
+                server._delay()
+                now = datetime.now(timezone.utc).isoformat()
+                model = request.get("model", "fake")
+
+                if self.path == "/api/chat":
+                    prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+                    content = fake_completion(prompt, request.get("format"))
+                    self._reply(
+                        {
+                            "model": model,
+                            "created_at": now,
+                            "message": {"role": "assistant", "content": content},
+                            "done": True,
+                            "done_reason": "stop",
+                            "prompt_eval_count": len(prompt) // 4,
+                            "eval_count": len(content) // 4,
+                        }
+                    )
+                elif self.path == "/api/generate":
+                    self._reply({"model": model, "created_at": now, "response": "", "done": True})
+                elif self.path == "/api/show":
+                    # llama_index reads the context window from here once
+                    self._reply(
+                        {
+                            "details": {"family": "fake"},
+                            "model_info": {"fake.context_length": 32768},
+                            "capabilities": ["completion"],
+                        }
+                    )
+                elif self.path == "/api/embed":
+                    inputs = request.get("input") or [""]
+                    count = 1 if isinstance(inputs, str) else len(inputs)
+                    self._reply({"model": model, "embeddings": [[0.0] * 8 for _ in range(count)]})
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-ollama", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class CannedParser:
+    """
+    Stand-in for parse_pdf_to_markdown: markdown by document name, after
+    `latency_seconds` (LlamaParse upload + job polling).
+    """
+
+    def __init__(
+        self,
+        documents: Iterable[Tuple[str, str]] = (),
+        latency_seconds: float = 0.0,
+        canned_dir: Optional[Path] = CANNED_DIR,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self._documents: Dict[str, str] = {}
+        if canned_dir is not None:
+            for path in sorted(Path(canned_dir).glob("*.md")):
+                self._documents[f"{path.stem}.pdf"] = path.read_text(encoding="utf-8")
+        self._documents.update(documents)
+
+    @property
+    def names(self) -> list:
+        return list(self._documents)
+
+    def parse(self, name: str) -> str:
+        if self.latency_seconds > 0:
+            time.sleep(self.latency_seconds)
+        try:
+            return self._documents[Path(name).name]
+        except KeyError:
+            raise FileNotFoundError(f"No canned markdown for {name}") from None
@@ -0,0 +1,114 @@
+"""
+Import-time report for the app entry point.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+aggregates the self time of every imported module per top-level package.
+
+Exits with status 1 when a deferred package is imported or the total is
+over the start-up budget, so it can gate a benchmark job.
+
+Usage:
+    python -m src.bench.import_time
+    python -m src.bench.import_time --module streamlit_app --top 15 --json
+    python -m src.bench.import_time --budget-ms 1500
+"""
+import argparse
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Packages that must only be imported on first use, never at app start-up
+DEFERRED_PACKAGES = (
+    "smolagents",
+    "llama_index",
+    "llama_parse",
+    "llama_cloud",
+    "googleapiclient",
+    "google_auth_oauthlib",
+)
+
+# Generous on purpose: streamlit alone is ~250 ms, the eager imports we
+# removed cost several seconds. Wall-clock, so checked here rather than in
+# the unit tests, where a slow or loaded machine would fail it.
+STARTUP_IMPORT_BUDGET_MS = 2500
+
+
+def measure_import_time(module: str = "streamlit_app") -> Dict[str, Any]:
+    """
+    Import `module` in a fresh interpreter and return a per-package report:
+
+        {
+          "module": "streamlit_app",
+          "total_ms": 812.4,
+          "packages": {"streamlit": 402.1, "pandas": 150.3, ...}  # desc
+        }
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{proc.stderr[-2000:]}")
+
+    per_package: Dict[str, float] = defaultdict(float)
+    for line in proc.stderr.splitlines():
+        # "import time:       123 |        456 |     package.module"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        try:
+            self_us, _cumulative_us, name = line[len("import time:"):].split("|")
+        except ValueError:
+            continue
+        package = name.strip().split(".")[0]
+        per_package[package] += int(self_us) / 1000.0
+
+    packages = dict(
+        sorted(
+            ((p, round(ms, 2)) for p, ms in per_package.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+    )
+    return {
+        "module": module,
+        "total_ms": round(sum(per_package.values()), 2),
+        "packages": packages,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="streamlit_app")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_IMPORT_BUDGET_MS)
+    args = parser.parse_args()
+
+    report = measure_import_time(args.module)
+    deferred = [p for p in DEFERRED_PACKAGES if p in report["packages"]]
+    over_budget = report["total_ms"] > args.budget_ms
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        sys.exit(1 if deferred or over_budget else 0)
+
+    print(f"import {report['module']}: {report['total_ms']:.1f} ms total")
+    for package, ms in list(report["packages"].items())[: args.top]:
+        print(f"  {ms:9.1f} ms  {package}")
+
+    if deferred:
+        print(f"WARNING: imported at start-up but should be deferred: {', '.join(deferred)}")
+    if over_budget:
+        print(f"WARNING: over the start-up budget of {args.budget_ms:.0f} ms")
+    sys.exit(1 if deferred or over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Offline load test of the email outbox path.
+
+Enqueues N messages into a throw-away database and drains them with one or
+more OutboxSender threads over a FakeGmailBackend with configurable latency
+and failure rate. Prints a JSON report (messages/sec, batches, attempts).
+
+Usage:
+    python -m src.bench.outbox_load --messages 5000 --senders 2 --latency 0.05
+"""
+import argparse
+import json
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+from src.db.init_db import apply_schema
+from src.db.outbox import Outbox
+from src.mail.backends import FakeGmailBackend
+from src.mail.sender import OutboxSender
+
+
+def run_outbox_load(
+    messages: int = 1000,
+    senders: int = 1,
+    batch_size: int = 20,
+    latency_seconds: float = 0.0,
+    per_message_seconds: float = 0.0,
+    failure_rate: float = 0.0,
+    db_path: Path | None = None,
+) -> Dict[str, Any]:
+    """Enqueue `messages` emails, drain them and return throughput stats."""
+    tmp_dir = None
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = Path(tmp_dir.name) / "outbox_load.db"
+    apply_schema(db_path)
+
+    outbox = Outbox(db_path)
+    backend = FakeGmailBackend(
+        latency_seconds=latency_seconds,
+        per_message_seconds=per_message_seconds,
+        failure_rate=failure_rate,
+        seed=0,
+    )
+
+    start = time.perf_counter()
+    for i in range(messages):
+        outbox.enqueue(f"supplier{i}@example.com", f"Invoice INV-{i:06d}", "Hello")
+    enqueue_seconds = time.perf_counter() - start
+
+    workers = [
+        OutboxSender(
+            outbox,
+            backend,
+            batch_size=batch_size,
+            backoff_seconds=0.0,
+            poll_interval_seconds=0.01,
+        )
+        for _ in range(senders)
+    ]
+
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    while True:
+        counts = outbox.counts()
+        if counts.get("pending", 0) == 0 and counts.get("sending", 0) == 0:
+            break
+        time.sleep(0.01)
+    drain_seconds = time.perf_counter() - start
+    for worker in workers:
+        worker.stop()
+
+    report = {
+        "messages": messages,
+        "senders": senders,
+        "batch_size": batch_size,
+        "enqueue_per_sec": round(messages / enqueue_seconds, 1) if enqueue_seconds else None,
+        "drain_seconds": round(drain_seconds, 3),
+        "sent_per_sec": round(len(backend.sent) / drain_seconds, 1) if drain_seconds else None,
+        "batches": backend.batches,
+        "status_counts": outbox.counts(),
+    }
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--messages", type=int, default=1000)
+    parser.add_argument("--senders", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per batch")
+    parser.add_argument("--per-message", type=float, default=0.0, help="seconds per message")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    report = run_outbox_load(
+        messages=args.messages,
+        senders=args.senders,
+        batch_size=args.batch_size,
+        latency_seconds=args.latency,
+        per_message_seconds=args.per_message,
+        failure_rate=args.failure_rate,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+"""
+Offline end-to-end benchmark of the document pipeline.
+
+Drives parse -> classify -> extract -> math -> reconcile -> ticket/upsert
+for the sample invoices and N synthetic documents, against local
+stand-ins: canned LlamaParse markdown and a fake Ollama server with
+configurable latency. The classifier, extraction client (real llama_index
+Ollama client over HTTP), math check, reconciliation and DB writes are the
+production code. Prints a JSON report with per-stage p50/p95 and
+documents per second.
+
+Usage:
+    python -m src.bench.pipeline_bench --documents 1000 --workers 4
+    python -m src.bench.pipeline_bench --documents 10000 --ollama-latency 0.05 --parse-latency 0.2
+"""
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.bench.fake_backends import CANNED_DIR, CannedParser, FakeOllamaServer
+from src.bench.stats import latency_summary
+from src.bench.synthetic_invoices import generate_documents, seed_recorded_invoices
+
+STAGES = ("parse", "classify", "extract", "math", "reconcile", "ticket", "upsert")
+
+
+class StageTimer:
+    """Thread-safe collection of per-stage durations."""
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds[name].append(elapsed)
+
+    def record(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[name].append(seconds)
+
+
+def process_document(name: str, parser: CannedParser, db_path: Path, timer: StageTimer) -> str:
+    """
+    Run one document through the pipeline, following the agent's policy.
+
+    Returns the outcome: match / mismatch / new / math_error / ticket /
+    unknown.
+    """
+    from src.db.db_client import DBClient
+    from src.db.document_store import DocumentStore
+    from src.parsing.document_classifier import classify_document_from_text
+    from src.parsing.invoice_parser import parse_invoice_text
+    from src.parsing.ticket_parser import parse_ticket_text
+    from src.tools.math_tools import validate_invoice_math_tool
+    from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
+
+    db = DBClient(db_path)
+
+    with timer.stage("parse"):
+        text = parser.parse(name)
+        document = DocumentStore(db_path).put(text, source_path=name)
+
+    with timer.stage("classify"):
+        doc_type = classify_document_from_text(text)["doc_type"]
+
+    if doc_type == "ticket":
+        with timer.stage("extract"):
+            ticket = parse_ticket_text(text, document=document)
+        with timer.stage("ticket"):
+            db.create_ticket(
+                invoice_id=ticket.invoice_id or "",
+                issue_type=ticket.issue_type or "Unknown",
+                description=ticket.description or "",
+                recorded_amount=ticket.recorded_amount,
+                document_amount=ticket.document_amount,
+            )
+        return "ticket"
+    if doc_type != "invoice":
+        return "unknown"
+
+    with timer.stage("extract"):
+        parsed = parse_invoice_text(text, document=document).model_dump()
+
+    with timer.stage("math"):
+        # The text itself is passed: the tool's DocumentStore is the app DB
+        math_check = validate_invoice_math_tool(parsed_invoice=parsed, document=text)
+    if math_check["is_valid"] is False:
+        return "math_error"
+
+    with timer.stage("reconcile"):
+        db_invoice = db.get_invoice(parsed["invoice_id"]) if parsed["invoice_id"] else None
+        reconciliation = reconcile_invoice_with_db_tool(parsed_invoice=parsed, db_invoice=db_invoice)
+
+    if reconciliation["is_match"] is None:
+        with timer.stage("upsert"):
+            db.upsert_invoice(parsed, source_file=name)
+        return "new"
+    if reconciliation["is_match"] is False:
+        with timer.stage("ticket"):
+            db.create_ticket(
+                invoice_id=parsed["invoice_id"],
+                issue_type="Amount mismatch",
+                description="; ".join(reconciliation["differences"]),
+                recorded_amount=db_invoice.get("total_amount") if db_invoice else None,
+                document_amount=parsed.get("total_amount"),
+            )
+        return "mismatch"
+    return "match"
+
+
+def run_pipeline_bench(
+    documents: int = 200,
+    workers: int = 1,
+    ollama_latency_seconds: float = 0.0,
+    ollama_jitter_seconds: float = 0.0,
+    parse_latency_seconds: float = 0.0,
+    include_samples: bool = True,
+    seed: int = 0,
+    db_path: Optional[Path] = None,
+) -> Dict[str, Any]:
+    """Process the samples plus `documents` synthetic documents and return the report."""
+    from llama_index.llms.ollama import Ollama
+
+    from src.agent.registry import LLM_MODEL, REGISTRY
+    from src.db.init_db import init_db
+
+    tmp_dir = None
+    if db_path is None:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_path = Path(tmp_dir.name) / "pipeline_bench.db"
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Schema plus the usual seed row, so the samples hit the mismatch path too
+        init_db(db_path, seed=True)
+
+    synthetic = list(generate_documents(documents, seed=seed))
+    seed_recorded_invoices(db_path, synthetic)
+    parser = CannedParser(
+        [(d["name"], d["markdown"]) for d in synthetic],
+        latency_seconds=parse_latency_seconds,
+        canned_dir=CANNED_DIR if include_samples else None,
+    )
+    expected = {d["name"]: d["scenario"] for d in synthetic}
+
+    timer = StageTimer()
+    outcomes: Dict[str, str] = {}
+    errors: List[str] = []
+
+    def _run(name: str) -> None:
+        start = time.perf_counter()
+        try:
+            outcomes[name] = process_document(name, parser, db_path, timer)
+        except Exception as e:
+            outcomes[name] = "error"
+            errors.append(f"{name}: {e}")
+        timer.record("document", time.perf_counter() - start)
+
+    with FakeOllamaServer(ollama_latency_seconds, ollama_jitter_seconds, seed=seed) as server:
+        llm = Ollama(model=LLM_MODEL, base_url=server.base_url, request_timeout=60.0)
+        with REGISTRY.override("ollama_llm", llm):
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(_run, parser.names))
+            wall_seconds = time.perf_counter() - start
+        ollama_requests = server.requests
+
+    wrong = sorted(n for n, scenario in expected.items() if outcomes.get(n) != scenario)
+    report = {
+        "documents": len(parser.names),
+        "synthetic_documents": documents,
+        "workers": workers,
+        "ollama_latency_seconds": ollama_latency_seconds,
+        "parse_latency_seconds": parse_latency_seconds,
+        "wall_seconds": round(wall_seconds, 3),
+        "docs_per_sec": round(len(parser.names) / wall_seconds, 2) if wall_seconds else None,
+        "ollama_requests": ollama_requests,
+        "document": latency_summary(timer.seconds["document"]),
+        "stages": {stage: latency_summary(timer.seconds[stage]) for stage in STAGES},
+        "outcomes": dict(Counter(outcomes.values())),
+        "unexpected_outcomes": len(wrong),
+        "unexpected_examples": wrong[:5],
+        "errors": errors[:5],
+    }
+
+    if tmp_dir is not None:
+        tmp_dir.cleanup()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, default=200, help="synthetic documents (up to 10k+)")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--ollama-latency", type=float, default=0.0, help="seconds per Ollama call")
+    parser.add_argument("--ollama-jitter", type=float, default=0.0, help="extra uniform noise, seconds")
+    parser.add_argument("--parse-latency", type=float, default=0.0, help="seconds per LlamaParse call")
+    parser.add_argument("--no-samples", action="store_true", help="skip the canned sample invoices")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    report = run_pipeline_bench(
+        documents=args.documents,
+        workers=args.workers,
+        ollama_latency_seconds=args.ollama_latency,
+        ollama_jitter_seconds=args.ollama_jitter,
+        parse_latency_seconds=args.parse_latency,
+        include_samples=not args.no_samples,
+        seed=args.seed,
+    )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+from typing import Dict, List, Optional
+
+from src.observability.stats import percentile
+
+
+def latency_summary(seconds: List[float]) -> Dict[str, Optional[float]]:
+    """count / mean / p50 / p95 / p99 / max of a list of durations, in ms."""
+    values = sorted(s * 1000 for s in seconds)
+    if not values:
+        return {"count": 0, "mean_ms": None, "p50_ms": None, "p95_ms": None, "p99_ms": None, "max_ms": None}
+    return {
+        "count": len(values),
+        "mean_ms": round(sum(values) / len(values), 3),
+        "p50_ms": round(percentile(values, 50), 3),  # type: ignore[arg-type]
+        "p95_ms": round(percentile(values, 95), 3),  # type: ignore[arg-type]
+        "p99_ms": round(percentile(values, 99), 3),  # type: ignore[arg-type]
+        "max_ms": round(values[-1], 3),
+    }
@@ -0,0 +1,274 @@
+"""
+Synthetic supplier invoices and discrepancy tickets for offline benchmarks.
+
+Documents are rendered as the markdown LlamaParse returns for the sample
+PDFs (same headings, same line-items table), so the real classifier, math
+check and reconciliation run on them unchanged. Each document carries the
+scenario it was generated for and the invoice row the finance DB should
+hold, if any.
+"""
+import random
+import sqlite3
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple, TypedDict
+
+# Scenarios of a synthetic invoice
+MATCH = "match"            # recorded in the DB with the same amounts
+MISMATCH = "mismatch"      # recorded with a different total -> ticket
+NEW = "new"                # not in the DB yet -> upsert
+MATH_ERROR = "math_error"  # a line total is wrong -> email, no DB change
+TICKET = "ticket"          # a discrepancy ticket document
+
+SUPPLIERS = [
+    ("GOTHAM OFFICE SUPPLIES INC.", "billing@gotham-office.com"),
+    ("WAYNE INDUSTRIAL SERVICES LLC", "ap@wayne-industrial.com"),
+    ("METROPOLIS CLOUD HOSTING", "invoices@metrocloud.io"),
+    ("STAR LABS CONSULTING", "finance@starlabs.com"),
+    ("KORD LOGISTICS", "billing@kordlogistics.com"),
+    ("QUEEN CONSOLIDATED PRINTING", "accounts@qc-printing.com"),
+    ("LEXCORP DATA SERVICES", "ar@lexcorp-data.com"),
+    ("DAILY PLANET MEDIA", "billing@dailyplanet.media"),
+    ("FERRIS AIRCRAFT PARTS", "invoices@ferris-air.com"),
+    ("PALMER TECHNOLOGIES", "ap@palmertech.com"),
+    ("BLUDHAVEN FACILITIES CO.", "billing@bludhaven-fm.com"),
+    ("CENTRAL CITY TRAINING", "finance@cc-training.org"),
+]
+
+CUSTOMER = "ACME ANALYTICS LLC"
+
+CATALOG = [
+    ("Monthly subscription – Financial Reporting Suite", 500.0, 3000.0),
+    ("Premium support (hours)", 90.0, 180.0),
+    ("Onboarding and configuration fee", 300.0, 900.0),
+    ("Office chairs", 120.0, 450.0),
+    ("Printer toner (box)", 40.0, 120.0),
+    ("Cloud storage (TB-month)", 15.0, 30.0),
+    ("Freight and handling", 50.0, 400.0),
+    ("Consulting (days)", 800.0, 1600.0),
+    ("Training seats", 150.0, 600.0),
+    ("Laptop docking station", 180.0, 320.0),
+]
+
+TAX_RATES = [("Sales Tax (NYC 8.875%)", 0.08875), ("Sales Tax (CA 7.25%)", 0.0725), ("VAT (20%)", 0.20)]
+
+ISSUE_TYPES = ["Amount mismatch", "Tax issue", "Duplicate invoice", "Missing PO"]
+
+
+class SyntheticDocument(TypedDict):
+    """One generated document and what the pipeline should find in it."""
+
+    name: str
+    doc_type: str                     # invoice / ticket
+    scenario: str
+    markdown: str
+    invoice: Dict[str, Any]           # fields as they appear on the document
+    recorded: Optional[Dict[str, Any]]  # row the finance DB holds, None if absent
+
+
+def supplier_weights(count: int = len(SUPPLIERS), skew: float = 1.2) -> List[float]:
+    """Zipf-like weights: a few suppliers send most of the invoices."""
+    return [1.0 / (rank ** skew) for rank in range(1, count + 1)]
+
+
+def _money(value: float) -> str:
+    return f"{value:,.2f}"
+
+
+def _fmt_date(d: date) -> str:
+    return d.strftime("%B %d, %Y")
+
+
+def render_invoice_markdown(
+    invoice: Dict[str, Any],
+    lines: Sequence[Tuple[str, float, float, float]],
+    subtotal: float,
+    tax_label: str,
+) -> str:
+    """LlamaParse-style markdown of an invoice (lines: description, qty, unit price, line total)."""
+    rows = "\n".join(
+        f"| {i} | {desc} | {qty:g} | {_money(unit)} | {_money(total)} |"
+        for i, (desc, qty, unit, total) in enumerate(lines, start=1)
+    )
+    return (
+        f"# {invoice['supplier_name']}\n\n"
+        "350 5th Avenue, Suite 2100\nNew York, NY 10118\nUSA\n"
+        f"Email: {invoice['contact_email']}\n\n"
+        "# INVOICE\n\n"
+        f"Invoice #: {invoice['invoice_id']}\n"
+        f"Invoice Date: {invoice['invoice_date']}\n"
+        f"Due Date: {invoice['due_date']}\n"
+        f"Currency: {invoice['currency']}\n\n"
+        "**Bill To:**\n"
+        f"{invoice['customer_name']}\n"
+        "123 Madison Avenue, 9th Floor\nNew York, NY 10010\nUSA\n"
+        "ATTN: Accounts Payable\n\n"
+        "| Item | Description | Qty | Unit Price | Line Total |\n"
+        "| --- | --- | --- | --- | --- |\n"
+        f"{rows}\n"
+        f"| Subtotal | | | | {_money(subtotal)} |\n"
+        f"| {tax_label} | | | | {_money(invoice['tax_amount'])} |\n"
+        f"| Total Amount Due | | | | {_money(invoice['total_amount'])} |\n\n"
+        "## Payment Information\n\n"
+        "Bank: Bank of Metropolis\nPayment terms: Net 30 days from invoice date.\n\n"
+        "## Notes\n\n"
+        f"Please include the invoice number {invoice['invoice_id']} in your payment reference.\n"
+        f"For questions regarding this invoice, contact: {invoice['contact_email']}\n"
+    )
+
+
+def render_ticket_markdown(ticket: Dict[str, Any], supplier_name: str) -> str:
+    """LlamaParse-style markdown of a discrepancy ticket."""
+    currency = ticket.get("currency") or "USD"
+    return (
+        "# Invoice Discrepancy Ticket\n\n"
+        "| Field | Value |\n| --- | --- |\n"
+        f"| Ticket ID | {ticket['ticket_id']} |\n"
+        f"| Created Date | {ticket['created_date']} |\n"
+        f"| Created By | {ticket['created_by']} |\n"
+        f"| Department | {ticket['department']} |\n"
+        f"| Status | {ticket['status']} |\n"
+        f"| Priority | {ticket['priority']} |\n"
+        f"| Issue Type | {ticket['issue_type']} |\n\n"
+        "## Related Invoice\n\n"
+        "| Field | Value |\n| --- | --- |\n"
+        f"| Invoice ID | {ticket['invoice_id']} |\n"
+        f"| Supplier Name | {supplier_name} |\n"
+        f"| Recorded Amount | {_money(ticket['recorded_amount'])} {currency} (in finance system) |\n"
+        f"| Document Amount | {_money(ticket['document_amount'])} {currency} (on attached invoice PDF) |\n\n"
+        "## Description\n\n"
+        f"{ticket['description']}\n"
+    )
+
+
+def _make_invoice(index: int, rng: random.Random, weights: List[float]) -> Tuple[Dict[str, Any], List[Tuple[str, float, float, float]], str]:
+    supplier, email = rng.choices(SUPPLIERS, weights=weights)[0]
+    issued = date(2025, 1, 1) + timedelta(days=rng.randrange(365))
+    tax_label, tax_rate = rng.choice(TAX_RATES)
+
+    lines = []
+    for desc, low, high in rng.sample(CATALOG, rng.randint(1, 5)):
+        qty = float(rng.randint(1, 12))
+        unit = round(rng.uniform(low, high), 2)
+        lines.append((desc, qty, unit, round(qty * unit, 2)))
+
+    subtotal = round(sum(line[3] for line in lines), 2)
+    tax = round(subtotal * tax_rate, 2)
+    invoice = {
+        "invoice_id": f"INV-SYN-{index:06d}",
+        "supplier_name": supplier,
+        "customer_name": CUSTOMER,
+        "invoice_date": _fmt_date(issued),
+        "due_date": _fmt_date(issued + timedelta(days=30)),
+        "total_amount": round(subtotal + tax, 2),
+        "tax_amount": tax,
+        "currency": "USD",
+        "contact_email": email,
+    }
+    return invoice, lines, tax_label
+
+
+def generate_documents(
+    count: int,
+    seed: int = 0,
+    mismatch_rate: float = 0.2,
+    new_rate: float = 0.15,
+    math_error_rate: float = 0.05,
+    ticket_rate: float = 0.1,
+) -> Iterator[SyntheticDocument]:
+    """
+    Yield `count` synthetic documents; the remaining share of invoices
+    (1 - the other rates) matches the DB exactly. Deterministic for a seed.
+    """
+    rng = random.Random(seed)
+    weights = supplier_weights()
+    scenarios = [MISMATCH, NEW, MATH_ERROR, TICKET, MATCH]
+    rates = [mismatch_rate, new_rate, math_error_rate, ticket_rate]
+    rates.append(max(0.0, 1.0 - sum(rates)))
+
+    for i in range(count):
+        scenario = rng.choices(scenarios, weights=rates)[0]
+        invoice, lines, tax_label = _make_invoice(i, rng, weights)
+        subtotal = round(sum(line[3] for line in lines), 2)
+        recorded: Optional[Dict[str, Any]] = dict(invoice)
+
+        if scenario == MATH_ERROR:
+            # A line total that does not equal qty * unit price
+            desc, qty, unit, total = lines[0]
+            lines[0] = (desc, qty, unit, round(total + rng.choice([-1, 1]) * rng.uniform(5, 50), 2))
+        elif scenario == MISMATCH:
+            recorded["total_amount"] = round(invoice["total_amount"] - rng.uniform(1, 200), 2)
+        elif scenario == NEW:
+            recorded = None
+
+        if scenario == TICKET:
+            ticket = {
+                "ticket_id": f"TCK-SYN-{i:06d}",
+                "invoice_id": invoice["invoice_id"],
+                "created_date": invoice["invoice_date"],
+                "created_by": "JANE SMITH (Accounts Payable Analyst)",
+                "department": f"{CUSTOMER} – Finance",
+                "status": "Open",
+                "priority": rng.choice(["Low", "Medium", "High"]),
+                "issue_type": rng.choice(ISSUE_TYPES),
+                "recorded_amount": recorded["total_amount"],
+                "document_amount": round(invoice["total_amount"] + rng.uniform(1, 100), 2),
+                "currency": invoice["currency"],
+                "description": (
+                    f"The total recorded for invoice {invoice['invoice_id']} does not "
+                    "match the amount on the supplier invoice."
+                ),
+            }
+            yield SyntheticDocument(
+                name=f"{ticket['ticket_id']}.pdf",
+                doc_type="ticket",
+                scenario=scenario,
+                markdown=render_ticket_markdown(ticket, invoice["supplier_name"]),
+                invoice=invoice,
+                recorded=recorded,
+            )
+            continue
+
+        yield SyntheticDocument(
+            name=f"{invoice['invoice_id']}.pdf",
+            doc_type="invoice",
+            scenario=scenario,
+            markdown=render_invoice_markdown(invoice, lines, subtotal, tax_label),
+            invoice=invoice,
+            recorded=recorded,
+        )
+
+
+def seed_recorded_invoices(db_path: Path, documents: Sequence[SyntheticDocument]) -> int:
+    """
+    Insert the DB rows the documents expect (`recorded`) in one transaction.
+
+    Returns the number of invoices inserted.
+    """
+    rows = [
+        (
+            d["recorded"]["invoice_id"],
+            d["recorded"]["supplier_name"],
+            d["recorded"]["customer_name"],
+            d["recorded"]["invoice_date"],
+            d["recorded"]["due_date"],
+            d["recorded"]["total_amount"],
+            d["recorded"]["tax_amount"],
+            d["recorded"]["currency"],
+        )
+        for d in documents
+        if d["recorded"] is not None
+    ]
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO invoices (
+                invoice_id, supplier_name, customer_name, invoice_date,
+                due_date, total_amount, tax_amount, currency, status
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'recorded')
+            """,
+            rows,
+        )
+        conn.commit()
+    return len(rows)
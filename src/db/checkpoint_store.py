@@ -0,0 +1,89 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from src.observability import metrics
+
+JSONDict = Dict[str, Any]
+
+
+class CheckpointStore:
+    """
+    Completed stages of agent runs, per document, in the `run_checkpoints`
+    table.
+
+    A stage is recorded once its tool call succeeded; a retried run of the
+    same PDF reads it back instead of doing the work (or the side effect)
+    again. Checkpoints older than `ttl_seconds` are ignored and pruned.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: float = 24 * 3600) -> None:
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get(self, content_hash: str, key: str) -> Tuple[bool, Any]:
+        """(True, output) for a live checkpoint, (False, None) otherwise."""
+        with self._connect() as conn:
+            row = conn.execute(
+                """
+                SELECT output_json FROM run_checkpoints
+                WHERE content_hash = ? AND checkpoint_key = ? AND created_at >= ?
+                """,
+                (content_hash, key, time.time() - self.ttl_seconds),
+            ).fetchone()
+        metrics.cache_lookup("checkpoint", row is not None)
+        if row is None:
+            return False, None
+        return True, json.loads(row["output_json"])
+
+    def save(self, content_hash: str, key: str, stage: str, output: Any) -> None:
+        """Record a completed stage (replacing an older record of the same key)."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO run_checkpoints (content_hash, checkpoint_key, stage, output_json, created_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(content_hash, checkpoint_key) DO UPDATE SET
+                    stage = excluded.stage,
+                    output_json = excluded.output_json,
+                    created_at = excluded.created_at
+                """,
+                (content_hash, key, stage, json.dumps(output, default=str), now),
+            )
+            conn.execute(
+                "DELETE FROM run_checkpoints WHERE created_at < ?",
+                (now - self.ttl_seconds,),
+            )
+            conn.commit()
+
+    def stages(self, content_hash: str) -> List[str]:
+        """Live completed stages of a document, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT stage FROM run_checkpoints
+                WHERE content_hash = ? AND created_at >= ?
+                ORDER BY created_at
+                """,
+                (content_hash, time.time() - self.ttl_seconds),
+            ).fetchall()
+        stages: List[str] = []
+        for row in rows:
+            if row["stage"] not in stages:
+                stages.append(row["stage"])
+        return stages
+
+    def clear(self, content_hash: str) -> None:
+        """Forget the checkpoints of a document (its run finished)."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM run_checkpoints WHERE content_hash = ?", (content_hash,))
+            conn.commit()
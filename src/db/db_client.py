@@ -1,11 +1,63 @@
+import hashlib
+import re
 import sqlite3
-import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.db.fuzzy_index import (
+    add_invoice_keys,
+    add_supplier_keys,
+    invoice_key_candidates,
+    normalize_invoice_id,
+    normalize_supplier_name,
+    supplier_key_candidates,
+)
+from src.db.ticket_ids import get_ticket_id_allocator
+from src.observability.metrics import timed_db
 
 JSONDict = Dict[str, Any]
 
+# Fresh IDs tried when an insert still hits an existing ticket_id
+# (e.g. a ticket inserted by hand with a sequential-looking ID)
+TICKET_ID_ATTEMPTS = 3
+
+# Tickets a repeated discrepancy is folded into; once resolved or closed,
+# the same discrepancy showing up again opens a new ticket
+OPEN_TICKET_STATUSES = "status IN ('Open', 'In Progress')"
+
+
+def _dedup_amount(amount: Optional[float]) -> str:
+    return "" if amount is None else f"{float(amount):.2f}"
+
+
+def normalize_issue_type(issue_type: Optional[str]) -> str:
+    """Lower-cased issue label with runs of spaces / _ / - collapsed to one space."""
+    return re.sub(r"[\s_\-]+", " ", (issue_type or "").strip().lower())
+
+
+def ticket_dedup_key(
+    invoice_id: str,
+    issue_type: str,
+    recorded_amount: Optional[float] = None,
+    document_amount: Optional[float] = None,
+) -> str:
+    """
+    Idempotency key of a discrepancy ticket.
+
+    Invoice IDs are compared by their normalized key (INV_2025_001 ==
+    INV-2025-001), issue labels case- and separator-insensitively
+    ("Amount mismatch" == "amount_mismatch") and amounts to the cent, so a
+    retried or re-processed document maps to the ticket it already opened.
+    """
+    parts = [
+        normalize_invoice_id(invoice_id),
+        normalize_issue_type(issue_type),
+        _dedup_amount(recorded_amount),
+        _dedup_amount(document_amount),
+    ]
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
 
 class DBClient:
     """
@@ -13,6 +65,8 @@ class DBClient:
 
     Responsibilities:
       - fetch / upsert invoices in the `invoices` table
+      - match invoice IDs / supplier names written differently (normalized
+        keys plus the fuzzy indexes of fuzzy_index.py)
       - fetch / create tickets in the `tickets` table
     """
 
@@ -34,6 +88,7 @@ class DBClient:
 
 
 
+    @timed_db
     def get_invoice(self, invoice_id: str) -> Optional[JSONDict]:
         """
         Fetch a single invoice by its ID from the 'invoices' table.
@@ -47,14 +102,121 @@ class DBClient:
             row = cur.fetchone()
             return self._row_to_dict(row)
 
+    @staticmethod
+    def _invoice_by_key(conn: sqlite3.Connection, invoice_id: str) -> Optional[sqlite3.Row]:
+        """Row stored under another spelling of `invoice_id` (latest written first)."""
+        key = normalize_invoice_id(invoice_id)
+        if not key:
+            return None
+        return conn.execute(
+            "SELECT * FROM invoices WHERE invoice_key = ? ORDER BY rowid DESC LIMIT 1",
+            (key,),
+        ).fetchone()
+
+    @staticmethod
+    def _same_invoice(conn: sqlite3.Connection, data: JSONDict) -> Optional[sqlite3.Row]:
+        """
+        Row stored under another spelling of the same invoice: same
+        normalized ID, supplier and total amount (all known).
+        """
+        if not data["invoice_key"] or not data["supplier_key"] or data["total_amount"] is None:
+            return None
+        rows = conn.execute(
+            """
+            SELECT * FROM invoices
+            WHERE invoice_key = ? AND supplier_key = ? AND total_amount IS NOT NULL
+            ORDER BY rowid DESC
+            """,
+            (data["invoice_key"], data["supplier_key"]),
+        ).fetchall()
+        for row in rows:
+            if abs(row["total_amount"] - float(data["total_amount"])) < 0.005:
+                return row
+        return None
+
+    @classmethod
+    def _stored_invoice_id(cls, conn: sqlite3.Connection, invoice_id: str) -> str:
+        """
+        ID the invoice is stored under when `invoice_id` spells it differently,
+        so tickets join the invoice row; unknown invoices keep `invoice_id`.
+        """
+        row = conn.execute(
+            "SELECT invoice_id FROM invoices WHERE invoice_id = ?", (invoice_id,)
+        ).fetchone()
+        if row is None:
+            row = cls._invoice_by_key(conn, invoice_id)
+        return row["invoice_id"] if row is not None else invoice_id
+
+    @timed_db
+    def find_invoice(self, invoice_id: str) -> Optional[JSONDict]:
+        """
+        Fetch an invoice by its ID as extracted from a document: exact match
+        first, then the same normalized key (INV_2025_001 == INV-2025-001,
+        stray spaces, O read as 0). Near-misses are not matched here; see
+        lookup_invoices for ranked candidates.
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM invoices WHERE invoice_id = ?", (invoice_id,)
+            ).fetchone()
+            if row is None:
+                row = self._invoice_by_key(conn, invoice_id)
+            return self._row_to_dict(row)
+
+    @timed_db
+    def lookup_invoices(self, text: str, limit: int = 5) -> List[JSONDict]:
+        """
+        Invoices whose ID looks like `text`, best first, each with a `score`
+        (similarity of the normalized keys, 1.0 = same key). Only IDs within
+        one typo of `text` once normalized are candidates.
+        """
+        with self._connect() as conn:
+            candidates = invoice_key_candidates(conn, normalize_invoice_id(text), limit)
+            results: List[JSONDict] = []
+            for candidate in candidates:
+                rows = conn.execute(
+                    """
+                    SELECT invoice_id, supplier_name, invoice_date, total_amount, currency
+                    FROM invoices WHERE invoice_key = ?
+                    """,
+                    (candidate["key"],),
+                ).fetchall()
+                results.extend({**dict(row), "score": candidate["score"]} for row in rows)
+            return results[:limit]
+
+    @timed_db
+    def lookup_suppliers(self, text: str, limit: int = 5) -> List[JSONDict]:
+        """Supplier names that look like `text`, best first, each with a `score`."""
+        with self._connect() as conn:
+            candidates = supplier_key_candidates(conn, normalize_supplier_name(text), limit)
+            results: List[JSONDict] = []
+            for candidate in candidates:
+                row = conn.execute(
+                    "SELECT supplier_name FROM invoices WHERE supplier_key = ? LIMIT 1",
+                    (candidate["key"],),
+                ).fetchone()
+                if row is not None:
+                    results.append(
+                        {"supplier_name": row["supplier_name"], "score": candidate["score"]}
+                    )
+            return results
+
+    @timed_db
     def upsert_invoice(
         self,
         invoice: JSONDict,
         source_file: Optional[str] = None,
         status: str = "recorded",
-    ) -> None:
+    ) -> str:
         """
-        Insert or update an invoice row.
+        Insert or update an invoice row and return its stored invoice_id.
+
+        An ID that only differs from a stored one by its spelling updates
+        that row instead of adding a duplicate, but only when the supplier
+        and total agree too: the normalized key alone also equates distinct
+        IDs (INV-2025-110 and INV-20251-10), which get their own rows.
+        Every update bumps `row_version`, which cached workflow results
+        use to detect that the invoice changed.
 
         Expected keys in `invoice`:
           - invoice_id (required)
@@ -80,21 +242,30 @@ class DBClient:
             "currency": invoice.get("currency"),
             "status": status,
             "source_file": source_file,
+            "invoice_key": normalize_invoice_id(invoice.get("invoice_id")),
+            "supplier_key": normalize_supplier_name(invoice.get("supplier_name")),
         }
 
         with self._connect() as conn:
             cur = conn.cursor()
+            exact = cur.execute(
+                "SELECT 1 FROM invoices WHERE invoice_id = ?", (data["invoice_id"],)
+            ).fetchone()
+            if exact is None:
+                existing = self._same_invoice(conn, data)
+                if existing is not None:
+                    data["invoice_id"] = existing["invoice_id"]
             cur.execute(
                 """
                 INSERT INTO invoices (
                     invoice_id, supplier_name, customer_name,
                     invoice_date, due_date, total_amount, tax_amount,
-                    currency, status, source_file
+                    currency, status, source_file, invoice_key, supplier_key
                 )
                 VALUES (
                     :invoice_id, :supplier_name, :customer_name,
                     :invoice_date, :due_date, :total_amount, :tax_amount,
-                    :currency, :status, :source_file
+                    :currency, :status, :source_file, :invoice_key, :supplier_key
                 )
                 ON CONFLICT(invoice_id) DO UPDATE SET
                     supplier_name = excluded.supplier_name,
@@ -105,14 +276,20 @@ class DBClient:
                     tax_amount = excluded.tax_amount,
                     currency = excluded.currency,
                     status = excluded.status,
-                    source_file = excluded.source_file
+                    source_file = excluded.source_file,
+                    supplier_key = excluded.supplier_key,
+                    row_version = invoices.row_version + 1
                 """,
                 data,
             )
+            add_invoice_keys(conn, [data["invoice_key"]])
+            add_supplier_keys(conn, [data["supplier_key"]])
             conn.commit()
+        return data["invoice_id"]
 
     # Ticket operations
 
+    @timed_db
     def get_ticket(self, ticket_id: str) -> Optional[JSONDict]:
         """
         Fetch a single ticket by its ID from the 'tickets' table.
@@ -126,20 +303,116 @@ class DBClient:
             row = cur.fetchone()
             return self._row_to_dict(row)
 
+    @timed_db
     def list_tickets_for_invoice(self, invoice_id: str) -> List[JSONDict]:
         """
-        List all tickets associated with a given invoice, newest first.
+        List all tickets associated with a given invoice (under any spelling
+        of its ID, see find_invoice), newest first.
         """
         with self._connect() as conn:
             cur = conn.cursor()
             cur.execute(
                 "SELECT * FROM tickets WHERE invoice_id = ? "
                 "ORDER BY created_date DESC",
-                (invoice_id,),
+                (self._stored_invoice_id(conn, invoice_id),),
             )
             rows = cur.fetchall()
             return [self._row_to_dict(r) for r in rows if r is not None]  # type: ignore[arg-type]
 
+    @timed_db
+    def get_or_create_ticket(
+        self,
+        invoice_id: str,
+        issue_type: str,
+        description: str,
+        recorded_amount: Optional[float] = None,
+        document_amount: Optional[float] = None,
+        priority: str = "High",
+        status: str = "Open",
+        created_by: str = "AI Agent",
+        department: str = "Finance",
+    ) -> Tuple[JSONDict, bool]:
+        """
+        Create a ticket for an invoice discrepancy unless an identical one
+        (same ticket_dedup_key) is still open.
+
+        The ticket references the invoice under the ID it is stored with
+        (INV_2025_001 on the document, INV-2025-001 in `invoices`), like
+        upsert_invoice does.
+
+        Returns (ticket, created); for a duplicate nothing is written and the
+        existing ticket is returned with created=False.
+        """
+        dedup_key = ticket_dedup_key(invoice_id, issue_type, recorded_amount, document_amount)
+
+        with self._connect() as conn:
+            invoice_id = self._stored_invoice_id(conn, invoice_id)
+            existing = conn.execute(
+                f"SELECT * FROM tickets WHERE dedup_key = ? AND {OPEN_TICKET_STATUSES}",
+                (dedup_key,),
+            ).fetchone()
+            if existing is not None:
+                return self._row_to_dict(existing), False  # type: ignore[return-value]
+
+            now = datetime.now(timezone.utc)
+            allocator = get_ticket_id_allocator(self.db_path)
+            data: JSONDict = {
+                "ticket_id": None,
+                "invoice_id": invoice_id,
+                "created_date": now.isoformat(timespec="seconds"),
+                "created_by": created_by,
+                "department": department,
+                "status": status,
+                "priority": priority,
+                "issue_type": issue_type,
+                "recorded_amount": recorded_amount,
+                "document_amount": document_amount,
+                "description": description,
+                "dedup_key": dedup_key,
+                "resolved_at": None,
+                "resolution": None,
+            }
+
+            for attempt in range(TICKET_ID_ATTEMPTS):
+                # Sequential per-year ID, e.g. TCK-2025-0042
+                data["ticket_id"] = allocator.next_id(now.year)
+                try:
+                    cur = conn.execute(
+                        f"""
+                        INSERT INTO tickets (
+                            ticket_id, invoice_id, created_date, created_by, department,
+                            status, priority, issue_type, recorded_amount, document_amount,
+                            description, dedup_key
+                        )
+                        VALUES (
+                            :ticket_id, :invoice_id, :created_date, :created_by, :department,
+                            :status, :priority, :issue_type, :recorded_amount, :document_amount,
+                            :description, :dedup_key
+                        )
+                        ON CONFLICT(dedup_key) WHERE {OPEN_TICKET_STATUSES} DO NOTHING
+                        """,
+                        data,
+                    )
+                except sqlite3.IntegrityError as e:
+                    if "tickets.ticket_id" in str(e) and attempt + 1 < TICKET_ID_ATTEMPTS:
+                        # Release the write lock before the allocator may need it
+                        conn.rollback()
+                        continue
+                    raise
+                break
+            conn.commit()
+
+            if cur.rowcount == 0:
+                # A concurrent run inserted the same ticket after our lookup
+                existing = conn.execute(
+                    f"SELECT * FROM tickets WHERE dedup_key = ? AND {OPEN_TICKET_STATUSES}",
+                    (dedup_key,),
+                ).fetchone()
+                return self._row_to_dict(existing), False  # type: ignore[return-value]
+
+        return data, True
+
+    # Timed as get_or_create_ticket, which does the work
     def create_ticket(
         self,
         invoice_id: str,
@@ -155,46 +428,40 @@ class DBClient:
         """
         Create a new ticket row for an invoice discrepancy.
 
-        Returns the created ticket as a dict.
+        Idempotent: if the same discrepancy was already ticketed, the
+        existing ticket is returned and nothing is written.
         """
-        # Generate a simple ticket ID, e.g. TCK-2025-ABCD
-        year = datetime.now(timezone.utc).year
-        short_id = uuid.uuid4().hex[:4].upper()
-        ticket_id = f"TCK-{year}-{short_id}"
-
-        created_date = datetime.now(timezone.utc).isoformat(timespec="seconds")
-
-        data: JSONDict = {
-            "ticket_id": ticket_id,
-            "invoice_id": invoice_id,
-            "created_date": created_date,
-            "created_by": created_by,
-            "department": department,
-            "status": status,
-            "priority": priority,
-            "issue_type": issue_type,
-            "recorded_amount": recorded_amount,
-            "document_amount": document_amount,
-            "description": description,
-        }
+        ticket, _ = self.get_or_create_ticket(
+            invoice_id=invoice_id,
+            issue_type=issue_type,
+            description=description,
+            recorded_amount=recorded_amount,
+            document_amount=document_amount,
+            priority=priority,
+            status=status,
+            created_by=created_by,
+            department=department,
+        )
+        return ticket
 
+    @timed_db
+    def resolve_ticket(self, ticket_id: str, resolution: str) -> bool:
+        """
+        Mark an open ticket Resolved, with the reason. Returns False if the
+        ticket does not exist or was already resolved / closed.
+        """
         with self._connect() as conn:
-            cur = conn.cursor()
-            cur.execute(
-                """
-                INSERT INTO tickets (
-                    ticket_id, invoice_id, created_date, created_by, department,
-                    status, priority, issue_type, recorded_amount, document_amount,
-                    description
-                )
-                VALUES (
-                    :ticket_id, :invoice_id, :created_date, :created_by, :department,
-                    :status, :priority, :issue_type, :recorded_amount, :document_amount,
-                    :description
-                )
+            cur = conn.execute(
+                f"""
+                UPDATE tickets
+                SET status = 'Resolved', resolved_at = ?, resolution = ?
+                WHERE ticket_id = ? AND {OPEN_TICKET_STATUSES}
                 """,
-                data,
+                (
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    resolution,
+                    ticket_id,
+                ),
             )
             conn.commit()
-
-        return data
+            return cur.rowcount > 0
@@ -0,0 +1,129 @@
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from src.observability import metrics
+
+HANDLE_PREFIX = "doc://"
+
+# Recently used texts, shared by every DocumentStore of the process
+_CACHE_SIZE = 32
+_TEXT_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def file_content_hash(file_path: Path) -> str:
+    """SHA-256 of the file bytes (the PDF a document was parsed from)."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def is_handle(value: object) -> bool:
+    """True for strings like 'doc://<sha256>'."""
+    return isinstance(value, str) and value.startswith(HANDLE_PREFIX)
+
+
+class DocumentStore:
+    """
+    Stores parsed document text in the `documents` table and hands out
+    compact handles (`doc://<sha256 of the text>`).
+
+    Agent prompts and tool arguments carry the handle; tools resolve it
+    internally, so prompt size does not grow with the document. Texts parsed
+    from a PDF also record the PDF hash, so the same file is not sent to
+    LlamaParse twice (see find_by_source).
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _remember(doc_hash: str, text: str) -> None:
+        with _CACHE_LOCK:
+            _TEXT_CACHE[doc_hash] = text
+            _TEXT_CACHE.move_to_end(doc_hash)
+            while len(_TEXT_CACHE) > _CACHE_SIZE:
+                _TEXT_CACHE.popitem(last=False)
+
+    def put(
+        self,
+        text: str,
+        source_path: Optional[str] = None,
+        source_hash: Optional[str] = None,
+    ) -> str:
+        """Store `text` (once per content) and return its handle."""
+        doc_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO documents (
+                    doc_hash, text, source_path, source_hash, char_count, created_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(doc_hash) DO NOTHING
+                """,
+                (
+                    doc_hash,
+                    text,
+                    source_path,
+                    source_hash,
+                    len(text),
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                ),
+            )
+            conn.commit()
+        self._remember(doc_hash, text)
+        return f"{HANDLE_PREFIX}{doc_hash}"
+
+    def find_by_source(self, source_hash: str) -> Optional[str]:
+        """Handle of the text parsed from the PDF with this hash, if any."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT doc_hash FROM documents WHERE source_hash = ? LIMIT 1",
+                (source_hash,),
+            ).fetchone()
+        metrics.cache_lookup("parsed_pdf", row is not None)
+        return f"{HANDLE_PREFIX}{row['doc_hash']}" if row is not None else None
+
+    def get(self, handle: str) -> str:
+        """Text behind a handle. Raises KeyError for unknown handles."""
+        if not is_handle(handle):
+            raise ValueError(f"Not a document handle: {handle[:40]!r}")
+        doc_hash = handle[len(HANDLE_PREFIX):]
+
+        with _CACHE_LOCK:
+            cached = _TEXT_CACHE.get(doc_hash)
+            if cached is not None:
+                _TEXT_CACHE.move_to_end(doc_hash)
+        metrics.cache_lookup("document_text", cached is not None)
+        if cached is not None:
+            return cached
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT text FROM documents WHERE doc_hash = ?",
+                (doc_hash,),
+            ).fetchone()
+        if row is None:
+            raise KeyError(f"Unknown document handle: {handle}")
+        self._remember(doc_hash, row["text"])
+        return row["text"]
+
+    def resolve(self, document: str) -> str:
+        """Text for a handle; anything else is assumed to already be the text."""
+        if is_handle(document):
+            return self.get(document)
+        return document or ""
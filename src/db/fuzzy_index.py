@@ -0,0 +1,193 @@
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+JSONDict = Dict[str, Any]
+
+# Keys scored exactly per lookup. Every key sharing a variant with the
+# query is scored (a few hundred at most for dense IDs); supplier names are
+# first narrowed down by shared trigrams.
+INVOICE_CANDIDATES = 1000
+SUPPLIER_CANDIDATES = 50
+
+# Legal-form words that extraction keeps or drops at random
+_SUPPLIER_SUFFIXES = {
+    "INC", "INCORPORATED", "LLC", "LTD", "LIMITED", "CORP", "CORPORATION",
+    "CO", "COMPANY", "GMBH", "SA", "SAS", "SARL", "BV", "AG", "PLC",
+}
+
+
+def normalize_invoice_id(invoice_id: Optional[str]) -> str:
+    """
+    Matching key of an invoice ID: upper-cased, separators and spaces
+    dropped, letter O read as zero. INV_2025_001, "inv-2025-001 " and
+    INV-2O25-OO1 all give INV2025001. A matching key, not an identity:
+    INV-2025-110 and INV-20251-10 share it too.
+    """
+    key = re.sub(r"[^0-9A-Z]", "", (invoice_id or "").upper())
+    return key.replace("O", "0")
+
+
+def normalize_supplier_name(name: Optional[str]) -> str:
+    """Matching key of a supplier: upper-cased words without punctuation or legal form."""
+    words = re.sub(r"[^0-9A-Z]+", " ", (name or "").upper()).split()
+    while len(words) > 1 and words[-1] in _SUPPLIER_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def edit_distance(a: str, b: str) -> int:
+    """
+    Edits (insert, delete, substitute, swap of neighbours) between two keys.
+    The common prefix and suffix are skipped first: near-identical IDs
+    leave only a few characters for the quadratic part.
+    """
+    start = 0
+    while start < min(len(a), len(b)) and a[start] == b[start]:
+        start += 1
+    end = 0
+    while end < min(len(a), len(b)) - start and a[-1 - end] == b[-1 - end]:
+        end += 1
+    a, b = a[start:len(a) - end], b[start:len(b) - end]
+
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            row[j] = min(
+                prev[j] + 1,
+                row[j - 1] + 1,
+                prev[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], prev2[j - 2] + 1)
+        prev2, prev = prev, row
+    return prev[-1]
+
+
+def similarity(a: str, b: str) -> float:
+    """1 - edit distance / length of the longer key (1.0: same key)."""
+    if not a or not b:
+        return 0.0
+    return 1 - edit_distance(a, b) / max(len(a), len(b))
+
+
+def _ranked(key: str, candidates: Iterable[str], limit: int) -> List[JSONDict]:
+    scored = [{"key": c, "score": round(similarity(key, c), 4)} for c in set(candidates)]
+    scored.sort(key=lambda c: (-c["score"], c["key"]))
+    return scored[:limit]
+
+
+# Invoice IDs: one-deletion neighbourhood.
+#
+# IDs are short and dense (INV-2025-0000001, -0000002, ...), so most of
+# their trigrams are shared by a large part of the table and cannot single
+# out a near miss. Each key is indexed under itself and each of its
+# one-character deletions instead: two keys one typo apart (substitution,
+# insertion, deletion, swapped neighbours) always share a variant, and a
+# lookup is one index probe per character of the query.
+
+def deletion_variants(key: str) -> Set[str]:
+    """The key and every string obtained by deleting one of its characters."""
+    if not key:
+        return set()
+    return {key} | {key[:i] + key[i + 1:] for i in range(len(key))}
+
+
+def add_invoice_keys(conn: sqlite3.Connection, invoice_keys: Iterable[str]) -> None:
+    """Index invoice keys within the caller's transaction (already indexed ones are skipped)."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO invoice_key_variants (variant, invoice_key) VALUES (?, ?)",
+        (
+            (variant, key)
+            for key in set(invoice_keys)
+            if key
+            for variant in deletion_variants(key)
+        ),
+    )
+
+
+def invoice_key_candidates(
+    conn: sqlite3.Connection, invoice_key: str, limit: int
+) -> List[JSONDict]:
+    """
+    Indexed invoice keys sharing a variant with `invoice_key` (every key one
+    typo away, and some two), best first: [{"key", "score"}].
+    """
+    variants = sorted(deletion_variants(invoice_key))
+    if not variants:
+        return []
+    placeholders = ", ".join("?" for _ in variants)
+    rows = conn.execute(
+        f"""
+        SELECT DISTINCT invoice_key FROM invoice_key_variants
+        WHERE variant IN ({placeholders})
+        LIMIT ?
+        """,
+        (*variants, INVOICE_CANDIDATES),
+    ).fetchall()
+    return _ranked(invoice_key, (row[0] for row in rows), limit)
+
+
+# Supplier names: trigram index.
+#
+# Names are longer and differ by more than one character ("Supplies" /
+# "Supply"), and there are few distinct suppliers, so shared trigrams rank
+# them well and the posting lists stay short.
+
+def trigrams(key: str) -> Set[str]:
+    """Padded character trigrams of a key (short keys still get a few)."""
+    if not key:
+        return set()
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def add_supplier_keys(conn: sqlite3.Connection, supplier_keys: Iterable[str]) -> None:
+    """Index supplier keys within the caller's transaction (already indexed ones are skipped)."""
+    conn.executemany(
+        "INSERT OR IGNORE INTO supplier_trigrams (trigram, supplier_key) VALUES (?, ?)",
+        (
+            (trigram, key)
+            for key in set(supplier_keys)
+            if key
+            for trigram in trigrams(key)
+        ),
+    )
+
+
+def supplier_key_candidates(
+    conn: sqlite3.Connection, supplier_key: str, limit: int
+) -> List[JSONDict]:
+    """Indexed supplier keys sharing the most trigrams with `supplier_key`, best first."""
+    grams = sorted(trigrams(supplier_key))
+    if not grams:
+        return []
+    placeholders = ", ".join("?" for _ in grams)
+    rows = conn.execute(
+        f"""
+        SELECT supplier_key, COUNT(*) AS shared FROM supplier_trigrams
+        WHERE trigram IN ({placeholders})
+        GROUP BY supplier_key ORDER BY shared DESC LIMIT ?
+        """,
+        (*grams, SUPPLIER_CANDIDATES),
+    ).fetchall()
+    return _ranked(supplier_key, (row[0] for row in rows), limit)
+
+
+def rebuild_fuzzy_index(conn: sqlite3.Connection) -> None:
+    """Fill the key columns and both fuzzy indexes from the existing invoices."""
+    rows = conn.execute("SELECT invoice_id, supplier_name FROM invoices").fetchall()
+    keys = [
+        (normalize_invoice_id(invoice_id), normalize_supplier_name(supplier_name), invoice_id)
+        for invoice_id, supplier_name in rows
+    ]
+    conn.executemany(
+        "UPDATE invoices SET invoice_key = ?, supplier_key = ? WHERE invoice_id = ?", keys
+    )
+    conn.execute("DELETE FROM invoice_key_variants")
+    conn.execute("DELETE FROM supplier_trigrams")
+    add_invoice_keys(conn, (k[0] for k in keys))
+    add_supplier_keys(conn, (k[1] for k in keys))
+    conn.commit()
@@ -1,24 +1,98 @@
 import sqlite3
+import sys
 from pathlib import Path
 
+if __package__ in (None, ""):
+    # Allow `python src/db/init_db.py` as well as `python -m src.db.init_db`
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from src.db.db_client import DBClient
+from src.db.fuzzy_index import rebuild_fuzzy_index
+from src.db.report_store import rebuild_reports
+from src.db.search_index import rebuild_search_index
+
 # Paths
 ROOT_DIR = Path(__file__).resolve().parents[2]  
 DATA_DIR = ROOT_DIR / "data"
 DB_PATH = DATA_DIR / "finance.db"
 SCHEMA_PATH = ROOT_DIR / "src" / "db" / "schema.sql"
 
-def init_db():
-    DATA_DIR.mkdir(exist_ok=True)
+# Columns added after the first release, so older finance.db files can be
+# upgraded in place (CREATE TABLE IF NOT EXISTS does not add columns).
+ADDED_COLUMNS = {
+    "invoices": {
+        "row_version": "INTEGER NOT NULL DEFAULT 1",
+        "invoice_key": "TEXT",
+        "supplier_key": "TEXT",
+    },
+    "documents": {
+        "source_hash": "TEXT",
+    },
+    "tickets": {
+        "dedup_key": "TEXT",
+        "resolved_at": "TEXT",
+        "resolution": "TEXT",
+    },
+    "workflow_results": {
+        "instruction_hash": "TEXT NOT NULL DEFAULT ''",
+    },
+}
+
+# Derived tables maintained by triggers, which only see writes made after
+# the table exists: filled from the rows already there when first created
+BACKFILLS = {
+    "report_suppliers": rebuild_reports,
+    "invoices_fts": rebuild_search_index,
+    "invoice_key_variants": rebuild_fuzzy_index,
+}
+
+
+def _migrate_columns(conn: sqlite3.Connection) -> None:
+    """Add any missing columns to tables that already exist."""
+    for table, columns in ADDED_COLUMNS.items():
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if not existing:
+            # Table does not exist yet, schema.sql will create it
+            continue
+        for name, ddl in columns.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {ddl}")
+
 
-    print(f"Creating / updating DB at: {DB_PATH}")
+def _has_table(conn: sqlite3.Connection, table: str) -> bool:
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
 
-    conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
+
+def apply_schema(db_path: Path = DB_PATH) -> None:
+    """Create / upgrade all tables, indexes and triggers of the schema."""
+    conn = sqlite3.connect(db_path)
+    try:
+        _migrate_columns(conn)
+        missing = [table for table in BACKFILLS if not _has_table(conn, table)]
+        with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
+            schema_sql = f.read()
+        conn.executescript(schema_sql)
+        conn.commit()
+        for table in missing:
+            BACKFILLS[table](conn)
+    finally:
+        conn.close()
+
+
+def init_db(db_path: Path = DB_PATH, seed: bool = True):
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+
+    print(f"Creating / updating DB at: {db_path}")
 
     # Create tables
-    with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
-        schema_sql = f.read()
-    cur.executescript(schema_sql)
+    apply_schema(db_path)
+
+    if not seed:
+        return
 
     # Sample data
 
@@ -58,22 +132,15 @@ def init_db():
     #     }
     # ]
 
-    # Insert invoices
-    cur.executemany(
-        """
-        INSERT OR REPLACE INTO invoices (
-            invoice_id, supplier_name, customer_name,
-            invoice_date, due_date, total_amount, tax_amount,
-            currency, status, source_file
-        )
-        VALUES (
-            :invoice_id, :supplier_name, :customer_name,
-            :invoice_date, :due_date, :total_amount, :tax_amount,
-            :currency, :status, :source_file
+    # Insert invoices through the client so row_version is bumped like any
+    # other write (cached workflow results then see the change)
+    db = DBClient(db_path)
+    for invoice in invoices:
+        db.upsert_invoice(
+            invoice,
+            source_file=invoice["source_file"],
+            status=invoice["status"],
         )
-        """,
-        invoices,
-    )
 
     # Insert tickets
     # cur.executemany(
@@ -92,8 +159,6 @@ def init_db():
     #     tickets,
     # )
 
-    conn.commit()
-    conn.close()
     print("Database init and seeded with sample data.")
 
 if __name__ == "__main__":
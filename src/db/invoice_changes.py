@@ -0,0 +1,80 @@
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+JSONDict = Dict[str, Any]
+
+
+class InvoiceChangeQueue:
+    """
+    Dirty queue of the `invoice_changes` table.
+
+    Schema triggers add an entry whenever an invoice is inserted or its
+    row_version is bumped (every DBClient.upsert_invoice), keeping one entry
+    per invoice with the latest version. A Rereconciler claims entries,
+    re-checks the invoice's documents and tickets, then marks them done.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def claim(self, limit: int, lease_seconds: float = 300.0) -> List[JSONDict]:
+        """
+        Atomically claim up to `limit` changed invoices, oldest change first.
+
+        Claims are leased like outbox rows: entries of a worker that died
+        become claimable again once the lease expires.
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.isolation_level = None  # explicit transaction below
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                """
+                SELECT * FROM invoice_changes
+                WHERE locked_until IS NULL OR locked_until <= ?
+                ORDER BY changed_at
+                LIMIT ?
+                """,
+                (now, limit),
+            ).fetchall()
+            conn.executemany(
+                "UPDATE invoice_changes SET locked_until = ? WHERE invoice_id = ?",
+                [(now + lease_seconds, row["invoice_id"]) for row in rows],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return [{k: row[k] for k in row.keys()} for row in rows]
+
+    def done(self, invoice_id: str, row_version: int) -> bool:
+        """
+        Remove a processed entry. An entry whose invoice changed again in
+        the meantime (newer row_version) stays queued; returns False then.
+        """
+        with self._connect() as conn:
+            cur = conn.execute(
+                "DELETE FROM invoice_changes WHERE invoice_id = ? AND row_version = ?",
+                (invoice_id, row_version),
+            )
+            conn.commit()
+            return cur.rowcount > 0
+
+    def pending(self) -> int:
+        """Number of changed invoices waiting to be re-checked."""
+        with self._connect() as conn:
+            (count,) = conn.execute("SELECT COUNT(*) FROM invoice_changes").fetchone()
+        return int(count)
@@ -0,0 +1,65 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Optional
+
+from src.observability import metrics
+
+
+class LLMCache:
+    """
+    Persistent cache of LLM outputs in the `llm_cache` table.
+
+    Entries are keyed by (kind, sha256 of the model ID, prompt version and
+    JSON-serialized inputs), so a repeated call with the same context
+    returns the stored output instead of running the model again, while a
+    new model or prompt starts from an empty cache.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def key_for(model: str, prompt_version: str, *parts: Any) -> str:
+        """
+        Stable hash of the model, the prompt version and JSON-serializable
+        inputs (dict key order ignored).
+        """
+        payload = json.dumps([model, prompt_version, *parts], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, kind: str, key: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value FROM llm_cache WHERE kind = ? AND cache_key = ?",
+                (kind, key),
+            ).fetchone()
+        metrics.cache_lookup(f"llm:{kind}", row is not None)
+        return row["value"] if row else None
+
+    def put(self, kind: str, key: str, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO llm_cache (kind, cache_key, value, created_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(kind, cache_key) DO UPDATE SET
+                    value = excluded.value,
+                    created_at = excluded.created_at
+                """,
+                (
+                    kind,
+                    key,
+                    value,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                ),
+            )
+            conn.commit()
@@ -0,0 +1,155 @@
+import sqlite3
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+JSONDict = Dict[str, Any]
+
+
+class Outbox:
+    """
+    Transactional email outbox backed by the `outbox` table.
+
+    The workflow only enqueues messages; a background OutboxSender claims
+    them in batches, sends them and records the outcome. Rows move through:
+
+        pending -> sending -> sent
+                          \\-> pending (retry, with backoff) -> ... -> failed
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row | None) -> Optional[JSONDict]:
+        """Convert sqlite3.Row to dict."""
+        if row is None:
+            return None
+        return {k: row[k] for k in row.keys()}
+
+    def enqueue(self, recipient: str, subject: str, body: str) -> int:
+        """Queue a message for sending and return its outbox id."""
+        now = time.time()
+        with self._connect() as conn:
+            cur = conn.execute(
+                """
+                INSERT INTO outbox (
+                    recipient, subject, body, status, attempts,
+                    next_attempt_at, created_at
+                )
+                VALUES (?, ?, ?, 'pending', 0, ?, ?)
+                """,
+                (
+                    recipient,
+                    subject,
+                    body,
+                    now,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                ),
+            )
+            conn.commit()
+            return int(cur.lastrowid)
+
+    def get(self, outbox_id: int) -> Optional[JSONDict]:
+        """Fetch a single outbox row."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM outbox WHERE id = ?", (outbox_id,)
+            ).fetchone()
+            return self._row_to_dict(row)
+
+    def claim_batch(self, limit: int, lease_seconds: float = 300.0) -> List[JSONDict]:
+        """
+        Atomically claim up to `limit` due messages for this sender.
+
+        Claimed rows are leased: if the sender dies before recording an
+        outcome, they become claimable again once the lease expires.
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.isolation_level = None  # explicit transaction below
+        try:
+            # IMMEDIATE takes the write lock up front, so two senders
+            # (threads or processes) never claim the same rows
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                """
+                SELECT * FROM outbox
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'sending' AND locked_until <= ?)
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+                """,
+                (now, now, limit),
+            ).fetchall()
+            ids = [row["id"] for row in rows]
+            conn.executemany(
+                "UPDATE outbox SET status = 'sending', locked_until = ? WHERE id = ?",
+                [(now + lease_seconds, i) for i in ids],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+        return [self._row_to_dict(row) for row in rows]  # type: ignore[misc]
+
+    def mark_sent(self, outbox_id: int, message_id: Optional[str]) -> None:
+        """Record a successful send."""
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE outbox
+                SET status = 'sent', attempts = attempts + 1, message_id = ?,
+                    sent_at = ?, locked_until = NULL, last_error = NULL
+                WHERE id = ?
+                """,
+                (
+                    message_id,
+                    datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    outbox_id,
+                ),
+            )
+            conn.commit()
+
+    def mark_failed(
+        self,
+        outbox_id: int,
+        error: str,
+        retry_at: Optional[float],
+    ) -> None:
+        """
+        Record a failed attempt. With `retry_at` the message goes back to
+        `pending` until then; without it the message is given up (`failed`).
+        """
+        status = "pending" if retry_at is not None else "failed"
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE outbox
+                SET status = ?, attempts = attempts + 1, last_error = ?,
+                    next_attempt_at = COALESCE(?, next_attempt_at),
+                    locked_until = NULL
+                WHERE id = ?
+                """,
+                (status, error, retry_at, outbox_id),
+            )
+            conn.commit()
+
+    def counts(self) -> Dict[str, int]:
+        """Number of messages per status."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT status, COUNT(*) AS n FROM outbox GROUP BY status"
+            ).fetchall()
+            return {row["status"]: row["n"] for row in rows}
@@ -0,0 +1,211 @@
+import os
+import random
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+# Coordination state only, so it lives in its own small file rather than
+# schema.sql / finance.db: waiting for a quota never contends with the
+# finance writes, and the file can be deleted at any time.
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_buckets (
+    backend TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS rate_leases (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    backend TEXT NOT NULL,
+    pid INTEGER NOT NULL,
+    expires_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_rate_leases_backend
+    ON rate_leases(backend, expires_at);
+"""
+
+# Longest sleep between two attempts while waiting for a slot
+MAX_POLL_SECONDS = 0.25
+
+
+class RateLimitTimeout(TimeoutError):
+    """No slot of the backend became free within the allowed wait."""
+
+
+@dataclass(frozen=True)
+class BackendLimit:
+    """
+    Limits of one external backend, shared by every process.
+
+    rate: calls per second the token bucket refills with (None: no rate limit).
+    burst: bucket size, i.e. calls allowed back to back after a quiet period.
+    max_concurrent: calls in flight at the same time (None: no limit).
+    """
+
+    rate: Optional[float] = None
+    burst: float = 1.0
+    max_concurrent: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, settings: Dict) -> "BackendLimit":
+        return cls(
+            rate=settings.get("rate"),
+            burst=settings.get("burst") or 1.0,
+            max_concurrent=settings.get("max_concurrent"),
+        )
+
+
+class RateLimiter:
+    """
+    Token bucket plus semaphore per backend, in SQLite, so that all worker
+    processes on the machine share the same quotas.
+
+    Every acquisition is one IMMEDIATE transaction: refill the bucket,
+    check the in-flight leases, take a token and a lease, or report how
+    long to wait. Leases expire after `lease_seconds`, so a crashed
+    process cannot hold a slot forever.
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        limits: Dict[str, BackendLimit],
+        lease_seconds: float = 600.0,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.limits = limits
+        self.lease_seconds = lease_seconds
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        if not self._schema_ready:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            try:
+                conn.executescript(_SCHEMA)
+            finally:
+                conn.close()
+            self._schema_ready = True
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def try_acquire(self, backend: str, cost: float = 1.0) -> Tuple[Optional[int], float]:
+        """
+        One attempt: (lease id, 0) when the call may go ahead, (None, seconds
+        to wait before trying again) otherwise. The lease id is 0 when the
+        backend has no concurrency limit (nothing to release).
+        """
+        limit = self.limits.get(backend)
+        if limit is None:
+            return 0, 0.0
+        # A cost above the bucket size could never be paid
+        cost = min(cost, limit.burst)
+
+        conn = self._connect()
+        conn.isolation_level = None  # explicit transaction below
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            now = time.time()
+
+            if limit.max_concurrent is not None:
+                conn.execute(
+                    "DELETE FROM rate_leases WHERE backend = ? AND expires_at < ?",
+                    (backend, now),
+                )
+                (in_flight,) = conn.execute(
+                    "SELECT COUNT(*) FROM rate_leases WHERE backend = ?", (backend,)
+                ).fetchone()
+                if in_flight >= limit.max_concurrent:
+                    conn.execute("ROLLBACK")
+                    return None, MAX_POLL_SECONDS
+
+            if limit.rate:
+                row = conn.execute(
+                    "SELECT tokens, updated_at FROM rate_buckets WHERE backend = ?",
+                    (backend,),
+                ).fetchone()
+                tokens = limit.burst
+                if row is not None:
+                    elapsed = max(0.0, now - row["updated_at"])
+                    tokens = min(limit.burst, row["tokens"] + elapsed * limit.rate)
+                if tokens < cost:
+                    conn.execute("ROLLBACK")
+                    return None, (cost - tokens) / limit.rate
+                conn.execute(
+                    """
+                    INSERT INTO rate_buckets (backend, tokens, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(backend) DO UPDATE SET
+                        tokens = excluded.tokens,
+                        updated_at = excluded.updated_at
+                    """,
+                    (backend, tokens - cost, now),
+                )
+
+            lease_id = 0
+            if limit.max_concurrent is not None:
+                cur = conn.execute(
+                    "INSERT INTO rate_leases (backend, pid, expires_at) VALUES (?, ?, ?)",
+                    (backend, os.getpid(), now + self.lease_seconds),
+                )
+                lease_id = int(cur.lastrowid)
+
+            conn.execute("COMMIT")
+            return lease_id, 0.0
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def acquire(self, backend: str, cost: float = 1.0, timeout: Optional[float] = None) -> int:
+        """
+        Wait for a slot of `backend` and return its lease id (pass it to
+        release()). Raises RateLimitTimeout after `timeout` seconds.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            lease_id, wait = self.try_acquire(backend, cost)
+            if lease_id is not None:
+                return lease_id
+            if deadline is not None and time.monotonic() + min(wait, MAX_POLL_SECONDS) > deadline:
+                raise RateLimitTimeout(
+                    f"No {backend} slot became free within {timeout:.0f}s"
+                )
+            # Jitter so waiting processes do not retry in lockstep
+            time.sleep(min(wait, MAX_POLL_SECONDS) * random.uniform(0.5, 1.0))
+
+    def release(self, lease_id: int) -> None:
+        """Free the concurrency slot of a finished call."""
+        if not lease_id:
+            return
+        with self._connect() as conn:
+            conn.execute("DELETE FROM rate_leases WHERE id = ?", (lease_id,))
+            conn.commit()
+
+    @contextmanager
+    def slot(
+        self, backend: str, cost: float = 1.0, timeout: Optional[float] = None
+    ) -> Iterator[float]:
+        """Hold a slot of `backend` for the block; yields the seconds waited for it."""
+        start = time.monotonic()
+        lease_id = self.acquire(backend, cost, timeout)
+        try:
+            yield time.monotonic() - start
+        finally:
+            self.release(lease_id)
+
+    def in_flight(self, backend: str) -> int:
+        """Live leases of `backend` (all processes)."""
+        with self._connect() as conn:
+            (count,) = conn.execute(
+                "SELECT COUNT(*) FROM rate_leases WHERE backend = ? AND expires_at >= ?",
+                (backend, time.time()),
+            ).fetchone()
+        return int(count)
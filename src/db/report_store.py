@@ -0,0 +1,144 @@
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+JSONDict = Dict[str, Any]
+
+# Recomputes the report_* tables from invoices / tickets. The schema
+# triggers keep them current afterwards; this is only needed for a DB that
+# had data before the tables existed (see init_db.apply_schema).
+REBUILD_SQL = """
+DELETE FROM report_suppliers;
+DELETE FROM report_months;
+DELETE FROM report_ticket_counts;
+
+INSERT INTO report_suppliers (
+    supplier_name, invoice_count, total_amount, ticket_count, disputed_invoices
+)
+SELECT COALESCE(i.supplier_name, ''),
+       COUNT(*),
+       SUM(COALESCE(i.total_amount, 0)),
+       SUM(COALESCE(t.n, 0)),
+       SUM(COALESCE(t.n, 0) > 0)
+FROM invoices i
+LEFT JOIN (SELECT invoice_id, COUNT(*) AS n FROM tickets GROUP BY invoice_id) t
+    ON t.invoice_id = i.invoice_id
+GROUP BY 1;
+
+INSERT INTO report_months (month, invoice_count, total_amount, ticket_count)
+SELECT month, SUM(invoice_count), SUM(total_amount), SUM(ticket_count)
+FROM (
+    SELECT substr(COALESCE(invoice_date, ''), 1, 7) AS month,
+           1 AS invoice_count, COALESCE(total_amount, 0) AS total_amount, 0 AS ticket_count
+    FROM invoices
+    UNION ALL
+    SELECT substr(COALESCE(created_date, ''), 1, 7), 0, 0, 1
+    FROM tickets
+)
+GROUP BY month;
+
+INSERT INTO report_ticket_counts (status, priority, department, ticket_count)
+SELECT COALESCE(status, ''), COALESCE(priority, ''), COALESCE(department, ''), COUNT(*)
+FROM tickets
+GROUP BY 1, 2, 3;
+"""
+
+
+def rebuild_reports(conn: sqlite3.Connection) -> None:
+    """Recompute every report table on an open connection."""
+    conn.executescript(f"BEGIN;\n{REBUILD_SQL}\nCOMMIT;")
+
+
+class ReportStore:
+    """
+    Supplier / month / ticket-status analytics for the Reports tab.
+
+    Reads only the report_* summary tables that the schema triggers keep
+    current on every invoice and ticket write, so each report costs the
+    same whatever the size of the history.
+    """
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = Path(db_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _supplier_row(row: sqlite3.Row) -> JSONDict:
+        data = {k: row[k] for k in row.keys()}
+        data["total_amount"] = round(data["total_amount"], 2)
+        count = data["invoice_count"]
+        data["discrepancy_rate"] = round(data["disputed_invoices"] / count, 4) if count else 0.0
+        return data
+
+    def suppliers(self, limit: Optional[int] = None) -> List[JSONDict]:
+        """
+        Per supplier: invoices, total amount, tickets and the discrepancy
+        rate (share of its invoices with at least one ticket), highest first.
+        """
+        sql = """
+            SELECT * FROM report_suppliers
+            ORDER BY CAST(disputed_invoices AS REAL) / MAX(invoice_count, 1) DESC,
+                     invoice_count DESC
+        """
+        params: tuple = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [self._supplier_row(r) for r in rows]
+
+    def supplier(self, supplier_name: str) -> Optional[JSONDict]:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM report_suppliers WHERE supplier_name = ?",
+                (supplier_name,),
+            ).fetchone()
+        return self._supplier_row(row) if row is not None else None
+
+    def months(self) -> List[JSONDict]:
+        """Invoices (by invoice date) and tickets (by creation date) per month, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM report_months ORDER BY month").fetchall()
+        return [
+            {**{k: r[k] for k in r.keys()}, "total_amount": round(r["total_amount"], 2)}
+            for r in rows
+        ]
+
+    def ticket_counts(
+        self,
+        status: Optional[str] = None,
+        priority: Optional[str] = None,
+        department: Optional[str] = None,
+    ) -> List[JSONDict]:
+        """Ticket counts per (status, priority, department), optionally filtered."""
+        filters = {"status": status, "priority": priority, "department": department}
+        where = [f"{column} = ?" for column, value in filters.items() if value is not None]
+        params = [value for value in filters.values() if value is not None]
+        sql = "SELECT * FROM report_ticket_counts"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY ticket_count DESC, status, priority, department"
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return [{k: r[k] for k in r.keys()} for r in rows]
+
+    def open_tickets_by_department(self, priority: Optional[str] = "High") -> Dict[str, int]:
+        """Open tickets per department (of one priority, or all with None)."""
+        counts: Dict[str, int] = {}
+        for row in self.ticket_counts(status="Open", priority=priority):
+            counts[row["department"]] = counts.get(row["department"], 0) + row["ticket_count"]
+        return counts
+
+    def rebuild(self) -> None:
+        """Recompute the report tables from scratch (e.g. after bulk edits by hand)."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        try:
+            rebuild_reports(conn)
+        finally:
+            conn.close()
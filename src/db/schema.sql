@@ -8,9 +8,16 @@ CREATE TABLE IF NOT EXISTS invoices (
     tax_amount      REAL,
     currency        TEXT,
     status          TEXT,   -- recorded / paid / pending
-    source_file     TEXT    -- path to the PDF
+    source_file     TEXT,   -- path to the PDF
+    row_version     INTEGER NOT NULL DEFAULT 1,  -- bumped on every upsert
+    invoice_key     TEXT,   -- normalize_invoice_id(invoice_id): INV_2025_001 -> INV2025001
+    supplier_key    TEXT    -- normalize_supplier_name(supplier_name)
 );
 
+-- DBClient.find_invoice: the same invoice under another spelling of its ID
+CREATE INDEX IF NOT EXISTS idx_invoices_key ON invoices (invoice_key);
+CREATE INDEX IF NOT EXISTS idx_invoices_supplier_key ON invoices (supplier_key);
+
 CREATE TABLE IF NOT EXISTS tickets (
     ticket_id       TEXT PRIMARY KEY,
     invoice_id      TEXT,
@@ -22,5 +29,470 @@ CREATE TABLE IF NOT EXISTS tickets (
     issue_type      TEXT,   -- Amount mismatch / Tax issue / etc.
     recorded_amount REAL,   -- amount in system (according to ticket)
     document_amount REAL,   -- amount on invoice (according to ticket)
-    description     TEXT
+    description     TEXT,
+    dedup_key       TEXT,   -- ticket_dedup_key(invoice, issue, amounts); NULL for tickets created before it
+    resolved_at     TEXT,   -- set when the ticket is resolved automatically (see Rereconciler)
+    resolution      TEXT
+);
+
+-- One open ticket per discrepancy: DBClient.create_ticket returns the existing
+-- row on retries, while a discrepancy that comes back after its ticket was
+-- resolved / closed gets a new one. Replaces the first, status-blind index.
+DROP INDEX IF EXISTS idx_tickets_dedup;
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tickets_dedup_open ON tickets (dedup_key)
+    WHERE status IN ('Open', 'In Progress');
+
+-- DBClient.list_tickets_for_invoice (newest first) without scanning all tickets
+CREATE INDEX IF NOT EXISTS idx_tickets_invoice ON tickets (invoice_id, created_date);
+
+-- Uploaded PDFs, stored under their SHA-256
+CREATE TABLE IF NOT EXISTS uploads (
+    content_hash    TEXT PRIMARY KEY,   -- sha256 of the file bytes
+    original_name   TEXT,
+    stored_path     TEXT,
+    size_bytes      INTEGER,
+    uploaded_at     TEXT,
+    last_seen_at    TEXT,
+    upload_count    INTEGER NOT NULL DEFAULT 1
+);
+
+-- Last workflow result per upload, valid while the referenced invoice row is unchanged
+CREATE TABLE IF NOT EXISTS workflow_results (
+    content_hash        TEXT PRIMARY KEY,
+    invoice_id          TEXT,
+    invoice_row_version INTEGER,   -- NULL if the invoice was not in the DB
+    instruction_hash    TEXT NOT NULL DEFAULT '',   -- UploadStore.instruction_hash of the run
+    result_json         TEXT,
+    created_at          TEXT
+);
+
+-- Results to re-check when their invoice changes (see Rereconciler)
+CREATE INDEX IF NOT EXISTS idx_workflow_results_invoice ON workflow_results (invoice_id);
+
+-- Emails written by the workflow, sent in the background by OutboxSender
+CREATE TABLE IF NOT EXISTS outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    recipient       TEXT NOT NULL,
+    subject         TEXT,
+    body            TEXT,
+    status          TEXT NOT NULL DEFAULT 'pending',  -- pending / sending / sent / failed
+    attempts        INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,   -- unix time, backoff for retries
+    locked_until    REAL,            -- lease of the sender that claimed the row
+    last_error      TEXT,
+    message_id      TEXT,            -- Gmail message id once sent
+    created_at      TEXT,
+    sent_at         TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (status, next_attempt_at);
+
+-- Cached LLM outputs (e.g. email drafts), keyed by a hash of their inputs
+CREATE TABLE IF NOT EXISTS llm_cache (
+    kind        TEXT NOT NULL,   -- email_draft / ...
+    cache_key   TEXT NOT NULL,   -- sha256 of the model, prompt version and JSON inputs
+    value       TEXT,
+    created_at  TEXT,
+    PRIMARY KEY (kind, cache_key)
+);
+
+-- Parsed document text, referenced everywhere else by handle (doc://<doc_hash>)
+CREATE TABLE IF NOT EXISTS documents (
+    doc_hash    TEXT PRIMARY KEY,   -- sha256 of the text
+    text        TEXT NOT NULL,
+    source_path TEXT,
+    source_hash TEXT,               -- sha256 of the PDF the text was parsed from
+    char_count  INTEGER,
+    created_at  TEXT
+);
+
+-- DocumentStore.find_by_source: a PDF parsed before is not sent to LlamaParse again
+CREATE INDEX IF NOT EXISTS idx_documents_source ON documents (source_hash);
+
+-- Spans of traced runs (document workflow, chat turns, outbox batches), one row per span
+CREATE TABLE IF NOT EXISTS traces (
+    run_id            TEXT NOT NULL,
+    span_id           INTEGER NOT NULL,   -- creation order within the run, 0 = the run itself
+    parent_id         INTEGER,
+    name              TEXT NOT NULL,
+    kind              TEXT NOT NULL,      -- run / step / llm / tool / io
+    backend           TEXT,               -- llamaparse / ollama / hf_inference / gmail / ...
+    start_ts          REAL NOT NULL,      -- unix time
+    duration_ms       REAL,
+    status            TEXT NOT NULL DEFAULT 'ok',  -- ok / error
+    error             TEXT,
+    input_bytes       INTEGER,
+    output_bytes      INTEGER,
+    prompt_tokens     INTEGER,
+    completion_tokens INTEGER,
+    attrs_json        TEXT,
+    PRIMARY KEY (run_id, span_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_traces_runs ON traces (kind, start_ts);
+
+-- Next ticket number per year; TicketIdAllocator reserves blocks from it
+CREATE TABLE IF NOT EXISTS ticket_id_counters (
+    year        INTEGER PRIMARY KEY,
+    next_value  INTEGER NOT NULL
+);
+
+-- Completed stages of unfinished agent runs, per PDF (see CheckpointStore)
+CREATE TABLE IF NOT EXISTS run_checkpoints (
+    content_hash    TEXT NOT NULL,      -- sha256 of the PDF bytes
+    checkpoint_key  TEXT NOT NULL,      -- tool name, plus a hash of its inputs for pure tools
+    stage           TEXT NOT NULL,      -- parse / extraction / math / reconciliation / ticket / email ...
+    output_json     TEXT,
+    created_at      REAL NOT NULL,      -- unix time
+    PRIMARY KEY (content_hash, checkpoint_key)
+);
+
+-- Reporting summaries (see ReportStore), kept current by the triggers below
+-- so reports read a handful of rows whatever the size of invoices / tickets.
+-- Unknown suppliers / dates / statuses are grouped under ''.
+CREATE TABLE IF NOT EXISTS report_suppliers (
+    supplier_name     TEXT PRIMARY KEY,
+    invoice_count     INTEGER NOT NULL DEFAULT 0,
+    total_amount      REAL NOT NULL DEFAULT 0,
+    ticket_count      INTEGER NOT NULL DEFAULT 0,   -- tickets on this supplier's invoices
+    disputed_invoices INTEGER NOT NULL DEFAULT 0    -- invoices with at least one ticket
+);
+
+CREATE TABLE IF NOT EXISTS report_months (
+    month         TEXT PRIMARY KEY,   -- YYYY-MM
+    invoice_count INTEGER NOT NULL DEFAULT 0,   -- by invoice_date
+    total_amount  REAL NOT NULL DEFAULT 0,
+    ticket_count  INTEGER NOT NULL DEFAULT 0    -- by created_date
+);
+
+CREATE TABLE IF NOT EXISTS report_ticket_counts (
+    status       TEXT NOT NULL,
+    priority     TEXT NOT NULL,
+    department   TEXT NOT NULL,
+    ticket_count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (status, priority, department)
+);
+
+-- Invoices: add the new row, subtract the old one (an upsert is an UPDATE).
+-- Tickets count for the supplier of their invoice, so they move with it.
+CREATE TRIGGER IF NOT EXISTS trg_report_invoice_insert AFTER INSERT ON invoices
+BEGIN
+    INSERT INTO report_suppliers (
+        supplier_name, invoice_count, total_amount, ticket_count, disputed_invoices
+    )
+    SELECT COALESCE(NEW.supplier_name, ''), 1, COALESCE(NEW.total_amount, 0),
+           COUNT(*), COUNT(*) > 0
+    FROM tickets WHERE invoice_id = NEW.invoice_id
+    ON CONFLICT(supplier_name) DO UPDATE SET
+        invoice_count = invoice_count + excluded.invoice_count,
+        total_amount = total_amount + excluded.total_amount,
+        ticket_count = ticket_count + excluded.ticket_count,
+        disputed_invoices = disputed_invoices + excluded.disputed_invoices;
+
+    INSERT INTO report_months (month, invoice_count, total_amount)
+    VALUES (substr(COALESCE(NEW.invoice_date, ''), 1, 7), 1, COALESCE(NEW.total_amount, 0))
+    ON CONFLICT(month) DO UPDATE SET
+        invoice_count = invoice_count + 1,
+        total_amount = total_amount + excluded.total_amount;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_report_invoice_delete AFTER DELETE ON invoices
+BEGIN
+    UPDATE report_suppliers SET
+        invoice_count = invoice_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0),
+        ticket_count = ticket_count
+            - (SELECT COUNT(*) FROM tickets WHERE invoice_id = OLD.invoice_id),
+        disputed_invoices = disputed_invoices
+            - EXISTS (SELECT 1 FROM tickets WHERE invoice_id = OLD.invoice_id)
+    WHERE supplier_name = COALESCE(OLD.supplier_name, '');
+    DELETE FROM report_suppliers
+    WHERE supplier_name = COALESCE(OLD.supplier_name, '') AND invoice_count <= 0;
+
+    UPDATE report_months SET
+        invoice_count = invoice_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0)
+    WHERE month = substr(COALESCE(OLD.invoice_date, ''), 1, 7);
+    DELETE FROM report_months
+    WHERE month = substr(COALESCE(OLD.invoice_date, ''), 1, 7)
+      AND invoice_count <= 0 AND ticket_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_report_invoice_update AFTER UPDATE ON invoices
+BEGIN
+    UPDATE report_suppliers SET
+        invoice_count = invoice_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0),
+        ticket_count = ticket_count
+            - (SELECT COUNT(*) FROM tickets WHERE invoice_id = OLD.invoice_id),
+        disputed_invoices = disputed_invoices
+            - EXISTS (SELECT 1 FROM tickets WHERE invoice_id = OLD.invoice_id)
+    WHERE supplier_name = COALESCE(OLD.supplier_name, '');
+
+    INSERT INTO report_suppliers (
+        supplier_name, invoice_count, total_amount, ticket_count, disputed_invoices
+    )
+    SELECT COALESCE(NEW.supplier_name, ''), 1, COALESCE(NEW.total_amount, 0),
+           COUNT(*), COUNT(*) > 0
+    FROM tickets WHERE invoice_id = NEW.invoice_id
+    ON CONFLICT(supplier_name) DO UPDATE SET
+        invoice_count = invoice_count + excluded.invoice_count,
+        total_amount = total_amount + excluded.total_amount,
+        ticket_count = ticket_count + excluded.ticket_count,
+        disputed_invoices = disputed_invoices + excluded.disputed_invoices;
+
+    DELETE FROM report_suppliers
+    WHERE supplier_name = COALESCE(OLD.supplier_name, '') AND invoice_count <= 0;
+
+    UPDATE report_months SET
+        invoice_count = invoice_count - 1,
+        total_amount = total_amount - COALESCE(OLD.total_amount, 0)
+    WHERE month = substr(COALESCE(OLD.invoice_date, ''), 1, 7);
+
+    INSERT INTO report_months (month, invoice_count, total_amount)
+    VALUES (substr(COALESCE(NEW.invoice_date, ''), 1, 7), 1, COALESCE(NEW.total_amount, 0))
+    ON CONFLICT(month) DO UPDATE SET
+        invoice_count = invoice_count + 1,
+        total_amount = total_amount + excluded.total_amount;
+
+    DELETE FROM report_months
+    WHERE month = substr(COALESCE(OLD.invoice_date, ''), 1, 7)
+      AND invoice_count <= 0 AND ticket_count <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_report_ticket_insert AFTER INSERT ON tickets
+BEGIN
+    UPDATE report_suppliers SET
+        ticket_count = ticket_count + 1,
+        disputed_invoices = disputed_invoices + NOT EXISTS (
+            SELECT 1 FROM tickets WHERE invoice_id = NEW.invoice_id AND rowid <> NEW.rowid
+        )
+    WHERE supplier_name = (
+        SELECT COALESCE(supplier_name, '') FROM invoices WHERE invoice_id = NEW.invoice_id
+    );
+
+    INSERT INTO report_months (month, ticket_count)
+    VALUES (substr(COALESCE(NEW.created_date, ''), 1, 7), 1)
+    ON CONFLICT(month) DO UPDATE SET ticket_count = ticket_count + 1;
+
+    INSERT INTO report_ticket_counts (status, priority, department, ticket_count)
+    VALUES (COALESCE(NEW.status, ''), COALESCE(NEW.priority, ''), COALESCE(NEW.department, ''), 1)
+    ON CONFLICT(status, priority, department) DO UPDATE SET ticket_count = ticket_count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_report_ticket_delete AFTER DELETE ON tickets
+BEGIN
+    UPDATE report_suppliers SET
+        ticket_count = ticket_count - 1,
+        disputed_invoices = disputed_invoices - NOT EXISTS (
+            SELECT 1 FROM tickets WHERE invoice_id = OLD.invoice_id
+        )
+    WHERE supplier_name = (
+        SELECT COALESCE(supplier_name, '') FROM invoices WHERE invoice_id = OLD.invoice_id
+    );
+
+    UPDATE report_months SET ticket_count = ticket_count - 1
+    WHERE month = substr(COALESCE(OLD.created_date, ''), 1, 7);
+    DELETE FROM report_months
+    WHERE month = substr(COALESCE(OLD.created_date, ''), 1, 7)
+      AND invoice_count <= 0 AND ticket_count <= 0;
+
+    UPDATE report_ticket_counts SET ticket_count = ticket_count - 1
+    WHERE status = COALESCE(OLD.status, '')
+      AND priority = COALESCE(OLD.priority, '')
+      AND department = COALESCE(OLD.department, '');
+    DELETE FROM report_ticket_counts WHERE ticket_count <= 0;
+END;
+
+-- A ticket moved to another invoice (rare; by hand)
+CREATE TRIGGER IF NOT EXISTS trg_report_ticket_move AFTER UPDATE OF invoice_id ON tickets
+WHEN OLD.invoice_id IS NOT NEW.invoice_id
+BEGIN
+    UPDATE report_suppliers SET
+        ticket_count = ticket_count - 1,
+        disputed_invoices = disputed_invoices - NOT EXISTS (
+            SELECT 1 FROM tickets WHERE invoice_id = OLD.invoice_id
+        )
+    WHERE supplier_name = (
+        SELECT COALESCE(supplier_name, '') FROM invoices WHERE invoice_id = OLD.invoice_id
+    );
+
+    UPDATE report_suppliers SET
+        ticket_count = ticket_count + 1,
+        disputed_invoices = disputed_invoices + NOT EXISTS (
+            SELECT 1 FROM tickets WHERE invoice_id = NEW.invoice_id AND rowid <> NEW.rowid
+        )
+    WHERE supplier_name = (
+        SELECT COALESCE(supplier_name, '') FROM invoices WHERE invoice_id = NEW.invoice_id
+    );
+END;
+
+-- Status / priority / department changes (e.g. a ticket resolved)
+CREATE TRIGGER IF NOT EXISTS trg_report_ticket_update
+AFTER UPDATE OF created_date, status, priority, department ON tickets
+BEGIN
+    UPDATE report_months SET ticket_count = ticket_count - 1
+    WHERE month = substr(COALESCE(OLD.created_date, ''), 1, 7);
+
+    INSERT INTO report_months (month, ticket_count)
+    VALUES (substr(COALESCE(NEW.created_date, ''), 1, 7), 1)
+    ON CONFLICT(month) DO UPDATE SET ticket_count = ticket_count + 1;
+
+    DELETE FROM report_months
+    WHERE month = substr(COALESCE(OLD.created_date, ''), 1, 7)
+      AND invoice_count <= 0 AND ticket_count <= 0;
+
+    UPDATE report_ticket_counts SET ticket_count = ticket_count - 1
+    WHERE status = COALESCE(OLD.status, '')
+      AND priority = COALESCE(OLD.priority, '')
+      AND department = COALESCE(OLD.department, '');
+
+    INSERT INTO report_ticket_counts (status, priority, department, ticket_count)
+    VALUES (COALESCE(NEW.status, ''), COALESCE(NEW.priority, ''), COALESCE(NEW.department, ''), 1)
+    ON CONFLICT(status, priority, department) DO UPDATE SET ticket_count = ticket_count + 1;
+
+    DELETE FROM report_ticket_counts WHERE ticket_count <= 0;
+END;
+
+-- Full-text search (see SearchIndex): FTS5 indexes over the searchable
+-- columns of invoices, tickets and documents. External content, so the text
+-- is stored once; the triggers below keep the indexes in sync with every write.
+CREATE VIRTUAL TABLE IF NOT EXISTS invoices_fts USING fts5(
+    invoice_id, supplier_name, customer_name,
+    content='invoices', content_rowid='rowid'
 );
+
+CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+    ticket_id, invoice_id, issue_type, department, description,
+    content='tickets', content_rowid='rowid'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    source_path, text,
+    content='documents', content_rowid='rowid'
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_invoices_fts_insert AFTER INSERT ON invoices
+BEGIN
+    INSERT INTO invoices_fts (rowid, invoice_id, supplier_name, customer_name)
+    VALUES (NEW.rowid, NEW.invoice_id, NEW.supplier_name, NEW.customer_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoices_fts_delete AFTER DELETE ON invoices
+BEGIN
+    INSERT INTO invoices_fts (invoices_fts, rowid, invoice_id, supplier_name, customer_name)
+    VALUES ('delete', OLD.rowid, OLD.invoice_id, OLD.supplier_name, OLD.customer_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoices_fts_update
+AFTER UPDATE OF invoice_id, supplier_name, customer_name ON invoices
+BEGIN
+    INSERT INTO invoices_fts (invoices_fts, rowid, invoice_id, supplier_name, customer_name)
+    VALUES ('delete', OLD.rowid, OLD.invoice_id, OLD.supplier_name, OLD.customer_name);
+    INSERT INTO invoices_fts (rowid, invoice_id, supplier_name, customer_name)
+    VALUES (NEW.rowid, NEW.invoice_id, NEW.supplier_name, NEW.customer_name);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_insert AFTER INSERT ON tickets
+BEGIN
+    INSERT INTO tickets_fts (rowid, ticket_id, invoice_id, issue_type, department, description)
+    VALUES (
+        NEW.rowid, NEW.ticket_id, NEW.invoice_id, NEW.issue_type, NEW.department,
+        NEW.description
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_delete AFTER DELETE ON tickets
+BEGIN
+    INSERT INTO tickets_fts (
+        tickets_fts, rowid, ticket_id, invoice_id, issue_type, department, description
+    )
+    VALUES (
+        'delete', OLD.rowid, OLD.ticket_id, OLD.invoice_id, OLD.issue_type, OLD.department,
+        OLD.description
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_tickets_fts_update
+AFTER UPDATE OF ticket_id, invoice_id, issue_type, department, description ON tickets
+BEGIN
+    INSERT INTO tickets_fts (
+        tickets_fts, rowid, ticket_id, invoice_id, issue_type, department, description
+    )
+    VALUES (
+        'delete', OLD.rowid, OLD.ticket_id, OLD.invoice_id, OLD.issue_type, OLD.department,
+        OLD.description
+    );
+    INSERT INTO tickets_fts (rowid, ticket_id, invoice_id, issue_type, department, description)
+    VALUES (
+        NEW.rowid, NEW.ticket_id, NEW.invoice_id, NEW.issue_type, NEW.department,
+        NEW.description
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_documents_fts_insert AFTER INSERT ON documents
+BEGIN
+    INSERT INTO documents_fts (rowid, source_path, text)
+    VALUES (NEW.rowid, NEW.source_path, NEW.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_documents_fts_delete AFTER DELETE ON documents
+BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, source_path, text)
+    VALUES ('delete', OLD.rowid, OLD.source_path, OLD.text);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_documents_fts_update AFTER UPDATE OF source_path, text ON documents
+BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, source_path, text)
+    VALUES ('delete', OLD.rowid, OLD.source_path, OLD.text);
+    INSERT INTO documents_fts (rowid, source_path, text)
+    VALUES (NEW.rowid, NEW.source_path, NEW.text);
+END;
+
+-- Invoices changed (inserted, or row_version bumped) since their documents and
+-- tickets were last reconciled; drained by the Rereconciler (see InvoiceChangeQueue)
+CREATE TABLE IF NOT EXISTS invoice_changes (
+    invoice_id   TEXT PRIMARY KEY,
+    row_version  INTEGER NOT NULL,   -- latest version to check
+    changed_at   REAL NOT NULL,      -- unix time
+    locked_until REAL                -- lease of the worker processing it
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_changes_insert AFTER INSERT ON invoices
+BEGIN
+    INSERT INTO invoice_changes (invoice_id, row_version, changed_at)
+    VALUES (NEW.invoice_id, NEW.row_version, (julianday('now') - 2440587.5) * 86400.0)
+    ON CONFLICT(invoice_id) DO UPDATE SET
+        row_version = excluded.row_version,
+        changed_at = excluded.changed_at,
+        locked_until = NULL;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_invoice_changes_update AFTER UPDATE OF row_version ON invoices
+WHEN NEW.row_version IS NOT OLD.row_version
+BEGIN
+    INSERT INTO invoice_changes (invoice_id, row_version, changed_at)
+    VALUES (NEW.invoice_id, NEW.row_version, (julianday('now') - 2440587.5) * 86400.0)
+    ON CONFLICT(invoice_id) DO UPDATE SET
+        row_version = excluded.row_version,
+        changed_at = excluded.changed_at,
+        locked_until = NULL;
+END;
+
+-- Fuzzy lookup indexes of the invoice / supplier keys
+-- (DBClient.lookup_invoices / lookup_suppliers), one entry set per distinct
+-- key; keys no invoice uses any more are skipped at lookup time.
+-- Invoice keys under themselves and each of their one-character deletions
+CREATE TABLE IF NOT EXISTS invoice_key_variants (
+    variant     TEXT NOT NULL,
+    invoice_key TEXT NOT NULL,
+    PRIMARY KEY (variant, invoice_key)
+) WITHOUT ROWID;
+
+-- Supplier keys under each of their character trigrams
+CREATE TABLE IF NOT EXISTS supplier_trigrams (
+    trigram      TEXT NOT NULL,
+    supplier_key TEXT NOT NULL,
+    PRIMARY KEY (trigram, supplier_key)
+) WITHOUT ROWID;
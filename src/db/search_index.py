@@ -0,0 +1,147 @@
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+JSONDict = Dict[str, Any]
+
+FTS_TABLES = ("invoices_fts", "tickets_fts", "documents_fts")
+
+INVOICE = "invoice"
+TICKET = "ticket"
+DOCUMENT = "document"
+
+# Per kind: FTS table, content table, columns returned with each hit
+_SOURCES = {
+    INVOICE: (
+        "invoices_fts",
+        "invoices",
+        ("invoice_id", "supplier_name", "customer_name", "invoice_date", "total_amount", "currency"),
+    ),
+    TICKET: (
+        "tickets_fts",
+        "tickets",
+        ("ticket_id", "invoice_id", "status", "priority", "department", "issue_type"),
+    ),
+    DOCUMENT: (
+        "documents_fts",
+        "documents",
+        ("doc_hash", "source_path", "char_count"),
+    ),
+}
+
+# Words of a snippet around the best match
+SNIPPET_TOKENS = 16
+
+
+def rebuild_search_index(conn: sqlite3.Connection) -> None:
+    """Re-index every FTS table from its content table on an open connection."""
+    for table in FTS_TABLES:
+        conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def match_query(text: str, prefix: bool = True) -> Optional[str]:
+    """
+    FTS5 MATCH expression for free text: every whitespace-separated term
+    must match, as a quoted phrase so IDs like INV-2025-000 need no
+    escaping; the last term also matches as a prefix (search-as-you-type).
+    None when the text has no searchable term.
+    """
+    terms = [t for t in text.split() if re.search(r"\w", t)]
+    if not terms:
+        return None
+    phrases = ['"' + t.replace('"', '""') + '"' for t in terms]
+    if prefix:
+        phrases[-1] += "*"
+    return " ".join(phrases)
+
+
+class SearchIndex:
+    """
+    Ranked full-text search over invoices (IDs, supplier / customer names),
+    tickets (IDs, issue type, department, description) and the stored
+    document text, through the FTS5 tables of schema.sql.
+
+    Hits are ranked by BM25 within their kind (see search for how kinds
+    are merged) and carry a snippet with the matched terms wrapped in
+    `mark`.
+    """
+
+    def __init__(self, db_path: Path, mark: Tuple[str, str] = ("**", "**")) -> None:
+        self.db_path = Path(db_path)
+        self.mark = mark
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _search_kind(
+        self, conn: sqlite3.Connection, kind: str, match: str, limit: int
+    ) -> List[JSONDict]:
+        fts, content, columns = _SOURCES[kind]
+        select = ", ".join(f"c.{column}" for column in columns)
+        rows = conn.execute(
+            f"""
+            SELECT {select},
+                   bm25({fts}) AS score,
+                   snippet({fts}, -1, ?, ?, '…', ?) AS snippet
+            FROM {fts}
+            JOIN {content} c ON c.rowid = {fts}.rowid
+            WHERE {fts} MATCH ?
+            ORDER BY score
+            LIMIT ?
+            """,
+            (self.mark[0], self.mark[1], SNIPPET_TOKENS, match, limit),
+        ).fetchall()
+        return [
+            {"kind": kind, "id": row[columns[0]], **{k: row[k] for k in row.keys()}}
+            for row in rows
+        ]
+
+    def search(
+        self,
+        query: str,
+        kinds: Sequence[str] = (INVOICE, TICKET, DOCUMENT),
+        limit: int = 10,
+        raw: bool = False,
+    ) -> List[JSONDict]:
+        """
+        Best `limit` hits for `query` across `kinds`, best first.
+
+        Each FTS5 table has its own corpus statistics, so BM25 scores of
+        different kinds are not comparable (long document texts would
+        outrank every invoice and ticket). Each hit's `score` (BM25, lower
+        is better) is therefore turned into a `relevance` relative to the
+        best hit of its kind: 1.0 for that hit, towards 0 for weaker ones.
+        Hits are merged by relevance, ties in the order of `kinds`, so the
+        best invoice, ticket and document come first.
+
+        The query is free text (see match_query) unless `raw`, in which case
+        it is passed to FTS5 as is (AND / OR / NOT, "phrases", prefix*,
+        column filters like `supplier_name: acme`).
+        """
+        match = query if raw else match_query(query)
+        if not match:
+            return []
+
+        hits: List[JSONDict] = []
+        with self._connect() as conn:
+            for kind in kinds:
+                try:
+                    kind_hits = self._search_kind(conn, kind, match, limit)
+                except sqlite3.OperationalError as e:
+                    # A raw column filter names a column of another kind only
+                    if raw and "no such column" in str(e):
+                        continue
+                    raise
+                # BM25 scores are negative, lower is better; the first hit is the best
+                best = kind_hits[0]["score"] if kind_hits else 0.0
+                for hit in kind_hits:
+                    hit["relevance"] = round(hit["score"] / best, 4) if best < 0 else 1.0
+                hits.extend(kind_hits)
+        order = {kind: position for position, kind in enumerate(kinds)}
+        hits.sort(key=lambda hit: (-hit["relevance"], order[hit["kind"]]))
+        return hits[:limit]
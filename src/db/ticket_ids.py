@@ -0,0 +1,101 @@
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+# IDs reserved per round trip to the counter table
+DEFAULT_BLOCK_SIZE = 20
+
+
+def format_ticket_id(year: int, number: int) -> str:
+    """TCK-2025-0042 (at least 4 digits, like the IDs on sample tickets)."""
+    return f"TCK-{year}-{number:04d}"
+
+
+class TicketIdAllocator:
+    """
+    Hands out sequential ticket IDs from the per-year `ticket_id_counters`
+    table.
+
+    Each allocator reserves `block_size` numbers per transaction and serves
+    them from memory, so concurrent processes never collide and most IDs
+    cost no DB round trip. Numbers of a block left unused when the process
+    exits are skipped (IDs have gaps, never duplicates).
+    """
+
+    def __init__(self, db_path: Path, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        self.db_path = Path(db_path)
+        self.block_size = block_size
+        self._lock = threading.Lock()
+        # year -> (next number to hand out, end of the block, exclusive)
+        self._blocks: Dict[int, Tuple[int, int]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=30)
+
+    @staticmethod
+    def _first_free_number(conn: sqlite3.Connection, year: int) -> int:
+        """
+        Start of a new year's sequence: after every numeric ID already in
+        `tickets` (sample tickets, IDs from the old random scheme).
+        """
+        prefix = f"TCK-{year}-"
+        pattern = re.compile(rf"^{re.escape(prefix)}(\d+)$")
+        highest = 0
+        for (ticket_id,) in conn.execute(
+            "SELECT ticket_id FROM tickets WHERE ticket_id LIKE ?", (prefix + "%",)
+        ):
+            match = pattern.match(ticket_id or "")
+            if match:
+                highest = max(highest, int(match.group(1)))
+        return highest + 1
+
+    def _reserve_block(self, year: int) -> Tuple[int, int]:
+        conn = self._connect()
+        conn.isolation_level = None  # explicit transaction below
+        try:
+            # IMMEDIATE takes the write lock up front, so two processes
+            # never read the same next_value
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT next_value FROM ticket_id_counters WHERE year = ?", (year,)
+            ).fetchone()
+            start = row[0] if row else self._first_free_number(conn, year)
+            conn.execute(
+                """
+                INSERT INTO ticket_id_counters (year, next_value) VALUES (?, ?)
+                ON CONFLICT(year) DO UPDATE SET next_value = excluded.next_value
+                """,
+                (year, start + self.block_size),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        return start, start + self.block_size
+
+    def next_id(self, year: int) -> str:
+        """Next unused ticket ID for `year`."""
+        with self._lock:
+            start, end = self._blocks.get(year, (0, 0))
+            if start >= end:
+                start, end = self._reserve_block(year)
+            self._blocks[year] = (start + 1, end)
+        return format_ticket_id(year, start)
+
+
+_ALLOCATORS: Dict[Path, TicketIdAllocator] = {}
+_ALLOCATORS_LOCK = threading.Lock()
+
+
+def get_ticket_id_allocator(db_path: Path) -> TicketIdAllocator:
+    """Process-wide allocator of `db_path` (DBClient objects are short-lived)."""
+    key = Path(db_path).resolve()
+    with _ALLOCATORS_LOCK:
+        if key not in _ALLOCATORS:
+            _ALLOCATORS[key] = TicketIdAllocator(key)
+        return _ALLOCATORS[key]
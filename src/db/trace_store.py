@@ -0,0 +1,118 @@
+import json
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List
+
+JSONDict = Dict[str, Any]
+
+_COLUMNS = (
+    "run_id",
+    "span_id",
+    "parent_id",
+    "name",
+    "kind",
+    "backend",
+    "start_ts",
+    "duration_ms",
+    "status",
+    "error",
+    "input_bytes",
+    "output_bytes",
+    "prompt_tokens",
+    "completion_tokens",
+    "attrs_json",
+)
+
+
+class TraceStore:
+    """
+    Persists the spans collected by a Tracer in the `traces` table and
+    reads them back for the trace viewer.
+
+    Only the most recent `keep_runs` runs are kept.
+    """
+
+    def __init__(self, db_path: Path, keep_runs: int = 500) -> None:
+        self.db_path = Path(db_path)
+        self.keep_runs = keep_runs
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> JSONDict:
+        data = {k: row[k] for k in row.keys()}
+        data["attrs"] = json.loads(data.pop("attrs_json") or "{}")
+        return data
+
+    def save_run(self, run_id: str, spans: List[JSONDict]) -> None:
+        """Write all spans of a finished run in one transaction."""
+        rows = [
+            (
+                run_id,
+                s["span_id"],
+                s["parent_id"],
+                s["name"],
+                s["kind"],
+                s.get("backend"),
+                s["start"],
+                round((s["end"] - s["start"]) * 1000, 3) if s.get("end") else None,
+                s.get("status") or "ok",
+                s.get("error"),
+                s.get("input_bytes"),
+                s.get("output_bytes"),
+                s.get("prompt_tokens"),
+                s.get("completion_tokens"),
+                json.dumps(s.get("attrs") or {}, default=str),
+            )
+            for s in spans
+        ]
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._connect() as conn:
+            conn.executemany(
+                f"INSERT OR REPLACE INTO traces ({', '.join(_COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+            # Keep the table bounded: drop everything but the newest runs
+            conn.execute(
+                """
+                DELETE FROM traces WHERE run_id IN (
+                    SELECT run_id FROM traces WHERE kind = 'run'
+                    ORDER BY start_ts DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.keep_runs,),
+            )
+            conn.commit()
+
+    def list_runs(self, limit: int = 50) -> List[JSONDict]:
+        """Most recent runs (their root span), with token totals."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                """
+                SELECT r.*,
+                       COUNT(s.span_id) AS span_count,
+                       SUM(CASE WHEN s.kind = 'llm' THEN s.prompt_tokens END) AS total_prompt_tokens,
+                       SUM(CASE WHEN s.kind = 'llm' THEN s.completion_tokens END) AS total_completion_tokens
+                FROM traces r
+                JOIN traces s ON s.run_id = r.run_id
+                WHERE r.kind = 'run'
+                GROUP BY r.run_id
+                ORDER BY r.start_ts DESC
+                LIMIT ?
+                """,
+                (limit,),
+            ).fetchall()
+            return [self._row_to_dict(row) for row in rows]
+
+    def get_run(self, run_id: str) -> List[JSONDict]:
+        """All spans of a run, in start order."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT * FROM traces WHERE run_id = ? ORDER BY start_ts, span_id",
+                (run_id,),
+            ).fetchall()
+            return [self._row_to_dict(row) for row in rows]
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import sqlite3
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.db.fuzzy_index import normalize_invoice_id
+from src.observability import metrics
+
+JSONDict = Dict[str, Any]
+
+
+class UploadStore:
+    """
+    Content-addressed store for uploaded PDFs.
+
+    Responsibilities:
+      - write each upload once under `<upload_dir>/<sha256>.pdf`, with a
+        metadata row in the `uploads` table
+      - keep the last workflow result per upload in `workflow_results`,
+        tagged with the `row_version` of the invoice it refers to and the
+        user instruction it ran with, so an identical PDF submitted with the
+        same instruction, whose invoice has not changed, can reuse it
+    """
+
+    def __init__(self, db_path: Path, upload_dir: Path) -> None:
+        self.db_path = Path(db_path)
+        self.upload_dir = Path(upload_dir)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Create SQLite connection with Row factory."""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    @staticmethod
+    def content_hash(data: bytes) -> str:
+        """SHA-256 hex digest of the file bytes."""
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def instruction_hash(user_instruction: Optional[str]) -> str:
+        """Hash of the user instruction (whitespace-insensitive); '' for none."""
+        text = " ".join((user_instruction or "").split())
+        return hashlib.sha256(text.encode("utf-8")).hexdigest() if text else ""
+
+    # Uploads
+
+    def save(self, data: bytes, original_name: str) -> JSONDict:
+        """
+        Store the file bytes under their hash and record / refresh the
+        metadata row. Re-uploading identical content does not rewrite the file.
+
+        Returns the upload row as a dict.
+        """
+        content_hash = self.content_hash(data)
+        suffix = Path(original_name).suffix.lower() or ".pdf"
+        stored_path = self.upload_dir / f"{content_hash}{suffix}"
+
+        if not stored_path.exists():
+            self.upload_dir.mkdir(parents=True, exist_ok=True)
+            # Write to a temp name first so a concurrent reader never sees
+            # a half-written file under the final name
+            tmp_path = stored_path.with_suffix(stored_path.suffix + ".part")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            tmp_path.replace(stored_path)
+
+        now = self._now()
+        with self._connect() as conn:
+            conn.execute(
+                """
+                INSERT INTO uploads (
+                    content_hash, original_name, stored_path, size_bytes,
+                    uploaded_at, last_seen_at, upload_count
+                )
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+                ON CONFLICT(content_hash) DO UPDATE SET
+                    stored_path = excluded.stored_path,
+                    last_seen_at = excluded.last_seen_at,
+                    upload_count = uploads.upload_count + 1
+                """,
+                (content_hash, original_name, str(stored_path), len(data), now, now),
+            )
+            conn.commit()
+
+        return self.get_upload(content_hash)  # type: ignore[return-value]
+
+    def get_upload(self, content_hash: str) -> Optional[JSONDict]:
+        """Fetch the metadata row of an upload."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM uploads WHERE content_hash = ?",
+                (content_hash,),
+            ).fetchone()
+            return {k: row[k] for k in row.keys()} if row else None
+
+    # Workflow results
+
+    @staticmethod
+    def _referenced_invoice_id(result: JSONDict) -> Optional[str]:
+        """Invoice a workflow result depends on (from the invoice or the ticket)."""
+        for key in ("parsed_invoice", "parsed_ticket"):
+            parsed = result.get(key) or {}
+            if isinstance(parsed, dict) and parsed.get("invoice_id"):
+                return str(parsed["invoice_id"])
+        return None
+
+    @staticmethod
+    def _stored_invoice_id(conn: sqlite3.Connection, invoice_id: Optional[str]) -> Optional[str]:
+        """ID the invoice is stored under, when the document spells it differently."""
+        if not invoice_id:
+            return invoice_id
+        row = conn.execute(
+            """
+            SELECT invoice_id FROM invoices
+            WHERE invoice_id = ? OR invoice_key = ?
+            ORDER BY invoice_id = ? DESC, rowid DESC
+            LIMIT 1
+            """,
+            (invoice_id, normalize_invoice_id(invoice_id), invoice_id),
+        ).fetchone()
+        return row["invoice_id"] if row else invoice_id
+
+    @staticmethod
+    def _invoice_row_version(
+        conn: sqlite3.Connection, invoice_id: Optional[str]
+    ) -> Optional[int]:
+        if not invoice_id:
+            return None
+        row = conn.execute(
+            "SELECT row_version FROM invoices WHERE invoice_id = ?",
+            (invoice_id,),
+        ).fetchone()
+        return row["row_version"] if row else None
+
+    def save_result(
+        self, content_hash: str, result: JSONDict, user_instruction: Optional[str] = None
+    ) -> None:
+        """
+        Cache the workflow result of an upload against the current
+        row_version of the invoice it references and the instruction the
+        run was given.
+
+        Call this *after* the run, so writes made by the agent itself
+        (e.g. upserting a new invoice) are part of the recorded version.
+        """
+        invoice_id = self._referenced_invoice_id(result)
+        with self._connect() as conn:
+            invoice_id = self._stored_invoice_id(conn, invoice_id)
+            version = self._invoice_row_version(conn, invoice_id)
+            conn.execute(
+                """
+                INSERT INTO workflow_results (
+                    content_hash, invoice_id, invoice_row_version,
+                    instruction_hash, result_json, created_at
+                )
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(content_hash) DO UPDATE SET
+                    invoice_id = excluded.invoice_id,
+                    invoice_row_version = excluded.invoice_row_version,
+                    instruction_hash = excluded.instruction_hash,
+                    result_json = excluded.result_json,
+                    created_at = excluded.created_at
+                """,
+                (
+                    content_hash,
+                    invoice_id,
+                    version,
+                    self.instruction_hash(user_instruction),
+                    json.dumps(result, default=str),
+                    self._now(),
+                ),
+            )
+            conn.commit()
+
+    def results_for_invoice(self, invoice_id: str) -> List[Tuple[str, JSONDict]]:
+        """(content_hash, result) of every upload whose result references the invoice."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT content_hash, result_json FROM workflow_results WHERE invoice_id = ?",
+                (invoice_id,),
+            ).fetchall()
+        return [(row["content_hash"], json.loads(row["result_json"])) for row in rows]
+
+    def update_result(
+        self, content_hash: str, result: JSONDict, checked_version: Optional[int] = None
+    ) -> None:
+        """
+        Rewrite a stored result in place.
+
+        `checked_version` is the invoice row_version the result was checked
+        against when it is still valid: the result is tagged with it, and
+        get_cached_result serves it again as long as the invoice stays at
+        that version (a later write makes it stale, as usual). Without it,
+        the version it was cached against is kept, and a re-upload re-runs
+        the full workflow.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                """
+                UPDATE workflow_results
+                SET result_json = :result_json,
+                    invoice_row_version = COALESCE(:checked_version, invoice_row_version)
+                WHERE content_hash = :content_hash
+                """,
+                {
+                    "result_json": json.dumps(result, default=str),
+                    "checked_version": checked_version,
+                    "content_hash": content_hash,
+                },
+            )
+            conn.commit()
+
+    def get_cached_result(
+        self, content_hash: str, user_instruction: Optional[str] = None
+    ) -> Optional[JSONDict]:
+        """
+        Return the previous workflow result for this content, or None if
+        there is none, it ran with another instruction ("don't email the
+        supplier", "set priority High" change what the agent does) or the
+        referenced invoice row changed since.
+        """
+        result = None
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM workflow_results WHERE content_hash = ?",
+                (content_hash,),
+            ).fetchone()
+            if (
+                row is not None
+                and row["instruction_hash"] == self.instruction_hash(user_instruction)
+                and self._invoice_row_version(conn, row["invoice_id"]) == row["invoice_row_version"]
+            ):
+                result = json.loads(row["result_json"])
+        metrics.cache_lookup("workflow_result", result is not None)
+        return result
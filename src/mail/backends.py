@@ -0,0 +1,204 @@
+import base64
+import os
+import random
+import threading
+import time
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional, TypedDict
+
+from src.agent.rate_limits import governed
+
+
+class OutgoingEmail(TypedDict):
+    """One message handed to a backend by the outbox sender."""
+
+    outbox_id: int
+    recipient: str
+    subject: str
+    body: str
+
+
+class SendResult(TypedDict):
+    """Outcome of sending one message."""
+
+    ok: bool
+    message_id: Optional[str]
+    error: Optional[str]
+    retryable: bool  # False for permanent errors (e.g. invalid recipient)
+
+
+# The scopes token.json was issued for (those of llama_index's GmailToolSpec,
+# which created it before); gmail.compose covers messages.send
+GMAIL_SCOPES = [
+    "https://www.googleapis.com/auth/gmail.compose",
+    "https://www.googleapis.com/auth/gmail.readonly",
+]
+
+
+class GmailBackend:
+    """
+    Sends batches of messages over a single authenticated Gmail API client.
+
+    Credentials are resolved once (`token.json`, refreshed when expired, or
+    the OAuth flow of `credentials.json`) and the discovery client is reused
+    for every batch; each batch goes out as one Gmail HTTP batch request
+    with direct `messages.send` calls (no draft round trip).
+    """
+
+    name = "gmail"  # backend label of traces and metrics
+
+    def __init__(
+        self, credentials_path: str = "credentials.json", token_path: str = "token.json"
+    ) -> None:
+        self.credentials_path = credentials_path
+        self.token_path = token_path
+        self._service: Any = None
+        self._lock = threading.Lock()
+
+    def _get_credentials(self) -> Any:
+        # Imported on first send: pulls in the Google auth libraries
+        from google.auth.transport.requests import Request
+        from google.oauth2.credentials import Credentials
+        from google_auth_oauthlib.flow import InstalledAppFlow
+
+        creds = None
+        if os.path.isfile(self.token_path):
+            creds = Credentials.from_authorized_user_file(self.token_path, GMAIL_SCOPES)
+        if creds is not None and creds.valid:
+            return creds
+
+        if creds is not None and creds.expired and creds.refresh_token:
+            creds.refresh(Request())
+        else:
+            flow = InstalledAppFlow.from_client_secrets_file(self.credentials_path, GMAIL_SCOPES)
+            creds = flow.run_local_server(port=8080)
+        with open(self.token_path, "w") as f:
+            f.write(creds.to_json())
+        return creds
+
+    def _get_service(self) -> Any:
+        with self._lock:
+            if self._service is None:
+                from googleapiclient.discovery import build
+
+                self._service = build(
+                    "gmail", "v1", credentials=self._get_credentials(), cache_discovery=False
+                )
+            return self._service
+
+    @staticmethod
+    def _raw_message(email: OutgoingEmail) -> str:
+        message = EmailMessage()
+        message["To"] = email["recipient"]
+        message["Subject"] = email["subject"]
+        message.set_content(email["body"])
+        return base64.urlsafe_b64encode(message.as_bytes()).decode("utf-8")
+
+    @staticmethod
+    def _is_retryable(exception: Exception) -> bool:
+        status = getattr(getattr(exception, "resp", None), "status", None)
+        if status is None:
+            # Network errors, timeouts, ...
+            return True
+        return int(status) == 429 or int(status) >= 500
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[SendResult]:
+        service = self._get_service()
+        results: Dict[int, SendResult] = {}
+
+        def _callback(request_id: str, response: Any, exception: Exception | None) -> None:
+            index = int(request_id)
+            if exception is not None:
+                results[index] = SendResult(
+                    ok=False,
+                    message_id=None,
+                    error=str(exception),
+                    retryable=self._is_retryable(exception),
+                )
+            else:
+                results[index] = SendResult(
+                    ok=True, message_id=response.get("id"), error=None, retryable=False
+                )
+
+        batch = service.new_batch_http_request(callback=_callback)
+        for index, email in enumerate(emails):
+            batch.add(
+                service.users().messages().send(
+                    userId="me", body={"raw": self._raw_message(email)}
+                ),
+                request_id=str(index),
+            )
+
+        try:
+            # Gmail quotas count messages, not batch requests
+            with governed("gmail", cost=len(emails)):
+                batch.execute()
+        except Exception as e:
+            # The whole batch request failed: nothing was sent
+            return [
+                SendResult(ok=False, message_id=None, error=str(e), retryable=True)
+                for _ in emails
+            ]
+
+        return [
+            results.get(
+                i,
+                SendResult(ok=False, message_id=None, error="No response", retryable=True),
+            )
+            for i in range(len(emails))
+        ]
+
+
+class FakeGmailBackend:
+    """
+    Offline stand-in for GmailBackend, for load tests and demos.
+
+    Every batch takes `latency_seconds` (+ `per_message_seconds` per message);
+    each message fails with probability `failure_rate` (retryable). Sent
+    messages are kept in `sent`.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        latency_seconds: float = 0.0,
+        per_message_seconds: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.latency_seconds = latency_seconds
+        self.per_message_seconds = per_message_seconds
+        self.failure_rate = failure_rate
+        self.sent: List[OutgoingEmail] = []
+        self.batches = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def send_batch(self, emails: List[OutgoingEmail]) -> List[SendResult]:
+        time.sleep(self.latency_seconds + self.per_message_seconds * len(emails))
+
+        results: List[SendResult] = []
+        with self._lock:
+            self.batches += 1
+            for email in emails:
+                if self._random.random() < self.failure_rate:
+                    results.append(
+                        SendResult(
+                            ok=False,
+                            message_id=None,
+                            error="Simulated Gmail 503",
+                            retryable=True,
+                        )
+                    )
+                    continue
+                self.sent.append(email)
+                results.append(
+                    SendResult(
+                        ok=True,
+                        message_id=f"fake-{len(self.sent)}",
+                        error=None,
+                        retryable=False,
+                    )
+                )
+        return results
@@ -0,0 +1,153 @@
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+import yaml
+
+from src.db.outbox import Outbox
+from src.mail.backends import FakeGmailBackend, GmailBackend, OutgoingEmail
+from src.observability import metrics, tracing
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+EMAIL_BACKEND = _config["email"]["backend"]
+EMAIL_BATCH_SIZE = _config["email"]["batch_size"]
+EMAIL_MAX_ATTEMPTS = _config["email"]["max_attempts"]
+EMAIL_BACKOFF_SECONDS = _config["email"]["backoff_seconds"]
+EMAIL_MAX_BACKOFF_SECONDS = _config["email"]["max_backoff_seconds"]
+EMAIL_POLL_INTERVAL_SECONDS = _config["email"]["poll_interval_seconds"]
+
+
+def build_backend(name: str = EMAIL_BACKEND) -> Any:
+    """Backend named in `email.backend` of config.yaml."""
+    if name == "gmail":
+        return GmailBackend()
+    if name == "fake":
+        return FakeGmailBackend()
+    raise ValueError(f"Unknown email backend: {name!r}")
+
+
+class OutboxSender:
+    """
+    Drains the outbox in batches over one reused backend client.
+
+    Failed messages are retried with exponential backoff (plus jitter) up
+    to `max_attempts`; permanent errors are given up immediately.
+    """
+
+    def __init__(
+        self,
+        outbox: Outbox,
+        backend: Any,
+        batch_size: int = EMAIL_BATCH_SIZE,
+        max_attempts: int = EMAIL_MAX_ATTEMPTS,
+        backoff_seconds: float = EMAIL_BACKOFF_SECONDS,
+        max_backoff_seconds: float = EMAIL_MAX_BACKOFF_SECONDS,
+        poll_interval_seconds: float = EMAIL_POLL_INTERVAL_SECONDS,
+    ) -> None:
+        self.outbox = outbox
+        self.backend = backend
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.poll_interval_seconds = poll_interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _retry_at(self, attempts_done: int) -> float:
+        delay = min(
+            self.max_backoff_seconds,
+            self.backoff_seconds * (2 ** (attempts_done - 1)),
+        )
+        # Jitter so messages that failed together do not retry together
+        return time.time() + delay * random.uniform(1.0, 1.25)
+
+    def drain_once(self) -> int:
+        """Claim and send one batch. Returns the number of messages handled."""
+        rows = self.outbox.claim_batch(self.batch_size)
+        if not rows:
+            return 0
+
+        emails = [
+            OutgoingEmail(
+                outbox_id=row["id"],
+                recipient=row["recipient"],
+                subject=row["subject"] or "",
+                body=row["body"] or "",
+            )
+            for row in rows
+        ]
+
+        with tracing.traced_run("outbox_batch", self.outbox.db_path, messages=len(emails)):
+            try:
+                with tracing.span("send_batch", backend=self.backend.name) as s:
+                    s["input_bytes"] = sum(tracing.payload_size(e["body"]) for e in emails)
+                    results = self.backend.send_batch(emails)
+            except Exception as e:
+                results = [
+                    {"ok": False, "message_id": None, "error": str(e), "retryable": True}
+                    for _ in emails
+                ]
+
+        for row, result in zip(rows, results):
+            if result["ok"]:
+                self.outbox.mark_sent(row["id"], result["message_id"])
+                metrics.EMAILS.inc(status="sent")
+                continue
+
+            attempts_done = row["attempts"] + 1
+            give_up = not result["retryable"] or attempts_done >= self.max_attempts
+            metrics.EMAILS.inc(status="failed" if give_up else "retried")
+            self.outbox.mark_failed(
+                row["id"],
+                result["error"] or "Unknown error",
+                retry_at=None if give_up else self._retry_at(attempts_done),
+            )
+
+        return len(rows)
+
+    def run(self) -> None:
+        """Loop until stop(): drain full batches back to back, then poll."""
+        while not self._stop.is_set():
+            try:
+                handled = self.drain_once()
+            except Exception:
+                # e.g. database locked; try again on the next poll
+                handled = 0
+            if handled < self.batch_size:
+                self._stop.wait(self.poll_interval_seconds)
+
+    def start(self) -> None:
+        """Run the sender in a daemon thread."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name="outbox-sender", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+
+_SENDER: Optional[OutboxSender] = None
+_SENDER_LOCK = threading.Lock()
+
+
+def start_outbox_sender(db_path: Path) -> OutboxSender:
+    """Start the background sender for `db_path`, once per process."""
+    global _SENDER
+    with _SENDER_LOCK:
+        if _SENDER is None:
+            _SENDER = OutboxSender(Outbox(db_path), build_backend())
+            _SENDER.start()
+        return _SENDER
@@ -0,0 +1,241 @@
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+ContextDict = Dict[str, Any]
+
+# Issue types with a deterministic template
+MATH_ERROR = "math_error"
+AMOUNT_MISMATCH = "amount_mismatch"
+TAX_MISMATCH = "tax_mismatch"
+NEW_INVOICE = "new_invoice"
+
+# Labels the agent / tickets use for the same issues
+_ISSUE_ALIASES = {
+    "math_error": MATH_ERROR,
+    "math error": MATH_ERROR,
+    "calculation error": MATH_ERROR,
+    "amount_mismatch": AMOUNT_MISMATCH,
+    "amount mismatch": AMOUNT_MISMATCH,
+    "total mismatch": AMOUNT_MISMATCH,
+    "discrepancy": AMOUNT_MISMATCH,
+    "tax_mismatch": TAX_MISMATCH,
+    "tax mismatch": TAX_MISMATCH,
+    "tax issue": TAX_MISMATCH,
+    "new_invoice": NEW_INVOICE,
+    "new invoice": NEW_INVOICE,
+    "confirmation": NEW_INVOICE,
+}
+
+_FIELD_LABELS = {
+    "total_amount": "Total amount",
+    "tax_amount": "Tax amount",
+}
+
+# "total_amount: db=4300.00, document=4376.78" (reconcile_invoice_with_db_tool)
+_DIFFERENCE_RE = re.compile(
+    r"^(?P<field>\w+): db=(?P<db>-?[\d.]+), document=(?P<doc>-?[\d.]+)$"
+)
+
+SIGNATURE = "Best regards,\nAccounts Payable"
+
+
+def _normalize_issue(label: Any) -> Optional[str]:
+    if not isinstance(label, str):
+        return None
+    return _ISSUE_ALIASES.get(label.strip().lower())
+
+
+def _parsed_differences(context: ContextDict) -> List[Dict[str, Any]]:
+    reconciliation = context.get("reconciliation") or {}
+    parsed = []
+    for diff in reconciliation.get("differences") or []:
+        match = _DIFFERENCE_RE.match(str(diff).strip())
+        if match:
+            parsed.append(
+                {
+                    "field": match["field"],
+                    "db": float(match["db"]),
+                    "doc": float(match["doc"]),
+                }
+            )
+    return parsed
+
+
+def detect_issue_type(context: ContextDict) -> Optional[str]:
+    """
+    Pick the template for a draft context, or None when it needs the LLM
+    (free-form user instructions, unknown issue labels, mixed issues).
+    """
+    if (context.get("user_instruction") or "").strip():
+        return None
+
+    if "issue_type" in context:
+        return _normalize_issue(context["issue_type"])
+
+    math_check = context.get("math_check") or {}
+    if math_check.get("is_valid") is False:
+        return MATH_ERROR
+
+    reconciliation = context.get("reconciliation")
+    if reconciliation:
+        if reconciliation.get("is_match") is None:
+            return NEW_INVOICE
+        if reconciliation.get("is_match") is False:
+            fields = {d["field"] for d in _parsed_differences(context)}
+            if fields == {"tax_amount"}:
+                return TAX_MISMATCH
+            if fields and fields <= set(_FIELD_LABELS):
+                return AMOUNT_MISMATCH
+            return None
+
+    ticket = context.get("ticket") or context.get("parsed_ticket")
+    if isinstance(ticket, dict):
+        return _normalize_issue(ticket.get("issue_type"))
+
+    return None
+
+
+# Rendering helpers
+
+def _invoice(context: ContextDict) -> Dict[str, Any]:
+    invoice = context.get("parsed_invoice") or context.get("invoice") or {}
+    return invoice if isinstance(invoice, dict) else {}
+
+
+def _ticket(context: ContextDict) -> Dict[str, Any]:
+    ticket = context.get("ticket") or context.get("parsed_ticket") or {}
+    return ticket if isinstance(ticket, dict) else {}
+
+
+def _invoice_ref(context: ContextDict) -> str:
+    invoice_id = _invoice(context).get("invoice_id") or _ticket(context).get("invoice_id")
+    return f"invoice {invoice_id}" if invoice_id else "the invoice"
+
+
+def _greeting(context: ContextDict) -> str:
+    supplier = _invoice(context).get("supplier_name")
+    return f"Hello {supplier} team," if supplier else "Hello,"
+
+
+def _money(amount: Any, context: ContextDict) -> str:
+    currency = _invoice(context).get("currency") or ""
+    return f"{float(amount):,.2f} {currency}".strip()
+
+
+def _ticket_line(context: ContextDict) -> str:
+    ticket_id = _ticket(context).get("ticket_id")
+    return f"\nWe have opened ticket {ticket_id} to track this.\n" if ticket_id else ""
+
+
+def _render_math_error(context: ContextDict) -> Optional[str]:
+    issues = (context.get("math_check") or {}).get("issues") or []
+    if not issues:
+        return None
+    lines = "\n".join(f"- {issue}" for issue in issues)
+    return (
+        f"{_greeting(context)}\n\n"
+        f"While processing {_invoice_ref(context)}, we found arithmetic "
+        f"inconsistencies in the document:\n\n"
+        f"{lines}\n"
+        f"{_ticket_line(context)}\n"
+        "Could you please review the invoice and send us a corrected version, "
+        "or confirm the correct amounts?\n\n"
+        f"{SIGNATURE}"
+    )
+
+
+def _difference_lines(context: ContextDict, fields: set) -> List[str]:
+    lines = []
+    for diff in _parsed_differences(context):
+        if diff["field"] not in fields:
+            continue
+        label = _FIELD_LABELS.get(diff["field"], diff["field"])
+        lines.append(
+            f"- {label}: our records show {_money(diff['db'], context)}, "
+            f"the invoice shows {_money(diff['doc'], context)}."
+        )
+    if not lines:
+        # Ticket contexts carry the amounts directly
+        ticket = _ticket(context)
+        recorded = ticket.get("recorded_amount")
+        document = ticket.get("document_amount")
+        if recorded is not None and document is not None:
+            lines.append(
+                f"- Amount: our records show {_money(recorded, context)}, "
+                f"the invoice shows {_money(document, context)}."
+            )
+    return lines
+
+
+def _render_amount_mismatch(context: ContextDict) -> Optional[str]:
+    lines = _difference_lines(context, set(_FIELD_LABELS))
+    if not lines:
+        return None
+    details = "\n".join(lines)
+    return (
+        f"{_greeting(context)}\n\n"
+        f"The amounts on {_invoice_ref(context)} do not match the amounts "
+        f"recorded in our finance system:\n\n"
+        f"{details}\n"
+        f"{_ticket_line(context)}\n"
+        "Could you please confirm which amounts are correct and, if the invoice "
+        "is wrong, send us a corrected invoice or a credit note?\n\n"
+        f"{SIGNATURE}"
+    )
+
+
+def _render_tax_mismatch(context: ContextDict) -> Optional[str]:
+    lines = _difference_lines(context, {"tax_amount"})
+    if not lines:
+        return None
+    details = "\n".join(lines)
+    return (
+        f"{_greeting(context)}\n\n"
+        f"The tax charged on {_invoice_ref(context)} does not match the tax "
+        f"recorded in our finance system:\n\n"
+        f"{details}\n"
+        f"{_ticket_line(context)}\n"
+        "Could you please confirm the applicable tax rate and calculation, and "
+        "send us a corrected invoice if needed?\n\n"
+        f"{SIGNATURE}"
+    )
+
+
+def _render_new_invoice(context: ContextDict) -> Optional[str]:
+    invoice = _invoice(context)
+    if not invoice.get("invoice_id"):
+        return None
+    details = []
+    if invoice.get("total_amount") is not None:
+        details.append(f"- Total amount: {_money(invoice['total_amount'], context)}")
+    if invoice.get("invoice_date"):
+        details.append(f"- Invoice date: {invoice['invoice_date']}")
+    if invoice.get("due_date"):
+        details.append(f"- Due date: {invoice['due_date']}")
+    summary = ("\n\n" + "\n".join(details)) if details else ""
+    return (
+        f"{_greeting(context)}\n\n"
+        f"This is to confirm that we have received and recorded "
+        f"{_invoice_ref(context)} in our finance system.{summary}\n\n"
+        "No further action is needed on your side.\n\n"
+        f"{SIGNATURE}"
+    )
+
+
+TEMPLATES: Dict[str, Callable[[ContextDict], Optional[str]]] = {
+    MATH_ERROR: _render_math_error,
+    AMOUNT_MISMATCH: _render_amount_mismatch,
+    TAX_MISMATCH: _render_tax_mismatch,
+    NEW_INVOICE: _render_new_invoice,
+}
+
+
+def render_template_email(context: ContextDict) -> Optional[str]:
+    """
+    Render the email body for a standard issue deterministically, or return
+    None if the context does not fit a template (the caller then uses the LLM).
+    """
+    issue_type = detect_issue_type(context)
+    if issue_type is None:
+        return None
+    return TEMPLATES[issue_type](context)
@@ -0,0 +1,412 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import yaml
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+METRICS_ENABLED = _config["metrics"]["enabled"]
+METRICS_HOST = _config["metrics"]["host"]
+METRICS_PORT = _config["metrics"]["port"]
+
+JSONDict = Dict[str, Any]
+
+# Upper bounds (seconds) of the latency histograms: from a cached DB read
+# to a long LlamaParse job
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(pairs: Sequence[Tuple[str, str]]) -> str:
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} takes labels {self.labels}, got {tuple(labels)}")
+        return tuple("" if labels[n] is None else str(labels[n]) for n in self.labels)
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+    def samples(self) -> List[JSONDict]:
+        raise NotImplementedError
+
+    def reset(self) -> None:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonic count per label set (documents, tokens, cache lookups, ...)."""
+
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()) -> None:
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [
+            f"{self.name}{_format_labels(list(zip(self.labels, key)))} {_format_value(v)}"
+            for key, v in values
+        ]
+
+    def samples(self) -> List[JSONDict]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [{**dict(zip(self.labels, key)), "value": v} for key, v in values]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram(_Metric):
+    """Latency distribution per label set, in fixed buckets (Prometheus style)."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (last one: +Inf)], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, seconds: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            counts, total = self._values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += seconds
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the duration of the block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """q in [0, 1], interpolated inside the bucket it falls in (None if empty)."""
+        with self._lock:
+            entry = self._values.get(self._key(labels))
+            counts = list(entry[0]) if entry else []
+        return self._quantile(counts, q)
+
+    def _quantile(self, counts: List[int], q: float) -> Optional[float]:
+        total = sum(counts)
+        if not total:
+            return None
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(counts):
+            if count and seen + count >= rank:
+                if index == len(self.buckets):
+                    # Above the last bucket: its lower bound is all we know
+                    return self.buckets[-1]
+                lower = self.buckets[index - 1] if index else 0.0
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((k, (list(c), t[0])) for k, (c, t) in self._values.items())
+        lines = []
+        for key, (counts, total) in values:
+            pairs = list(zip(self.labels, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = _format_labels(pairs + [("le", _format_value(bound))])
+                lines.append(f"{self.name}_bucket{le} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(pairs)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(pairs)} {cumulative}")
+        return lines
+
+    def samples(self) -> List[JSONDict]:
+        with self._lock:
+            values = sorted((k, (list(c), t[0])) for k, (c, t) in self._values.items())
+        rows = []
+        for key, (counts, total) in values:
+            count = sum(counts)
+            rows.append(
+                {
+                    **dict(zip(self.labels, key)),
+                    "count": count,
+                    "mean_ms": round(total / count * 1000, 3),
+                    "p50_ms": round(self._quantile(counts, 0.5) * 1000, 3),  # type: ignore[operator]
+                    "p95_ms": round(self._quantile(counts, 0.95) * 1000, 3),  # type: ignore[operator]
+                    "p99_ms": round(self._quantile(counts, 0.99) * 1000, 3),  # type: ignore[operator]
+                }
+            )
+        return rows
+
+    def reset(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+
+class MetricsRegistry:
+    """
+    Process-wide counters and latency histograms, rendered in the Prometheus
+    text format (see start_metrics_server) and in the Metrics admin tab.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labels != metric.labels:
+                    raise ValueError(f"Metric {metric.name} already registered differently")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def metrics(self) -> List[_Metric]:
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for metric in self.metrics():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Zero every metric (tests)."""
+        for metric in self.metrics():
+            metric.reset()
+
+
+METRICS = MetricsRegistry()
+
+DOCUMENTS = METRICS.counter(
+    "invoice_agent_documents_total",
+    "Documents through the document workflow, by outcome.",
+    ("pipeline", "doc_type", "status"),
+)
+DOCUMENT_SECONDS = METRICS.histogram(
+    "invoice_agent_document_duration_seconds",
+    "End-to-end latency of one document.",
+    ("pipeline",),
+)
+STAGE_SECONDS = METRICS.histogram(
+    "invoice_agent_stage_duration_seconds",
+    "Duration of each traced stage: tool calls, model calls, LlamaParse jobs, email batches.",
+    ("kind", "backend", "stage"),
+)
+STAGE_ERRORS = METRICS.counter(
+    "invoice_agent_stage_errors_total",
+    "Stages that raised.",
+    ("kind", "backend", "stage"),
+)
+LLM_TOKENS = METRICS.counter(
+    "invoice_agent_llm_tokens_total",
+    "Tokens reported by the model backends.",
+    ("backend", "stage", "direction"),
+)
+PDF_PARSE_SECONDS = METRICS.histogram(
+    "invoice_agent_pdf_parse_duration_seconds",
+    "parse_pdf_to_markdown latency, by pre-classified type.",
+    ("doc_type",),
+)
+PDF_PAGES = METRICS.counter(
+    "invoice_agent_pdf_pages_total",
+    "Pages returned by LlamaParse.",
+    ("doc_type",),
+)
+CACHE_REQUESTS = METRICS.counter(
+    "invoice_agent_cache_requests_total",
+    "Cache lookups (LLM outputs, document texts, checkpoints), hit or miss.",
+    ("cache", "result"),
+)
+DB_QUERY_SECONDS = METRICS.histogram(
+    "invoice_agent_db_query_duration_seconds",
+    "DBClient operation latency.",
+    ("operation",),
+    buckets=DB_BUCKETS,
+)
+EMAILS = METRICS.counter(
+    "invoice_agent_emails_total",
+    "Emails queued by the workflow, then sent, retried or given up by the outbox sender.",
+    ("status",),
+)
+
+
+def record_document(pipeline: str, summary: JSONDict, seconds: float) -> None:
+    """Count one finished document workflow from its summary."""
+    status = "error" if "error" in summary else "ok"
+    DOCUMENTS.inc(pipeline=pipeline, doc_type=summary.get("doc_type") or "", status=status)
+    DOCUMENT_SECONDS.observe(seconds, pipeline=pipeline)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def observe_span(span: JSONDict) -> None:
+    """Fold a finished tracing span into the stage / token metrics."""
+    if not METRICS_ENABLED or span.get("end") is None:
+        return
+    stage = span["name"]
+    if span["kind"] == "step" and stage.startswith("step "):
+        # Agent steps are numbered; one series for all of them
+        stage = "agent_step"
+    labels = {"kind": span["kind"], "backend": span.get("backend") or "", "stage": stage}
+
+    STAGE_SECONDS.observe(max(0.0, span["end"] - span["start"]), **labels)
+    if span.get("status") == "error":
+        STAGE_ERRORS.inc(**labels)
+    for field, direction in (("prompt_tokens", "input"), ("completion_tokens", "output")):
+        if span.get(field):
+            LLM_TOKENS.inc(
+                span[field], backend=labels["backend"], stage=stage, direction=direction
+            )
+
+
+def timed_db(method: Any) -> Any:
+    """Decorator: observe a DBClient method in DB_QUERY_SECONDS under its name."""
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with DB_QUERY_SECONDS.time(operation=method.__name__):
+            return method(*args, **kwargs)
+
+    wrapper.__name__ = method.__name__
+    wrapper.__doc__ = method.__doc__
+    wrapper.__wrapped__ = method  # type: ignore[attr-defined]
+    return wrapper
+
+
+# Prometheus endpoint
+
+def _handler() -> type:
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args: Any) -> None:
+            pass
+
+        def do_GET(self) -> None:
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = METRICS.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+_SERVER: Optional[ThreadingHTTPServer] = None
+_SERVER_LOCK = threading.Lock()
+
+
+def start_metrics_server(host: str = METRICS_HOST, port: int = METRICS_PORT) -> Optional[str]:
+    """
+    Serve /metrics (Prometheus text format) from a daemon thread, once per
+    process. Returns the URL, or None when metrics are disabled or the port
+    is taken (e.g. by another worker process).
+    """
+    global _SERVER
+    if not METRICS_ENABLED:
+        return None
+    with _SERVER_LOCK:
+        if _SERVER is None:
+            try:
+                _SERVER = ThreadingHTTPServer((host, port), _handler())
+            except OSError:
+                return None
+            _SERVER.daemon_threads = True
+            threading.Thread(
+                target=_SERVER.serve_forever, name="metrics-server", daemon=True
+            ).start()
+        bound_host, bound_port = _SERVER.server_address[:2]
+        return f"http://{bound_host}:{bound_port}/metrics"
+
+
+def stop_metrics_server() -> None:
+    global _SERVER
+    with _SERVER_LOCK:
+        if _SERVER is not None:
+            _SERVER.shutdown()
+            _SERVER.server_close()
+            _SERVER = None
@@ -0,0 +1,367 @@
+import copy
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import yaml
+
+from src.db.trace_store import TraceStore
+from src.observability import metrics
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+TRACING_ENABLED = _config["tracing"]["enabled"]
+TRACING_KEEP_RUNS = _config["tracing"]["keep_runs"]
+
+JSONDict = Dict[str, Any]
+
+# Span kinds
+RUN = "run"    # one agent run / chat turn / outbox batch
+STEP = "step"  # one agent step (model call + code execution)
+LLM = "llm"    # one model call
+TOOL = "tool"  # one tool call
+IO = "io"      # any other external call (LlamaParse, Gmail, ...)
+
+
+def payload_size(value: Any) -> int:
+    """Approximate size in bytes of a tool input / output (its JSON form)."""
+    if value is None:
+        return 0
+    if isinstance(value, bytes):
+        return len(value)
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, default=str).encode("utf-8"))
+
+
+class Tracer:
+    """
+    Collects the spans of one run in memory; TracedRun writes them to the
+    `traces` table when the run ends.
+
+    Spans opened from the same thread nest; spans opened from another
+    thread (smolagents runs tool code in a worker thread) hang under the
+    run span.
+    """
+
+    def __init__(self, name: str, run_id: Optional[str] = None) -> None:
+        self.run_id = run_id or uuid.uuid4().hex
+        self.name = name
+        self.spans: List[JSONDict] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _stack(self) -> List[int]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _new_span(
+        self,
+        name: str,
+        kind: str,
+        start: float,
+        backend: Optional[str],
+        attrs: JSONDict,
+    ) -> JSONDict:
+        stack = self._stack()
+        with self._lock:
+            span_id = len(self.spans)
+            if stack:
+                parent_id: Optional[int] = stack[-1]
+            else:
+                parent_id = 0 if span_id > 0 else None
+            span = {
+                "span_id": span_id,
+                "parent_id": parent_id,
+                "name": name,
+                "kind": kind,
+                "backend": backend,
+                "start": start,
+                "end": None,
+                "status": "ok",
+                "error": None,
+                "input_bytes": None,
+                "output_bytes": None,
+                "prompt_tokens": None,
+                "completion_tokens": None,
+                "attrs": attrs,
+            }
+            self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        kind: str,
+        backend: Optional[str] = None,
+        **attrs: Any,
+    ) -> Iterator[JSONDict]:
+        """
+        Time the enclosed block as a span. The yielded dict can be filled
+        in (input_bytes, output_bytes, prompt_tokens, ...) before it closes.
+        """
+        span = self._new_span(name, kind, time.time(), backend, attrs)
+        stack = self._stack()
+        stack.append(span["span_id"])
+        try:
+            yield span
+        except BaseException as e:
+            span["status"] = "error"
+            span["error"] = str(e)
+            raise
+        finally:
+            stack.pop()
+            span["end"] = time.time()
+            metrics.observe_span(span)
+
+    def add_span(
+        self,
+        name: str,
+        kind: str,
+        start: float,
+        end: Optional[float],
+        backend: Optional[str] = None,
+        **fields: Any,
+    ) -> JSONDict:
+        """Record a span timed elsewhere (e.g. an agent step)."""
+        attrs = fields.pop("attrs", {})
+        span = self._new_span(name, kind, start, backend, attrs)
+        span["end"] = end if end is not None else time.time()
+        span.update(fields)
+        metrics.observe_span(span)
+        return span
+
+
+_ACTIVE = threading.local()
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Tracer activated in this thread, if any."""
+    return getattr(_ACTIVE, "tracer", None)
+
+
+@contextmanager
+def activate(tracer: Optional[Tracer]) -> Iterator[None]:
+    """Make `tracer` the current tracer of this thread for the block."""
+    previous = current_tracer()
+    _ACTIVE.tracer = tracer
+    try:
+        yield
+    finally:
+        _ACTIVE.tracer = previous
+
+
+@contextmanager
+def _untraced_span(
+    name: str,
+    kind: str,
+    backend: Optional[str] = None,
+    **attrs: Any,
+) -> Iterator[JSONDict]:
+    """A span outside any traced run: timed for the metrics, then discarded."""
+    span: JSONDict = {
+        "name": name,
+        "kind": kind,
+        "backend": backend,
+        "start": time.time(),
+        "end": None,
+        "status": "ok",
+        "attrs": attrs,
+    }
+    try:
+        yield span
+    except BaseException:
+        span["status"] = "error"
+        raise
+    finally:
+        span["end"] = time.time()
+        metrics.observe_span(span)
+
+
+def _open_span(
+    tracer: Optional[Tracer],
+    name: str,
+    kind: str,
+    backend: Optional[str] = None,
+    **attrs: Any,
+) -> Any:
+    if tracer is None:
+        return _untraced_span(name, kind, backend=backend, **attrs)
+    return tracer.span(name, kind, backend=backend, **attrs)
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: str = IO,
+    backend: Optional[str] = None,
+    **attrs: Any,
+) -> Iterator[JSONDict]:
+    """
+    Span in the current tracer. Without one (tracing off, code called
+    outside a traced run) the block is only timed for the metrics and the
+    yielded dict is discarded.
+    """
+    with _open_span(current_tracer(), name, kind, backend=backend, **attrs) as s:
+        yield s
+
+
+@contextmanager
+def traced_run(name: str, db_path: Path, **attrs: Any) -> Iterator[Optional[Tracer]]:
+    """
+    Trace one run: open its root span, activate the tracer in this thread
+    and save every span to `db_path` at the end.
+
+    Yields None when tracing is disabled in config.yaml.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+
+    tracer = Tracer(name)
+    try:
+        with activate(tracer), tracer.span(name, RUN, **attrs):
+            yield tracer
+    finally:
+        try:
+            TraceStore(db_path, keep_runs=TRACING_KEEP_RUNS).save_run(
+                tracer.run_id, tracer.spans
+            )
+        except Exception:
+            # Tracing must never break the run it observes
+            pass
+
+
+def mark_error(tracer: Optional[Tracer], error: str) -> None:
+    """Flag the run span of `tracer` as failed (errors caught by the caller)."""
+    if tracer is not None and tracer.spans:
+        tracer.spans[0]["status"] = "error"
+        tracer.spans[0]["error"] = error
+
+
+def record_llm_usage(s: JSONDict, response: Any) -> None:
+    """
+    Copy token counts reported by a llama_index ChatResponse (Ollama puts
+    them under raw["usage"]) into span `s`.
+    """
+    raw = getattr(response, "raw", None)
+    try:
+        usage = raw["usage"]  # type: ignore[index]
+    except (KeyError, TypeError, IndexError):
+        return
+    if isinstance(usage, dict):
+        s["prompt_tokens"] = usage.get("prompt_tokens")
+        s["completion_tokens"] = usage.get("completion_tokens")
+
+
+# smolagents integration
+
+def trace_tools(
+    tools: List[Any],
+    get_tracer: Callable[[], Optional[Tracer]],
+) -> List[Any]:
+    """
+    Return copies of `tools` whose calls are recorded as TOOL spans of the
+    tracer returned by `get_tracer()` at call time.
+
+    The tracer is also activated in the calling thread for the duration of
+    the call, so backend spans opened inside the tool (LlamaParse, Ollama)
+    nest under it.
+    """
+    traced = []
+    for tool in tools:
+        wrapped = copy.copy(tool)
+
+        def forward(*args, _tool=tool, _forward=tool.forward, **kwargs):
+            tracer = get_tracer()
+            with (
+                activate(tracer) if tracer is not None else nullcontext(),
+                _open_span(tracer, _tool.name, TOOL) as s,
+            ):
+                inputs = dict(zip(_tool.inputs.keys(), args))
+                inputs.update(kwargs)
+                s["input_bytes"] = payload_size(inputs)
+                output = _forward(*args, **kwargs)
+                s["output_bytes"] = payload_size(output)
+                return output
+
+        wrapped.forward = forward
+        traced.append(wrapped)
+    return traced
+
+
+class TracedModel:
+    """
+    Wraps a smolagents model so every `generate` call becomes an LLM span
+    (with token usage) of the tracer returned by `get_tracer()`.
+
+    Everything else is delegated to the wrapped model, which stays shared.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        get_tracer: Callable[[], Optional[Tracer]],
+        backend: str = "hf_inference",
+    ) -> None:
+        self._model = model
+        self._get_tracer = get_tracer
+        self._backend = backend
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "_model":
+            raise AttributeError(name)
+        return getattr(self._model, name)
+
+    def generate(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        model_id = getattr(self._model, "model_id", None) or type(self._model).__name__
+        with _open_span(self._get_tracer(), str(model_id), LLM, backend=self._backend) as s:
+            s["input_bytes"] = sum(payload_size(getattr(m, "content", m)) for m in messages)
+            message = self._model.generate(messages, *args, **kwargs)
+            s["output_bytes"] = payload_size(getattr(message, "content", None))
+            usage = getattr(message, "token_usage", None)
+            if usage is not None:
+                s["prompt_tokens"] = usage.input_tokens
+                s["completion_tokens"] = usage.output_tokens
+            # Hedged / fallback calls (ResilientModel) say how they were answered
+            last_call = getattr(self._model, "last_call", None)
+            if isinstance(last_call, dict):
+                s["attrs"].update(last_call)
+            return message
+
+    def __call__(self, messages: Any, *args: Any, **kwargs: Any) -> Any:
+        return self.generate(messages, *args, **kwargs)
+
+
+def step_callback(get_tracer: Callable[[], Optional[Tracer]]) -> Callable[[Any], None]:
+    """smolagents step callback recording each finished ActionStep as a STEP span."""
+
+    def _record(memory_step: Any) -> None:
+        tracer = get_tracer()
+        timing = getattr(memory_step, "timing", None)
+        if tracer is None or timing is None:
+            return
+        error = getattr(memory_step, "error", None)
+        tracer.add_span(
+            f"step {getattr(memory_step, 'step_number', '?')}",
+            STEP,
+            timing.start_time,
+            timing.end_time,
+            status="error" if error else "ok",
+            error=str(error) if error else None,
+            output_bytes=payload_size(getattr(memory_step, "observations", None)),
+            attrs={"code_chars": len(getattr(memory_step, "code_action", None) or "")},
+        )
+
+    return _record
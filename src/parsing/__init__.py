@@ -1,6 +1,24 @@
-from .document_classifier import classify_document_from_text, ClassifiedDocument, DocType
-from .invoice_parser import parse_invoice_pdf, parse_invoice_text, ParsedInvoice
-from .ticket_parser import parse_ticket_pdf, parse_ticket_text, ParsedTicket
+from importlib import import_module
+
+# Resolved on first access: the parsers import llama_index (and LlamaParse)
+_LAZY_EXPORTS = {
+    "classify_document_from_text": ".document_classifier",
+    "ClassifiedDocument": ".document_classifier",
+    "DocType": ".document_classifier",
+    "parse_invoice_pdf": ".invoice_parser",
+    "parse_invoice_text": ".invoice_parser",
+    "ParsedInvoice": ".invoice_parser",
+    "parse_ticket_pdf": ".ticket_parser",
+    "parse_ticket_text": ".ticket_parser",
+    "ParsedTicket": ".ticket_parser",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "classify_document_from_text",
@@ -1,54 +1,217 @@
 import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
 
+import yaml
 from dotenv import load_dotenv
-from llama_parse import LlamaParse
+
+from src.agent.rate_limits import governed
+from src.observability import metrics, tracing
+
+if TYPE_CHECKING:
+    from llama_parse import LlamaParse
 
 # env 
 load_dotenv()
 
 LLAMA_CLOUD_API_KEY = os.getenv("LLAMA_CLOUD_API_KEY")
 
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+# Extra LlamaParse settings per document type (see classify_pdf_first_page)
+LLAMAPARSE_SETTINGS = _config["parsing"]["llamaparse"]
+
+# Large PDFs are split into page ranges parsed concurrently
+SPLIT_MIN_PAGES = _config["parsing"]["split_min_pages"]
+PAGES_PER_RANGE = _config["parsing"]["pages_per_range"]
+MAX_PARALLEL_RANGES = _config["parsing"]["max_parallel_ranges"]
+
+# "|---|:---:|" line under a markdown table header
+_TABLE_SEPARATOR_RE = re.compile(r"^\|?(\s*:?-{3,}:?\s*\|)+\s*(:?-{3,}:?\s*)?$")
+
 
-def _get_llamaparse() -> LlamaParse:
+def _get_llamaparse(**settings: Any) -> "LlamaParse":
     """
-    Initialize a LlamaParse client.
+    Initialize a LlamaParse client, with `settings` on top of the defaults.
     """
+    # Imported here: llama_parse pulls in the whole llama_cloud SDK
+    from llama_parse import LlamaParse
+
     if not LLAMA_CLOUD_API_KEY:
         raise RuntimeError(
             "LLAMA_CLOUD_API_KEY is not set. "
             "Add it to your .env file or environment variables."
         )
 
-    parser = LlamaParse(
-        api_key=LLAMA_CLOUD_API_KEY,
-        result_type="markdown",  # it is better for llm to work with markdown
-    )
+    options = {"result_type": "markdown"}  # it is better for llm to work with markdown
+    options.update(settings)
+
+    parser = LlamaParse(api_key=LLAMA_CLOUD_API_KEY, **options)
     return parser
 
 
-def parse_pdf_to_markdown(file_path: Path) -> str:
+def page_ranges(page_count: int, pages_per_range: int) -> List[Tuple[int, int]]:
+    """Split pages [0, page_count) into consecutive [start, end) ranges."""
+    return [
+        (start, min(start + pages_per_range, page_count))
+        for start in range(0, page_count, pages_per_range)
+    ]
+
+
+def _table_cells(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip("|").split("|")]
+
+
+def _is_table_line(line: str) -> bool:
+    return line.lstrip().startswith("|")
+
+
+def _header_key(line: str) -> List[str]:
+    return [" ".join(cell.split()).lower() for cell in _table_cells(line)]
+
+
+def stitch_pages(ranges: List[str]) -> str:
+    """
+    Join the markdown of consecutive page ranges in page order.
+
+    A table cut by a range boundary comes back from LlamaParse as a second
+    table at the start of the next range, with its header repeated. That
+    table is merged back into the one the previous range ends with, minus
+    the repeated header. A table with any other header is left alone: a
+    matching column count alone does not make it the same table.
+    """
+    text = ranges[0] if ranges else ""
+    for part in ranges[1:]:
+        prev_lines = text.rstrip().split("\n")
+        next_lines = part.lstrip("\n").split("\n")
+
+        continues = (
+            _is_table_line(prev_lines[-1])
+            and len(next_lines) >= 2
+            and _is_table_line(next_lines[0])
+            and _TABLE_SEPARATOR_RE.match(next_lines[1].strip()) is not None
+        )
+        if continues:
+            # Header of the table the previous range ends with
+            header_index = len(prev_lines) - 1
+            while header_index > 0 and _is_table_line(prev_lines[header_index - 1]):
+                header_index -= 1
+            continues = _header_key(prev_lines[header_index]) == _header_key(next_lines[0])
+
+        if continues:
+            text = "\n".join(prev_lines + next_lines[2:])
+        else:
+            text = f"{text}\n\n{part}"
+    return text
+
+
+def _page_count(file_path: Path) -> int:
+    """Number of pages according to pypdf (0 if it cannot read the file)."""
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+
+    try:
+        return len(PdfReader(file_path).pages)
+    except (PyPdfError, ValueError, KeyError):
+        return 0
+
+
+def _parse_pages(file_path: Path, settings: Any, **attrs: Any) -> List[str]:
+    """One LlamaParse job over `file_path`, returning markdown per page."""
+    parser = _get_llamaparse(**settings)
+
+    with governed("llamaparse"), tracing.span(
+        "llamaparse", tracing.IO, backend="llamaparse", **attrs
+    ) as s:
+        s["input_bytes"] = file_path.stat().st_size
+        # LlamaParse returns a list of Document objects (one per page)
+        documents = parser.load_data([str(file_path)])
+
+        pages: List[str] = [doc.text for doc in documents]
+        s["output_bytes"] = tracing.payload_size("".join(pages))
+
+    return pages
+
+
+def _parse_page_ranges(
+    file_path: Path,
+    page_count: int,
+    settings: Any,
+    doc_type: Optional[str],
+) -> List[List[str]]:
+    """
+    Parse a large PDF as PAGES_PER_RANGE-page pieces, up to
+    MAX_PARALLEL_RANGES LlamaParse jobs at a time, and return the pages of
+    each piece in page order.
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    ranges = page_ranges(page_count, PAGES_PER_RANGE)
+    tracer = tracing.current_tracer()
+
+    def parse_range(piece: Path, pages: str) -> List[str]:
+        # Spans of the worker threads belong to the caller's run
+        with tracing.activate(tracer):
+            return _parse_pages(piece, settings, doc_type=doc_type, pages=pages)
+
+    with tempfile.TemporaryDirectory(prefix="llamaparse-") as tmp_dir:
+        reader = PdfReader(file_path)
+        pieces = []
+        for start, end in ranges:
+            writer = PdfWriter()
+            for index in range(start, end):
+                writer.add_page(reader.pages[index])
+            piece = Path(tmp_dir) / f"{file_path.stem}_p{start + 1}-{end}.pdf"
+            with open(piece, "wb") as f:
+                writer.write(f)
+            pieces.append(piece)
+
+        with ThreadPoolExecutor(
+            max_workers=min(MAX_PARALLEL_RANGES, len(ranges)),
+            thread_name_prefix="llamaparse",
+        ) as pool:
+            # map() yields results in submission (= page) order
+            results = pool.map(
+                parse_range,
+                pieces,
+                [f"{start + 1}-{end}" for start, end in ranges],
+            )
+            return list(results)
+
+
+def parse_pdf_to_markdown(file_path: Path, doc_type: Optional[str] = None) -> str:
     """
     Parse a PDF file with LlamaParse and return concatenated markdown text.
 
     This is the low-level parser used by invoice_parser and ticket_parser.
+    When the document type is already known (pre-classification), the
+    `parsing.llamaparse.<doc_type>` settings of config.yaml are applied.
+    PDFs of `parsing.split_min_pages` pages or more are parsed as page
+    ranges in parallel, so their latency is bounded by the slowest range;
+    tables cut by a range boundary are stitched back together.
     """
     file_path = Path(file_path)
 
     if not file_path.exists():
         raise FileNotFoundError(f"File not found: {file_path}")
 
-    parser = _get_llamaparse()
-
-    # LlamaParse returns a list of Document objects
-    documents = parser.load_data([str(file_path)])
-
-    text_chunks: List[str] = [doc.text for doc in documents]
-    full_text = "\n\n".join(text_chunks)
-
-    return full_text
-
-
+    settings = LLAMAPARSE_SETTINGS.get(doc_type) or {}
 
+    with metrics.PDF_PARSE_SECONDS.time(doc_type=doc_type or "unclassified"):
+        page_count = _page_count(file_path)
+        if page_count >= SPLIT_MIN_PAGES and MAX_PARALLEL_RANGES > 1:
+            ranges = _parse_page_ranges(file_path, page_count, settings, doc_type)
+        else:
+            ranges = [_parse_pages(file_path, settings, doc_type=doc_type)]
+    metrics.PDF_PAGES.inc(sum(map(len, ranges)), doc_type=doc_type or "unclassified")
 
+    # Within one LlamaParse job, pages are joined as they come back
+    return stitch_pages(["\n\n".join(pages) for pages in ranges])
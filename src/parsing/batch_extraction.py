@@ -0,0 +1,140 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Type, TypeVar
+
+import yaml
+from llama_index.core.bridge.pydantic import BaseModel, Field
+from pydantic import ValidationError, create_model
+
+from .chunked_extraction import MAX_PROMPT_CHARS, value_in_text
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+BATCH_SIZE = _config["extraction"]["batch_size"]
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_SEPARATOR = "=== DOCUMENT {n} ==="
+
+
+def pack_batches(texts: List[str], batch_size: int, max_chars: int) -> List[List[int]]:
+    """
+    Group document indices, in order, into batches of at most `batch_size`
+    documents and ~`max_chars` characters. A document longer than
+    `max_chars` gets a batch of its own (it is extracted on its own).
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    size = 0
+    for index, text in enumerate(texts):
+        if current and (len(current) >= batch_size or size + len(text) > max_chars):
+            batches.append(current)
+            current, size = [], 0
+        current.append(index)
+        size += len(text)
+    if current:
+        batches.append(current)
+    return batches
+
+
+def format_batch(texts: List[str]) -> str:
+    """Documents of one batch, each under a numbered separator line."""
+    return "\n\n".join(
+        f"{_SEPARATOR.format(n=n)}\n{text.strip()}" for n, text in enumerate(texts, start=1)
+    )
+
+
+@lru_cache(maxsize=None)
+def batch_model(model_cls: Type[BaseModel]) -> Type[BaseModel]:
+    """`{"items": [...]}` schema with one numbered `model_cls` per document."""
+    item = create_model(
+        f"{model_cls.__name__}Item",
+        __base__=model_cls,
+        index=(int, Field(..., description="Number n of the '=== DOCUMENT n ===' line")),
+    )
+    return create_model(f"{model_cls.__name__}Batch", items=(List[item], ...))
+
+
+def validate_batch_items(
+    content: Any,
+    texts: List[str],
+    model_cls: Type[ModelT],
+    grounded: Set[str],
+) -> Dict[int, ModelT]:
+    """
+    Validate the items of a batch answer one by one.
+
+    Returns the valid items by position in `texts`. An item is dropped if it
+    does not validate, repeats or misses its document number, or has a
+    `grounded` field (e.g. the invoice id) that does not appear in its own
+    document, which catches values copied from another document.
+    """
+    if isinstance(content, str):
+        try:
+            content = json.loads(content)
+        except ValueError:
+            return {}
+    items = content.get("items") if isinstance(content, dict) else None
+    if not isinstance(items, list):
+        return {}
+
+    valid: Dict[int, ModelT] = {}
+    for raw in items:
+        if not isinstance(raw, dict):
+            continue
+        index = raw.get("index")
+        if not isinstance(index, int) or not 1 <= index <= len(texts) or index - 1 in valid:
+            continue
+        fields = {
+            k: v for k, v in raw.items() if k in model_cls.model_fields and k != "document"
+        }
+        try:
+            parsed = model_cls.model_validate(fields)
+        except ValidationError:
+            continue
+        text = texts[index - 1]
+        if any(
+            getattr(parsed, name) not in (None, "") and not value_in_text(getattr(parsed, name), text)
+            for name in grounded
+        ):
+            continue
+        valid[index - 1] = parsed
+    return valid
+
+
+def extract_batched(
+    texts: List[str],
+    extract_batch: Callable[[str, int], Any],
+    extract_one: Callable[[str], ModelT],
+    model_cls: Type[ModelT],
+    grounded: Set[str],
+    batch_size: Optional[int] = None,
+) -> List[ModelT]:
+    """
+    Extract many short documents with one LLM call per batch.
+
+    `extract_batch(batch_text, count)` returns the raw JSON answer for a
+    formatted batch; items that fail validate_batch_items (and documents
+    alone in their batch) go through `extract_one` instead.
+    """
+    results: List[Optional[ModelT]] = [None] * len(texts)
+    for batch in pack_batches(texts, batch_size or BATCH_SIZE, MAX_PROMPT_CHARS):
+        batch_texts = [texts[i] for i in batch]
+        valid: Dict[int, ModelT] = {}
+        if len(batch) > 1:
+            try:
+                content = extract_batch(format_batch(batch_texts), len(batch))
+            except Exception:
+                # Every item is retried on its own below
+                content = None
+            valid = validate_batch_items(content, batch_texts, model_cls, grounded)
+
+        for position, index in enumerate(batch):
+            results[index] = valid.get(position) or extract_one(texts[index])
+    return results  # type: ignore[return-value]
@@ -0,0 +1,167 @@
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Type, TypeVar
+
+import yaml
+from llama_index.core.bridge.pydantic import BaseModel
+
+from src.config.prompts import CHUNK_EXTRACTION_NOTE
+from src.observability import tracing
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+MAX_PROMPT_CHARS = _config["extraction"]["max_prompt_chars"]
+CHUNK_CHARS = _config["extraction"]["chunk_chars"]
+MAX_PARALLEL_CHUNKS = _config["extraction"]["max_parallel_chunks"]
+
+# How the values extracted from several chunks are merged into one field
+FIRST = "first"      # first chunk that has it (headers: ids, parties, dates)
+LAST = "last"        # last chunk that has it (totals come after the line items)
+LONGEST = "longest"  # most complete free text
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+# The handle field of ParsedInvoice / ParsedTicket is not extracted
+_NOT_EXTRACTED = {"document"}
+
+
+def _is_table_line(line: str) -> bool:
+    return line.lstrip().startswith("|")
+
+
+def _split_block(block: str, max_chars: int) -> List[str]:
+    """Split one oversized block by lines, repeating a table's header rows."""
+    lines = block.split("\n")
+    header: List[str] = []
+    if len(lines) > 2 and _is_table_line(lines[0]) and _is_table_line(lines[1]):
+        header, lines = lines[:2], lines[2:]
+
+    pieces: List[str] = []
+    current: List[str] = list(header)
+    size = sum(len(line) + 1 for line in current)
+    for line in lines:
+        if len(current) > len(header) and size + len(line) + 1 > max_chars:
+            pieces.append("\n".join(current))
+            current = list(header)
+            size = sum(len(h) + 1 for h in current)
+        current.append(line)
+        size += len(line) + 1
+    if len(current) > len(header):
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_markdown(text: str, max_chars: int) -> List[str]:
+    """
+    Split document markdown into chunks of at most ~`max_chars`, cutting
+    only between blocks (paragraphs, headings, whole tables) unless a
+    single block is larger than a chunk.
+    """
+    blocks = [b for b in re.split(r"\n\s*\n", text) if b.strip()]
+
+    chunks: List[str] = []
+    current = ""
+    for block in blocks:
+        pieces = _split_block(block, max_chars) if len(block) > max_chars else [block]
+        for piece in pieces:
+            if current and len(current) + 2 + len(piece) > max_chars:
+                chunks.append(current)
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _normalized(text: str) -> str:
+    return re.sub(r"\s+", " ", text).lower()
+
+
+def value_in_text(value: Any, text: str) -> bool:
+    """
+    Whether an extracted value literally appears in the chunk it was
+    extracted from (amounts with or without thousands separators).
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        plain = text.replace(",", "")
+        candidates = {f"{value:.2f}"}
+        if float(value).is_integer():
+            candidates.add(str(int(value)))
+        return any(c in plain for c in candidates)
+    return _normalized(str(value)) in _normalized(text)
+
+
+def merge_partials(
+    chunks: List[str],
+    partials: List[Dict[str, Any]],
+    fields: List[str],
+    rules: Dict[str, str],
+    grounded: Set[str],
+) -> Dict[str, Any]:
+    """
+    Merge the fields extracted from each chunk (in document order).
+
+    Each field uses its rule (FIRST by default). For `grounded` fields,
+    values found verbatim in their own chunk win over values the model
+    produced for a chunk that does not contain them.
+    """
+    merged: Dict[str, Any] = {}
+    for field in fields:
+        candidates = [
+            (chunk, partial[field])
+            for chunk, partial in zip(chunks, partials)
+            if partial.get(field) not in (None, "")
+        ]
+        if field in grounded:
+            found = [c for c in candidates if value_in_text(c[1], c[0])]
+            candidates = found or candidates
+        if not candidates:
+            merged[field] = None
+            continue
+
+        rule = rules.get(field, FIRST)
+        if rule == LAST:
+            merged[field] = candidates[-1][1]
+        elif rule == LONGEST:
+            merged[field] = max((c[1] for c in candidates), key=lambda v: len(str(v)))
+        else:
+            merged[field] = candidates[0][1]
+    return merged
+
+
+def extract_in_chunks(
+    text: str,
+    extract: Callable[[str], ModelT],
+    model_cls: Type[ModelT],
+    rules: Dict[str, str],
+    grounded: Set[str],
+    chunk_chars: Optional[int] = None,
+) -> ModelT:
+    """
+    Map-reduce extraction for documents too long for one prompt: run
+    `extract` on every chunk (up to MAX_PARALLEL_CHUNKS at a time), then
+    merge the partial results with merge_partials.
+    """
+    chunks = split_markdown(text, chunk_chars or CHUNK_CHARS)
+    fields = [name for name in model_cls.model_fields if name not in _NOT_EXTRACTED]
+    tracer = tracing.current_tracer()
+
+    def extract_chunk(index: int) -> Dict[str, Any]:
+        note = CHUNK_EXTRACTION_NOTE.format(index=index + 1, count=len(chunks))
+        # Spans of the worker threads belong to the caller's run
+        with tracing.activate(tracer):
+            return extract(note + chunks[index]).model_dump()
+
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(MAX_PARALLEL_CHUNKS, len(chunks))),
+        thread_name_prefix="extract",
+    ) as pool:
+        partials = list(pool.map(extract_chunk, range(len(chunks))))
+
+    return model_cls(**merge_partials(chunks, partials, fields, rules, grounded))
@@ -1,7 +1,20 @@
 from pathlib import Path
-from typing import Literal, TypedDict
+from typing import Literal, Optional, TypedDict
+
+import yaml
 
 from .base_parser import parse_pdf_to_markdown
+from src.observability import tracing
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+# Load configuration
+CONFIG_PATH = PROJECT_ROOT / "config" / "config.yaml"
+with open(CONFIG_PATH) as f:
+    _config = yaml.safe_load(f)
+
+PRECLASSIFY = _config["parsing"]["preclassify"]
+MIN_TEXT_CHARS = _config["parsing"]["min_text_chars"]
 
 DocType = Literal["invoice", "ticket", "unknown"]
 
@@ -43,3 +56,43 @@ def classify_document(file_path: Path) -> ClassifiedDocument:
     """
     full_text = parse_pdf_to_markdown(file_path)
     return classify_document_from_text(full_text)
+
+
+def extract_first_page_text(file_path: Path) -> str:
+    """
+    Text layer of the first PDF page, read locally with pypdf.
+
+    Returns "" for scanned PDFs (no text layer) and for files pypdf cannot
+    read; LlamaParse is then the only way to get at the content.
+    """
+    # Imported here: only needed when a PDF is actually processed
+    from pypdf import PdfReader
+    from pypdf.errors import PyPdfError
+
+    with tracing.span("first_page_text", tracing.IO, backend="pypdf") as s:
+        s["input_bytes"] = Path(file_path).stat().st_size
+        try:
+            reader = PdfReader(file_path)
+            text = reader.pages[0].extract_text() if reader.pages else ""
+        except (PyPdfError, ValueError, KeyError):
+            text = ""
+        s["output_bytes"] = tracing.payload_size(text or "")
+    return text or ""
+
+
+def classify_pdf_first_page(file_path: Path) -> Optional[DocType]:
+    """
+    Classify a PDF from its first page only, before any LlamaParse call.
+
+    Applies the rules of classify_document_from_text to the locally
+    extracted text. Returns None when the page has no usable text layer,
+    or when pre-classification is disabled in config.yaml, meaning "parse
+    it and decide on the full text".
+    """
+    if not PRECLASSIFY:
+        return None
+
+    text = extract_first_page_text(file_path)
+    if len(text.strip()) < MIN_TEXT_CHARS:
+        return None
+    return classify_document_from_text(text)["doc_type"]
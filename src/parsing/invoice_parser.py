@@ -1,13 +1,22 @@
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Any, List, Optional
 
 from llama_index.core.bridge.pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from llama_index.core.llms import ChatMessage
 
 from .base_parser import parse_pdf_to_markdown
+from .batch_extraction import batch_model, extract_batched
+from .chunked_extraction import LAST, MAX_PROMPT_CHARS, extract_in_chunks
 from src.agent.llm_client import get_llm
-from src.config.prompts import INVOICE_SYSTEM_PROMPT, INVOICE_USER_PROMPT
+from src.agent.rate_limits import governed
+from src.observability import tracing
+from src.config.prompts import (
+    INVOICE_BATCH_USER_PROMPT,
+    INVOICE_SYSTEM_PROMPT,
+    INVOICE_USER_PROMPT,
+)
 
 
 class ParsedInvoice(BaseModel):
@@ -46,11 +55,24 @@ class ParsedInvoice(BaseModel):
         ),
     )
 
-    raw_text: str = Field(
-        "", description="Full parsed text of the invoice PDF"
+    # Handle of the parsed text in the DocumentStore (doc://<sha256>).
+    # Left out of the JSON schema so the extraction LLM never sees it.
+    document: SkipJsonSchema[Optional[str]] = Field(
+        None, description="Handle of the full parsed text of the invoice PDF"
     )
 
 
+# Line items sit between the header and the totals, so on long invoices
+# the totals are taken from the last chunk that shows them
+INVOICE_MERGE_RULES = {
+    "total_amount": LAST,
+    "tax_amount": LAST,
+}
+# In a batch, an item whose id is not in its own document is retried alone
+INVOICE_BATCH_GROUNDED_FIELDS = {"invoice_id"}
+INVOICE_GROUNDED_FIELDS = {"invoice_id", "invoice_date", "due_date", "total_amount", "tax_amount"}
+
+
 def _extract_invoice_fields_from_text(text: str) -> ParsedInvoice:
     """
     Use the local LLM (Ollama) to extract invoice fields as structured JSON.
@@ -68,7 +90,12 @@ def _extract_invoice_fields_from_text(text: str) -> ParsedInvoice:
         content=INVOICE_USER_PROMPT.format(text=text),
     )
 
-    response = sllm.chat([system_msg, user_msg])
+    with governed("ollama"), tracing.span(
+        "invoice_extraction", tracing.LLM, backend="ollama"
+    ) as s:
+        s["input_bytes"] = tracing.payload_size(user_msg.content)
+        response = sllm.chat([system_msg, user_msg])
+        tracing.record_llm_usage(s, response)
 
     # response.message.content should be a dict or JSON string for ParsedInvoice
     content = response.message.content
@@ -80,18 +107,84 @@ def _extract_invoice_fields_from_text(text: str) -> ParsedInvoice:
         except Exception:
             data = {}
 
-    # raw_text
-    data.setdefault("raw_text", "")
-
     return ParsedInvoice(**data)
 
 
-def parse_invoice_text(text: str) -> ParsedInvoice:
+def _extract_invoice_batch(batch_text: str, count: int) -> Any:
+    """
+    One local LLM call for `count` invoices (see batch_extraction.format_batch);
+    returns the raw JSON answer, validated item by item by the caller.
+    """
+    llm = get_llm()
+
+    system_msg = ChatMessage(
+        role="system",
+        content=INVOICE_SYSTEM_PROMPT,
+    )
+
+    user_msg = ChatMessage(
+        role="user",
+        content=INVOICE_BATCH_USER_PROMPT.format(count=count, text=batch_text),
+    )
+
+    with governed("ollama"), tracing.span(
+        "invoice_batch_extraction", tracing.LLM, backend="ollama", documents=count
+    ) as s:
+        s["input_bytes"] = tracing.payload_size(user_msg.content)
+        response = llm.chat(
+            [system_msg, user_msg],
+            format=batch_model(ParsedInvoice).model_json_schema(),
+        )
+        tracing.record_llm_usage(s, response)
+
+    return response.message.content
+
+
+def parse_invoice_text(text: str, document: Optional[str] = None) -> ParsedInvoice:
     """
     Preferred helper when you already have the full invoice text.
+    Texts over `extraction.max_prompt_chars` are extracted chunk by chunk.
+
+    `document` is the handle of `text` in the DocumentStore, if any; it is
+    kept on the result instead of a copy of the text.
+    """
+    if len(text) > MAX_PROMPT_CHARS:
+        # Too long for one prompt of the small local model: map-reduce
+        parsed = extract_in_chunks(
+            text,
+            _extract_invoice_fields_from_text,
+            ParsedInvoice,
+            INVOICE_MERGE_RULES,
+            INVOICE_GROUNDED_FIELDS,
+        )
+    else:
+        parsed = _extract_invoice_fields_from_text(text)
+    parsed.document = document
+    return parsed
+
+
+def parse_invoice_texts(
+    texts: List[str],
+    documents: Optional[List[Optional[str]]] = None,
+    batch_size: Optional[int] = None,
+) -> List[ParsedInvoice]:
     """
-    parsed = _extract_invoice_fields_from_text(text)
-    parsed.raw_text = text
+    Batch version of parse_invoice_text for many short invoices: up to
+    `extraction.batch_size` of them share one LLM call (and its long fixed
+    prompt). Items the model gets wrong are re-extracted one by one.
+
+    Results are in the order of `texts`; `documents` are their handles.
+    """
+    parsed = extract_batched(
+        texts,
+        _extract_invoice_batch,
+        parse_invoice_text,
+        ParsedInvoice,
+        INVOICE_BATCH_GROUNDED_FIELDS,
+        batch_size=batch_size,
+    )
+    for result, document in zip(parsed, documents or [None] * len(texts)):
+        result.document = document
     return parsed
 
 
@@ -1,13 +1,22 @@
 import json
 from pathlib import Path
-from typing import Optional
+from typing import Any, List, Optional
 
 from llama_index.core.bridge.pydantic import BaseModel, Field
+from pydantic.json_schema import SkipJsonSchema
 from llama_index.core.llms import ChatMessage
 
 from .base_parser import parse_pdf_to_markdown
+from .batch_extraction import batch_model, extract_batched
+from .chunked_extraction import LONGEST, MAX_PROMPT_CHARS, extract_in_chunks
 from src.agent.llm_client import get_llm
-from src.config.prompts import TICKET_SYSTEM_PROMPT, TICKET_USER_PROMPT
+from src.agent.rate_limits import governed
+from src.observability import tracing
+from src.config.prompts import (
+    TICKET_BATCH_USER_PROMPT,
+    TICKET_SYSTEM_PROMPT,
+    TICKET_USER_PROMPT,
+)
 
 
 class ParsedTicket(BaseModel):
@@ -48,11 +57,21 @@ class ParsedTicket(BaseModel):
         None, description="Longer free-text description of the issue"
     )
 
-    raw_text: str = Field(
-        "", description="Full parsed text of the ticket PDF"
+    # Handle of the parsed text in the DocumentStore (doc://<sha256>).
+    # Left out of the JSON schema so the extraction LLM never sees it.
+    document: SkipJsonSchema[Optional[str]] = Field(
+        None, description="Handle of the full parsed text of the ticket PDF"
     )
 
 
+TICKET_MERGE_RULES = {
+    "description": LONGEST,
+}
+# In a batch, an item whose id is not in its own document is retried alone
+TICKET_BATCH_GROUNDED_FIELDS = {"ticket_id", "invoice_id"}
+TICKET_GROUNDED_FIELDS = {"ticket_id", "invoice_id", "recorded_amount", "document_amount"}
+
+
 def _extract_ticket_fields_from_text(text: str) -> ParsedTicket:
     """Use the local LLM (Ollama) to extract ticket fields as structured JSON."""
     llm = get_llm()
@@ -68,7 +87,12 @@ def _extract_ticket_fields_from_text(text: str) -> ParsedTicket:
         content=TICKET_USER_PROMPT.format(text=text),
     )
 
-    response = sllm.chat([system_msg, user_msg])
+    with governed("ollama"), tracing.span(
+        "ticket_extraction", tracing.LLM, backend="ollama"
+    ) as s:
+        s["input_bytes"] = tracing.payload_size(user_msg.content)
+        response = sllm.chat([system_msg, user_msg])
+        tracing.record_llm_usage(s, response)
     content = response.message.content
 
     if isinstance(content, dict):
@@ -79,18 +103,84 @@ def _extract_ticket_fields_from_text(text: str) -> ParsedTicket:
         except Exception:
             data = {}
 
-    # raw_text may not be correctly set by the LLM, ensure it exists
-    data.setdefault("raw_text", "")
-
     return ParsedTicket(**data)
 
 
-def parse_ticket_text(text: str) -> ParsedTicket:
+def _extract_ticket_batch(batch_text: str, count: int) -> Any:
+    """
+    One local LLM call for `count` tickets (see batch_extraction.format_batch);
+    returns the raw JSON answer, validated item by item by the caller.
+    """
+    llm = get_llm()
+
+    system_msg = ChatMessage(
+        role="system",
+        content=TICKET_SYSTEM_PROMPT,
+    )
+
+    user_msg = ChatMessage(
+        role="user",
+        content=TICKET_BATCH_USER_PROMPT.format(count=count, text=batch_text),
+    )
+
+    with governed("ollama"), tracing.span(
+        "ticket_batch_extraction", tracing.LLM, backend="ollama", documents=count
+    ) as s:
+        s["input_bytes"] = tracing.payload_size(user_msg.content)
+        response = llm.chat(
+            [system_msg, user_msg],
+            format=batch_model(ParsedTicket).model_json_schema(),
+        )
+        tracing.record_llm_usage(s, response)
+
+    return response.message.content
+
+
+def parse_ticket_text(text: str, document: Optional[str] = None) -> ParsedTicket:
     """
     Preferred helper when you already have the full ticket text.
+    Texts over `extraction.max_prompt_chars` are extracted chunk by chunk.
+
+    `document` is the handle of `text` in the DocumentStore, if any; it is
+    kept on the result instead of a copy of the text.
+    """
+    if len(text) > MAX_PROMPT_CHARS:
+        # Too long for one prompt of the small local model: map-reduce
+        parsed = extract_in_chunks(
+            text,
+            _extract_ticket_fields_from_text,
+            ParsedTicket,
+            TICKET_MERGE_RULES,
+            TICKET_GROUNDED_FIELDS,
+        )
+    else:
+        parsed = _extract_ticket_fields_from_text(text)
+    parsed.document = document
+    return parsed
+
+
+def parse_ticket_texts(
+    texts: List[str],
+    documents: Optional[List[Optional[str]]] = None,
+    batch_size: Optional[int] = None,
+) -> List[ParsedTicket]:
     """
-    parsed = _extract_ticket_fields_from_text(text)
-    parsed.raw_text = text
+    Batch version of parse_ticket_text for many short tickets: up to
+    `extraction.batch_size` of them share one LLM call (and its long fixed
+    prompt). Items the model gets wrong are re-extracted one by one.
+
+    Results are in the order of `texts`; `documents` are their handles.
+    """
+    parsed = extract_batched(
+        texts,
+        _extract_ticket_batch,
+        parse_ticket_text,
+        ParsedTicket,
+        TICKET_BATCH_GROUNDED_FIELDS,
+        batch_size=batch_size,
+    )
+    for result, document in zip(parsed, documents or [None] * len(texts)):
+        result.document = document
     return parsed
 
 
@@ -0,0 +1,22 @@
+from pathlib import Path
+
+import pytest
+
+from src.agent import rate_limits
+from src.db.init_db import init_db
+
+
+@pytest.fixture
+def db_path(tmp_path: Path) -> Path:
+    """Empty finance DB with the full schema applied."""
+    path = tmp_path / "finance.db"
+    init_db(path, seed=False)
+    return path
+
+
+@pytest.fixture(autouse=True)
+def rate_limits_db(tmp_path: Path, monkeypatch) -> Path:
+    """Shared backend quotas of each test in its own file, not in data/."""
+    path = tmp_path / "rate_limits.db"
+    monkeypatch.setattr(rate_limits, "RATE_LIMITS_DB_PATH", path)
+    return path
@@ -0,0 +1,72 @@
+import json
+
+from llama_index.llms.ollama import Ollama
+
+from src.agent.registry import LLM_MODEL, REGISTRY
+from src.bench.fake_backends import CannedParser, FakeOllamaServer
+from src.parsing.batch_extraction import extract_batched, pack_batches, validate_batch_items
+from src.parsing.invoice_parser import ParsedInvoice, parse_invoice_text, parse_invoice_texts
+
+
+def test_pack_batches_respects_count_and_size():
+    texts = ["a" * 100] * 5 + ["b" * 1200] + ["c" * 100]
+
+    assert pack_batches(texts, batch_size=3, max_chars=1000) == [[0, 1, 2], [3, 4], [5], [6]]
+
+
+def test_invalid_duplicate_and_foreign_items_are_dropped():
+    texts = ["Invoice #: INV-1", "Invoice #: INV-2", "Invoice #: INV-3"]
+    content = json.dumps(
+        {
+            "items": [
+                {"index": 1, "invoice_id": "INV-1", "total_amount": 10},
+                {"index": 1, "invoice_id": "INV-1", "total_amount": 99},
+                {"index": 2, "invoice_id": "INV-1"},  # copied from document 1
+                {"index": 3, "total_amount": "not a number"},
+                {"index": 7, "invoice_id": "INV-7"},
+            ]
+        }
+    )
+
+    valid = validate_batch_items(content, texts, ParsedInvoice, {"invoice_id"})
+
+    assert list(valid) == [0]
+    assert valid[0].total_amount == 10
+    assert validate_batch_items("not json", texts, ParsedInvoice, {"invoice_id"}) == {}
+
+
+def test_failed_items_are_retried_alone():
+    texts = ["Invoice #: INV-1", "Invoice #: INV-2", "Invoice #: INV-3"]
+    retried = []
+
+    def extract_batch(batch_text, count):
+        assert count == 3 and "=== DOCUMENT 3 ===" in batch_text
+        return {"items": [{"index": 1, "invoice_id": "INV-1"}, {"index": 3, "invoice_id": "INV-3"}]}
+
+    def extract_one(text):
+        retried.append(text)
+        return ParsedInvoice(invoice_id=text.split(": ")[1])
+
+    results = extract_batched(texts, extract_batch, extract_one, ParsedInvoice, {"invoice_id"})
+
+    assert [r.invoice_id for r in results] == ["INV-1", "INV-2", "INV-3"]
+    assert retried == ["Invoice #: INV-2"]
+
+
+def test_batch_matches_single_extraction_with_fewer_calls():
+    parser = CannedParser()
+    texts = [parser.parse(name) for name in parser.names if name.startswith("INV")] * 3
+
+    with FakeOllamaServer() as server:
+        llm = Ollama(model=LLM_MODEL, base_url=server.base_url, request_timeout=30.0)
+        with REGISTRY.override("ollama_llm", llm):
+            single = [parse_invoice_text(text) for text in texts]
+            calls = server.requests
+            batched = parse_invoice_texts(texts, documents=[f"doc://{i}" for i in range(len(texts))])
+            batch_calls = server.requests - calls
+
+    assert [b.model_dump(exclude={"document"}) for b in batched] == [
+        s.model_dump(exclude={"document"}) for s in single
+    ]
+    assert batched[5].document == "doc://5"
+    assert batch_calls < len(texts) // 2
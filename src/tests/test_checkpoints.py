@@ -0,0 +1,130 @@
+import time
+
+import pytest
+from smolagents import tool
+
+from src.agent.checkpoints import RunCheckpoint, checkpoint_tools
+from src.db.checkpoint_store import CheckpointStore
+from src.parsing.invoice_parser import ParsedInvoice
+from src.tools import db_tools, parsing_tools
+from src.tools.db_tools import create_ticket_in_db_tool
+from src.tools.math_tools import validate_invoice_math_tool
+
+SENT = []
+
+
+@tool
+def send_email_tool(recipient: str, subject: str, body: str) -> str:
+    """
+    Test stand-in for the real email tool.
+
+    Args:
+        recipient: Recipient.
+        subject: Subject line.
+        body: Message body.
+    """
+    SENT.append((recipient, subject, body))
+    return f"queued #{len(SENT)}"
+
+
+def test_store_roundtrip_stages_and_ttl(db_path, monkeypatch):
+    store = CheckpointStore(db_path, ttl_seconds=60)
+    store.save("h1", "parse", "parse", "doc://abc")
+    store.save("h1", "math:1", "math", {"is_valid": True})
+    store.save("h2", "parse", "parse", "doc://def")
+
+    assert store.get("h1", "math:1") == (True, {"is_valid": True})
+    assert store.get("h1", "missing") == (False, None)
+    assert store.stages("h1") == ["parse", "math"]
+
+    store.clear("h1")
+    assert store.stages("h1") == []
+
+    monkeypatch.setattr(time, "time", lambda: 10**10)
+    assert store.get("h2", "parse") == (False, None)
+
+
+def test_side_effects_are_not_repeated_on_retry(db_path):
+    SENT.clear()
+    checkpoint = RunCheckpoint(CheckpointStore(db_path), "pdf-hash")
+    send, math = checkpoint_tools([send_email_tool, validate_invoice_math_tool], lambda: checkpoint)
+
+    parsed = {"total_amount": 110.0, "tax_amount": 10.0, "line_items": []}
+    first = send(recipient="a@b.c", subject="Invoice INV-9", body="Please fix the total.")
+    math_result = math(parsed_invoice=parsed, document="Total: 110.00")
+
+    # Retried run: the model rephrases the email
+    retry = RunCheckpoint(CheckpointStore(db_path), "pdf-hash")
+    send, math = checkpoint_tools([send_email_tool, validate_invoice_math_tool], lambda: retry)
+
+    assert send(recipient="a@b.c", subject="Invoice INV-9", body="Could you correct the total?") == first
+    assert math(parsed_invoice=parsed, document="Total: 110.00") == math_result
+    assert len(SENT) == 1
+    assert retry.replayed == ["send_email_tool", "validate_invoice_math_tool"]
+    assert retry.completed_stages() == ["email", "math"]
+
+
+def test_distinct_side_effects_in_one_run_all_run(db_path, monkeypatch):
+    SENT.clear()
+    monkeypatch.setattr(db_tools, "DB_PATH", db_path)
+    checkpoint = RunCheckpoint(CheckpointStore(db_path), "pdf-hash")
+    send, ticket = checkpoint_tools([send_email_tool, create_ticket_in_db_tool], lambda: checkpoint)
+
+    send(recipient="a@b.c", subject="Invoice INV-9", body="Total is off.")
+    send(recipient="x@y.z", subject="Invoice INV-9", body="Total is off.")
+    amount = ticket(
+        invoice_id="INV-9", issue_type="Amount mismatch", description="d",
+        recorded_amount=90.0, document_amount=100.0,
+    )
+    tax = ticket(
+        invoice_id="INV-9", issue_type="Tax mismatch", description="d",
+        recorded_amount=9.0, document_amount=10.0,
+    )
+    # Same issue under another spelling of the ID: replayed, not re-created
+    again = ticket(
+        invoice_id="INV_9", issue_type="amount_mismatch", description="reworded",
+        recorded_amount=90, document_amount=100,
+    )
+
+    assert len(SENT) == 2
+    assert amount["ticket_id"] != tax["ticket_id"]
+    assert again == amount
+    assert checkpoint.replayed == ["create_ticket_in_db_tool"]
+
+
+def test_failed_calls_are_not_checkpointed(db_path):
+    checkpoint = RunCheckpoint(CheckpointStore(db_path), "pdf-hash")
+    (math,) = checkpoint_tools([validate_invoice_math_tool], lambda: checkpoint)
+
+    with pytest.raises(Exception):
+        math()
+
+    assert checkpoint.completed_stages() == []
+
+
+def test_parsed_pdf_is_reused_by_a_retried_run(db_path, tmp_path, monkeypatch):
+    pdf = tmp_path / "invoice.pdf"
+    pdf.write_bytes(b"%PDF-1.4 fake")
+    parses = []
+
+    def parse(path, doc_type=None):
+        parses.append(path)
+        return "Invoice #: INV-9"
+
+    def extract(text, document=None):
+        if len(parses) == 1 and not hasattr(extract, "failed"):
+            extract.failed = True
+            raise TimeoutError("ollama timed out")
+        return ParsedInvoice(invoice_id="INV-9", document=document)
+
+    monkeypatch.setattr(parsing_tools, "DB_PATH", db_path)
+    monkeypatch.setattr(parsing_tools, "classify_pdf_first_page", lambda path: "invoice")
+    monkeypatch.setattr(parsing_tools, "parse_pdf_to_markdown", parse)
+    monkeypatch.setattr(parsing_tools, "parse_invoice_text", extract)
+
+    with pytest.raises(TimeoutError):
+        parsing_tools.parse_document_tool(str(pdf))
+    result = parsing_tools.parse_document_tool(str(pdf))
+
+    assert len(parses) == 1
+    assert result["parsed_invoice"]["invoice_id"] == "INV-9"
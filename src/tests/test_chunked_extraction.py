@@ -0,0 +1,122 @@
+import re
+import threading
+
+from src.parsing import invoice_parser
+from src.parsing.chunked_extraction import (
+    FIRST,
+    LAST,
+    extract_in_chunks,
+    merge_partials,
+    split_markdown,
+)
+from src.parsing.invoice_parser import ParsedInvoice, parse_invoice_text
+
+
+def _long_invoice(items: int) -> str:
+    rows = "\n".join(f"| Item {n} | 1 | {n}.00 |" for n in range(items))
+    return (
+        "# GOTHAM OFFICE SUPPLIES INC.\n\n"
+        "Invoice #: INV-2025-777\n\nInvoice Date: January 10, 2025\n\n"
+        "| Description | Qty | Amount |\n|---|---|---|\n"
+        f"{rows}\n\n"
+        "Sales Tax: 356.78\n\nTotal Amount Due: $4,376.78"
+    )
+
+
+def _fake_extract(text: str) -> ParsedInvoice:
+    """Stand-in for the LLM: reads what the chunk shows, invents a total otherwise."""
+    invoice_id = re.search(r"Invoice #: (\S+)", text)
+    total = re.search(r"Total Amount Due: \$([\d,.]+)", text)
+    return ParsedInvoice(
+        invoice_id=invoice_id.group(1) if invoice_id else None,
+        supplier_name="GOTHAM OFFICE SUPPLIES INC." if "GOTHAM" in text else None,
+        total_amount=float(total.group(1).replace(",", "")) if total else 12.0,
+        currency="USD",
+    )
+
+
+def test_split_keeps_blocks_and_repeats_table_header():
+    text = _long_invoice(300)
+    chunks = split_markdown(text, 1000)
+
+    assert len(chunks) > 3
+    assert all(len(c) <= 1000 for c in chunks)
+    for chunk in chunks:
+        for line in chunk.split("\n"):
+            if line.startswith("| Item"):
+                assert "| Description | Qty | Amount |" in chunk
+    # Nothing lost or reordered
+    items = [int(n) for c in chunks for n in re.findall(r"\| Item (\d+) \|", c)]
+    assert items == list(range(300))
+
+
+def test_merge_prefers_values_found_in_their_chunk():
+    chunks = ["Invoice #: INV-1", "Total: 4,376.78", "Notes"]
+    partials = [
+        {"invoice_id": "INV-1", "total_amount": 10.0},
+        {"invoice_id": None, "total_amount": 4376.78},
+        {"invoice_id": "INV-9", "total_amount": 99.0},
+    ]
+
+    merged = merge_partials(
+        chunks,
+        partials,
+        ["invoice_id", "total_amount"],
+        {"invoice_id": FIRST, "total_amount": LAST},
+        {"invoice_id", "total_amount"},
+    )
+
+    assert merged == {"invoice_id": "INV-1", "total_amount": 4376.78}
+
+
+def test_extract_in_chunks_runs_chunks_in_parallel():
+    in_flight = []
+    peak = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def extract(text):
+        with lock:
+            in_flight.append(1)
+            peak.append(len(in_flight))
+        try:
+            barrier.wait()
+        except threading.BrokenBarrierError:
+            pass
+        with lock:
+            in_flight.pop()
+        return _fake_extract(text)
+
+    result = extract_in_chunks(
+        _long_invoice(300), extract, ParsedInvoice,
+        invoice_parser.INVOICE_MERGE_RULES, invoice_parser.INVOICE_GROUNDED_FIELDS,
+        chunk_chars=1000,
+    )
+
+    assert max(peak) >= 2
+    assert result.invoice_id == "INV-2025-777"
+    assert result.total_amount == 4376.78
+
+
+def test_long_invoice_text_is_extracted_chunk_by_chunk(monkeypatch):
+    prompts = []
+
+    def extract(text):
+        prompts.append(text)
+        return _fake_extract(text)
+
+    monkeypatch.setattr(invoice_parser, "_extract_invoice_fields_from_text", extract)
+    monkeypatch.setattr(invoice_parser, "MAX_PROMPT_CHARS", 2000)
+
+    parsed = parse_invoice_text(_long_invoice(300), document="doc://abc")
+
+    assert len(prompts) > 1
+    assert all(p.startswith("[Part ") for p in prompts)
+    assert parsed.invoice_id == "INV-2025-777"
+    assert parsed.supplier_name == "GOTHAM OFFICE SUPPLIES INC."
+    assert parsed.total_amount == 4376.78
+    assert parsed.document == "doc://abc"
+
+    prompts.clear()
+    parse_invoice_text("Invoice #: INV-1\n\nTotal Amount Due: $5.00")
+    assert len(prompts) == 1 and not prompts[0].startswith("[Part ")
@@ -0,0 +1,190 @@
+import time
+
+import pytest
+from smolagents import tool
+
+from src.agent import document_dag
+from src.agent.dag import ERROR, OK, SKIPPED, DagExecutor, Stage
+from src.db.db_client import DBClient
+from src.db.outbox import Outbox
+from src.tools import db_tools, email_tools, math_tools
+from src.tools.db_tools import (
+    create_ticket_in_db_tool,
+    get_invoice_from_db_tool,
+    upsert_invoice_in_db_tool,
+)
+from src.tools.email_tools import draft_email_tool, send_email_tool
+from src.tools.math_tools import validate_invoice_math_tool
+from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
+
+INVOICE_TEXT = """Invoice #: INV-7
+
+| Description | Qty | Unit price | Amount |
+|---|---|---|---|
+| Consulting | 2 | 50.00 | 100.00 |
+| Subtotal | | | 100.00 |
+| Tax | | | 10.00 |
+| Total | | | 110.00 |
+"""
+
+MATH_ERROR_TEXT = """Invoice #: INV-7
+
+| # | Description | Qty | Unit price | Amount |
+|---|---|---|---|---|
+| 1 | Consulting | 2 | 50.00 | 120.00 |
+| Subtotal | | | | 120.00 |
+| Tax | | | | 10.00 |
+| Total | | | | 130.00 |
+"""
+
+# What the stand-in parser returns; a test may swap in another document
+PARSED = {"text": INVOICE_TEXT, "total_amount": 110.0}
+
+
+@tool
+def parse_document_tool(file_path: str) -> dict:
+    """
+    Test stand-in for the real parsing tool.
+
+    Args:
+        file_path: Path of the document.
+    """
+    return {
+        "doc_type": "invoice",
+        "document": PARSED["text"],
+        "char_count": len(PARSED["text"]),
+        "parsed_invoice": {
+            "invoice_id": "INV-7",
+            "vendor_name": "Acme",
+            "contact_email": "billing@acme.test",
+            "total_amount": PARSED["total_amount"],
+            "tax_amount": 10.0,
+        },
+        "parsed_ticket": None,
+    }
+
+
+def _sleep(seconds, value=None):
+    def fn(**kwargs):
+        time.sleep(seconds)
+        return value
+    return fn
+
+
+def test_independent_stages_run_concurrently():
+    executor = DagExecutor(
+        [
+            Stage("a", _sleep(0.2, 1)),
+            Stage("b", _sleep(0.2, 2)),
+            Stage("c", lambda a, b: a + b, ("a", "b")),
+        ]
+    )
+    run = executor.run()
+
+    assert run.outputs["c"] == 3
+    assert run.wall_seconds < 0.35
+    assert run.timings["c"].start >= run.timings["a"].seconds
+
+
+def test_skipped_and_failed_stages():
+    def boom(x):
+        raise RuntimeError("db unavailable")
+
+    executor = DagExecutor(
+        [
+            Stage("lookup", boom, ("x",)),
+            Stage("math", lambda x: x * 2, ("x",)),
+            Stage("reconcile", lambda lookup: lookup, ("lookup",)),
+            Stage("email", lambda math: "sent", ("math",), when=lambda math: math > 100),
+        ]
+    )
+    run = executor.run(x=3)
+
+    assert run.timings["lookup"].status == ERROR
+    assert run.errors == {"lookup": "db unavailable"}
+    assert run.timings["reconcile"].status == SKIPPED
+    assert run.timings["reconcile"].error == "input lookup failed"
+    # Independent branches still run
+    assert run.timings["math"].status == OK and run.outputs["math"] == 6
+    assert run.timings["email"].status == SKIPPED and run.timings["email"].error is None
+
+
+def test_critical_path_follows_the_slowest_chain():
+    executor = DagExecutor(
+        [
+            Stage("parse", _sleep(0.01)),
+            Stage("math", _sleep(0.01), ("parse",)),
+            Stage("lookup", _sleep(0.15), ("parse",)),
+            Stage("reconcile", _sleep(0.01), ("math", "lookup")),
+        ]
+    )
+    run = executor.run()
+
+    assert run.critical_path() == ["parse", "lookup", "reconcile"]
+    assert [row["stage"] for row in run.timing_summary()][0] == "parse"
+
+
+def test_invalid_graphs_are_rejected():
+    with pytest.raises(ValueError, match="cycle"):
+        DagExecutor([Stage("a", _sleep(0), ("b",)), Stage("b", _sleep(0), ("a",))])
+    with pytest.raises(ValueError, match="unique"):
+        DagExecutor([Stage("a", _sleep(0)), Stage("a", _sleep(0))])
+    with pytest.raises(ValueError, match="unknown inputs"):
+        DagExecutor([Stage("a", _sleep(0), ("missing",))]).run()
+
+
+DOCUMENT_TOOLS = [
+    parse_document_tool,
+    validate_invoice_math_tool,
+    get_invoice_from_db_tool,
+    reconcile_invoice_with_db_tool,
+    upsert_invoice_in_db_tool,
+    create_ticket_in_db_tool,
+    draft_email_tool,
+    send_email_tool,
+]
+
+
+@pytest.fixture
+def dag_db(db_path, monkeypatch):
+    for module in (db_tools, email_tools, math_tools, document_dag):
+        monkeypatch.setattr(module, "DB_PATH", db_path)
+    return db_path
+
+
+def test_document_dag_files_ticket_without_email_on_mismatch(dag_db):
+    DBClient(dag_db).upsert_invoice(
+        {"invoice_id": "INV-7", "vendor_name": "Acme", "total_amount": 95.0, "tax_amount": 10.0}
+    )
+
+    summary = document_dag.run_document_dag("invoice.pdf", tools=DOCUMENT_TOOLS, max_workers=4)
+
+    assert "error" not in summary
+    assert summary["math_check"]["is_valid"] is True
+    assert summary["reconciliation"]["is_match"] is False
+    assert summary["ticket"]["issue_type"] == "Amount mismatch"
+    assert summary["ticket"]["document_amount"] == 110.0
+    assert summary["db_upsert"] is None
+    assert summary["email_status"] is None
+
+    statuses = {row["stage"]: row["status"] for row in summary["stage_timings"]}
+    assert statuses["upsert"] == SKIPPED
+    assert statuses["draft_email"] == SKIPPED
+    assert summary["critical_path"][0] == "parse"
+    assert summary["critical_path"][-1] == "ticket"
+    assert sum(Outbox(dag_db).counts().values()) == 0
+
+
+def test_document_dag_emails_a_math_error_without_a_ticket(dag_db, monkeypatch):
+    monkeypatch.setitem(PARSED, "text", MATH_ERROR_TEXT)
+    monkeypatch.setitem(PARSED, "total_amount", 130.0)
+
+    summary = document_dag.run_document_dag("invoice.pdf", tools=DOCUMENT_TOOLS, max_workers=4)
+
+    assert "error" not in summary
+    assert summary["math_check"]["is_valid"] is False
+    assert summary["ticket"] is None
+    assert "queued" in summary["email_status"]
+    # db_invoice runs beside the whole math branch, so only the start is fixed
+    assert summary["critical_path"][0] == "parse"
+    assert sum(Outbox(dag_db).counts().values()) == 1
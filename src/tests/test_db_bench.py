@@ -0,0 +1,45 @@
+import sqlite3
+from collections import Counter
+
+from src.bench.db_bench import run_db_bench
+from src.bench.db_load import populate_finance_db
+
+
+def test_load_generator_is_skewed(tmp_path):
+    db_path = tmp_path / "load.db"
+    report = populate_finance_db(db_path, invoices=2000, hot_invoice_share=0.01, hot_tickets=50)
+
+    with sqlite3.connect(db_path) as conn:
+        suppliers = Counter(r[0] for r in conn.execute("SELECT supplier_name FROM invoices"))
+        per_invoice = [
+            r[0] for r in conn.execute("SELECT COUNT(*) FROM tickets GROUP BY invoice_id")
+        ]
+
+    assert sum(suppliers.values()) == 2000
+    # Top supplier well above a uniform share
+    assert suppliers.most_common(1)[0][1] > 3 * 2000 / len(suppliers)
+    assert sum(per_invoice) == report["tickets"]
+    assert max(per_invoice) >= 25 > 2 * sum(per_invoice) / len(per_invoice)
+
+
+def test_db_bench_report(db_path):
+    populate_finance_db(db_path, invoices=500)
+
+    report = run_db_bench(db_path, ops=40, threads=(1, 2))
+
+    assert report["db_rows"]["invoices"] == 500
+    assert [(r["operation"], r["threads"]) for r in report["results"]] == [
+        (op, n)
+        for op in (
+            "get_invoice",
+            "upsert_invoice",
+            "create_ticket",
+            "list_tickets_for_invoice",
+            "find_invoice",
+            "lookup_invoices",
+        )
+        for n in (1, 2)
+    ]
+    for result in report["results"]:
+        assert result["latency"]["count"] + result["errors"] == 40
+        assert result["latency"]["p95_ms"] >= result["latency"]["p50_ms"]
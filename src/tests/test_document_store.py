@@ -0,0 +1,40 @@
+import src.tools.math_tools as math_tools
+from src.db.document_store import DocumentStore, is_handle
+
+
+INVOICE_MD = """
+| Item | Description | Qty | Unit Price | Line Total |
+|---|---|---|---|---|
+| 1 | Monthly subscription | 1 | 2,300.00 | 2,300.00 |
+| 2 | Premium support (hours) | 8 | 140.00 | 1,120.00 |
+| 3 | Onboarding fee | 1 | 600.00 | 600.00 |
+| Subtotal | | | | 4,020.00 |
+| Sales Tax (NYC 8.875%) | | | | 356.78 |
+| Total Amount Due | | | | 4,376.78 |
+"""
+
+
+def test_handle_round_trip(db_path):
+    store = DocumentStore(db_path)
+    text = "x" * 100_000
+
+    handle = store.put(text, source_path="big.pdf")
+
+    assert is_handle(handle)
+    assert len(handle) == len("doc://") + 64
+    assert store.put(text) == handle
+    assert DocumentStore(db_path).get(handle) == text
+    assert store.resolve("plain text") == "plain text"
+
+
+def test_math_tool_resolves_handle(db_path, monkeypatch):
+    monkeypatch.setattr(math_tools, "DB_PATH", db_path)
+    handle = DocumentStore(db_path).put(INVOICE_MD)
+    parsed = {"total_amount": 4376.78, "tax_amount": 356.78}
+
+    by_handle = math_tools.validate_invoice_math_tool(parsed_invoice=parsed, document=handle)
+    by_text = math_tools.validate_invoice_math_tool(parsed_invoice=parsed, document=INVOICE_MD)
+
+    assert by_handle == by_text
+    assert by_handle["is_valid"] is True
+    assert by_handle["subtotal"] == 4020.0
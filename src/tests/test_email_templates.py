@@ -0,0 +1,95 @@
+from src.db.llm_cache import LLMCache
+from src.mail.templates import (
+    AMOUNT_MISMATCH,
+    MATH_ERROR,
+    NEW_INVOICE,
+    TAX_MISMATCH,
+    detect_issue_type,
+    render_template_email,
+)
+
+
+INVOICE = {
+    "invoice_id": "INV-2025-001",
+    "supplier_name": "GOTHAM OFFICE SUPPLIES INC.",
+    "invoice_date": "January 15, 2025",
+    "due_date": "February 14, 2025",
+    "total_amount": 4376.78,
+    "tax_amount": 356.78,
+    "currency": "USD",
+}
+
+
+def test_math_error_template():
+    context = {
+        "parsed_invoice": INVOICE,
+        "math_check": {
+            "is_valid": False,
+            "issues": ["Line item 2: Qty * Unit Price = 1120.00 but Line Total is 1200.00."],
+            "subtotal": 4020.0,
+        },
+    }
+
+    assert detect_issue_type(context) == MATH_ERROR
+    body = render_template_email(context)
+    assert "INV-2025-001" in body
+    assert "Line item 2" in body
+    assert body.startswith("Hello GOTHAM OFFICE SUPPLIES INC. team,")
+
+
+def test_amount_and_tax_mismatch_templates():
+    amount_ctx = {
+        "parsed_invoice": INVOICE,
+        "math_check": {"is_valid": True, "issues": []},
+        "reconciliation": {
+            "is_match": False,
+            "differences": [
+                "total_amount: db=4300.00, document=4376.78",
+                "tax_amount: db=280.00, document=356.78",
+            ],
+        },
+        "ticket": {"ticket_id": "TCK-2025-000042"},
+    }
+    assert detect_issue_type(amount_ctx) == AMOUNT_MISMATCH
+    body = render_template_email(amount_ctx)
+    assert "our records show 4,300.00 USD, the invoice shows 4,376.78 USD" in body
+    assert "TCK-2025-000042" in body
+
+    tax_ctx = {
+        "parsed_invoice": INVOICE,
+        "reconciliation": {
+            "is_match": False,
+            "differences": ["tax_amount: db=280.00, document=356.78"],
+        },
+    }
+    assert detect_issue_type(tax_ctx) == TAX_MISMATCH
+    assert "tax rate" in render_template_email(tax_ctx)
+
+
+def test_new_invoice_confirmation():
+    context = {
+        "parsed_invoice": INVOICE,
+        "reconciliation": {"is_match": None, "differences": []},
+    }
+
+    assert detect_issue_type(context) == NEW_INVOICE
+    body = render_template_email(context)
+    assert "received and recorded invoice INV-2025-001" in body
+    assert "February 14, 2025" in body
+
+
+def test_contexts_that_need_the_llm():
+    # Free-form instructions and unknown issue labels are not templated
+    assert render_template_email({"parsed_invoice": INVOICE, "user_instruction": "Be brief"}) is None
+    assert render_template_email({"issue_type": "Duplicate payment"}) is None
+    assert render_template_email({"parsed_invoice": INVOICE}) is None
+
+
+def test_llm_drafts_are_cached_per_model_and_prompt(db_path):
+    cache = LLMCache(db_path)
+    context = {"issue_type": "Duplicate payment"}
+    cache.put("email_draft", LLMCache.key_for("llama3.1", "v1", "a@b.test", context), "draft")
+
+    assert cache.get("email_draft", LLMCache.key_for("llama3.1", "v1", "a@b.test", context)) == "draft"
+    assert cache.get("email_draft", LLMCache.key_for("qwen2.5", "v1", "a@b.test", context)) is None
+    assert cache.get("email_draft", LLMCache.key_for("llama3.1", "v2", "a@b.test", context)) is None
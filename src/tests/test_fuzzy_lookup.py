@@ -0,0 +1,129 @@
+import json
+import sqlite3
+
+from src.bench.db_load import populate_finance_db
+from src.db.db_client import DBClient
+from src.db.fuzzy_index import normalize_invoice_id, normalize_supplier_name
+from src.db.init_db import apply_schema
+from src.db.report_store import ReportStore
+from src.tools.chat_tools import create_record_lookup_tool
+from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
+
+
+def _invoice(invoice_id, supplier="Gotham Office Supplies Inc.", total=100.0):
+    return {"invoice_id": invoice_id, "supplier_name": supplier, "total_amount": total}
+
+
+def _invoice_count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM invoices").fetchone()[0]
+
+
+def test_normalized_keys():
+    assert (
+        normalize_invoice_id("INV_2025_001")
+        == normalize_invoice_id(" inv-2025-001 ")
+        == normalize_invoice_id("INV-2O25-OO1")
+        == "INV2025001"
+    )
+    assert normalize_supplier_name("Gotham Office Supplies, Inc.") == "GOTHAM OFFICE SUPPLIES"
+    assert normalize_supplier_name("ACME CO") == "ACME"
+
+
+def test_variant_ids_find_and_update_the_stored_invoice(db_path):
+    db = DBClient(db_path)
+    db.upsert_invoice(_invoice("INV-2025-001", total=100.0))
+
+    found = db.find_invoice("INV_2025_OO1")
+    assert found["invoice_id"] == "INV-2025-001"
+    assert reconcile_invoice_with_db_tool(
+        parsed_invoice=_invoice("INV_2025_OO1", total=120.0), db_invoice=found
+    )["is_match"] is False
+
+    # Upserting the file-name spelling of the same invoice updates its row
+    assert db.upsert_invoice(_invoice("INV_2025_001", total=100.0)) == "INV-2025-001"
+    assert _invoice_count(db_path) == 1
+    assert db.get_invoice("INV-2025-001")["row_version"] == 2
+    assert db.find_invoice("INV-2025-002") is None
+
+
+def test_ids_differing_in_separator_placement_stay_distinct(db_path):
+    db = DBClient(db_path)
+    db.upsert_invoice(_invoice("INV-2025-110", supplier="A", total=100.0))
+
+    # Same normalized key, but another supplier and total: another invoice
+    assert db.upsert_invoice(_invoice("INV-20251-10", supplier="B", total=999.0)) == "INV-20251-10"
+    assert _invoice_count(db_path) == 2
+    assert db.get_invoice("INV-2025-110")["supplier_name"] == "A"
+    assert db.get_invoice("INV-2025-110")["total_amount"] == 100.0
+
+    # A corrected total under another spelling is not merged either
+    db.upsert_invoice(_invoice("INV_2025_110", supplier="A", total=120.0))
+    assert _invoice_count(db_path) == 3
+    assert db.get_invoice("INV-2025-110")["total_amount"] == 100.0
+
+
+def test_lookup_ranks_candidates(db_path):
+    db = DBClient(db_path)
+    for invoice_id, supplier in [
+        ("INV-2025-001", "Gotham Office Supplies Inc."),
+        ("INV-2025-017", "Wayne Hardware LLC"),
+        ("TCK-9999-999", "Wayne Hardware LLC"),
+    ]:
+        db.upsert_invoice(_invoice(invoice_id, supplier))
+
+    candidates = db.lookup_invoices("INV-2025-018")
+    assert candidates[0]["invoice_id"] == "INV-2025-017"
+    assert [c["score"] for c in candidates] == sorted((c["score"] for c in candidates), reverse=True)
+    assert "TCK-9999-999" not in [c["invoice_id"] for c in candidates]
+    assert db.lookup_invoices("INV-2025-001")[0]["score"] == 1.0
+
+    (best, *_) = db.lookup_suppliers("wayne hardwre")
+    assert best["supplier_name"] == "Wayne Hardware LLC"
+    assert 0 < best["score"] < 1
+
+
+def test_tickets_reference_the_stored_invoice_id(db_path):
+    db = DBClient(db_path)
+    db.upsert_invoice(_invoice("INV-2025-001"))
+    db.create_ticket("INV_2025_001", "Amount mismatch", "d", 90.0, 100.0)
+    db.create_ticket("INV-2025-001", "Tax mismatch", "d", 9.0, 10.0)
+
+    tickets = db.list_tickets_for_invoice("inv 2025 OO1")
+    assert [t["invoice_id"] for t in tickets] == ["INV-2025-001", "INV-2025-001"]
+    assert ReportStore(db_path).supplier("Gotham Office Supplies Inc.")["ticket_count"] == 2
+
+
+def test_lookup_tool_returns_invoice_and_supplier_candidates(db_path):
+    DBClient(db_path).upsert_invoice(_invoice("INV-2025-017"))
+    lookup = create_record_lookup_tool(db_path)
+
+    found = json.loads(lookup(text="INV-2025-018"))
+    assert found["invoices"][0]["invoice_id"] == "INV-2025-017"
+    assert json.loads(lookup(text="Gotham Ofice Supplies"))["suppliers"][0]["score"] > 0.9
+    assert lookup(text="zzz").startswith("No stored invoice or supplier")
+
+
+def test_apply_schema_keys_and_indexes_existing_invoices(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO invoices (invoice_id, supplier_name) VALUES ('INV-2025-001', 'ACME')"
+        )
+        conn.execute("DROP TABLE invoice_key_variants")
+
+    apply_schema(db_path)
+
+    db = DBClient(db_path)
+    assert db.find_invoice("INV_2025_001")["invoice_id"] == "INV-2025-001"
+    assert db.lookup_suppliers("ACME Inc")[0]["score"] == 1.0
+
+
+def test_lookup_on_a_loaded_db(db_path):
+    populate_finance_db(db_path, invoices=3000)
+    db = DBClient(db_path)
+    with sqlite3.connect(db_path) as conn:
+        (invoice_id,) = conn.execute("SELECT invoice_id FROM invoices LIMIT 1 OFFSET 1234").fetchone()
+
+    assert db.find_invoice(invoice_id.replace("-", "_"))["invoice_id"] == invoice_id
+    typo = invoice_id[:-1] + str((int(invoice_id[-1]) + 1) % 10)
+    assert invoice_id in [c["invoice_id"] for c in db.lookup_invoices(typo, limit=10)]
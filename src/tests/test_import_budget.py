@@ -0,0 +1,8 @@
+from src.bench.import_time import DEFERRED_PACKAGES, measure_import_time
+
+
+def test_heavy_packages_not_imported_at_startup():
+    report = measure_import_time("streamlit_app")
+
+    imported = [p for p in DEFERRED_PACKAGES if p in report["packages"]]
+    assert imported == []
@@ -0,0 +1,139 @@
+import threading
+import time
+
+import pytest
+from llama_index.llms.ollama import Ollama
+from smolagents.models import ChatMessage, MessageRole
+
+from src.agent import inference
+from src.agent.inference import FALLBACK, HEDGE, PRIMARY, OllamaAgentModel, ResilientModel
+from src.agent.registry import LLM_MODEL
+from src.bench.fake_backends import FakeOllamaServer
+from src.observability.tracing import TracedModel, Tracer
+
+MESSAGES = [ChatMessage(role=MessageRole.USER, content=[{"type": "text", "text": "Hi"}])]
+
+
+class FakeRemoteModel:
+    """Answers after the given delays (one per call, the last one repeats)."""
+
+    def __init__(self, model_id, *delays, error=None):
+        self.model_id = model_id
+        self.delays = list(delays)
+        self.error = error
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def generate(self, messages, **kwargs):
+        with self._lock:
+            delay = self.delays[min(self.calls, len(self.delays) - 1)]
+            self.calls += 1
+            call = self.calls
+        time.sleep(delay)
+        if self.error is not None:
+            raise self.error
+        return ChatMessage(role=MessageRole.ASSISTANT, content=f"{self.model_id} answer {call}")
+
+
+@pytest.fixture(autouse=True)
+def fast_hedging(monkeypatch):
+    monkeypatch.setattr(inference, "HEDGE_MIN_SECONDS", 0.05)
+    monkeypatch.setattr(inference, "HEDGE_DEFAULT_SECONDS", 0.1)
+
+
+def test_fast_call_is_answered_by_the_first_request():
+    model = ResilientModel(FakeRemoteModel("fast", 0.0), deadline_seconds=2)
+
+    assert model.generate(MESSAGES).content == "fast answer 1"
+    assert model.last_call["answered_by"] == PRIMARY
+    assert model.last_call["requests"] == 1
+
+
+def test_slow_request_is_hedged():
+    remote = FakeRemoteModel("hedged", 1.0, 0.0)
+    model = ResilientModel(remote, deadline_seconds=5)
+
+    start = time.monotonic()
+    message = model.generate(MESSAGES)
+
+    assert time.monotonic() - start < 0.5
+    assert message.content == "hedged answer 2"
+    assert model.last_call["answered_by"] == HEDGE
+    assert model.last_call["requests"] == 2
+
+
+def test_hedge_delay_follows_recent_p95(monkeypatch):
+    monkeypatch.setattr(inference, "MIN_SAMPLES", 5)
+    model = ResilientModel(FakeRemoteModel("p95", 0.0), deadline_seconds=5)
+    window = inference.latency_window("p95")
+    window._values.clear()
+
+    assert model.hedge_after_seconds() == 0.1
+    for seconds in [0.2, 0.3, 0.4, 0.5, 3.0]:
+        window.add(seconds)
+    assert model.hedge_after_seconds() == 3.0
+    assert ResilientModel(FakeRemoteModel("p95", 0.0), hedge=False).hedge_after_seconds() is None
+
+
+def test_deadline_fails_over_to_local_model():
+    fallback = FakeRemoteModel("local", 0.0)
+    model = ResilientModel(
+        FakeRemoteModel("stuck", 2.0), fallback=fallback, deadline_seconds=0.2, hedge=False
+    )
+
+    start = time.monotonic()
+    message = model.generate(MESSAGES)
+
+    assert time.monotonic() - start < 0.6
+    assert message.content == "local answer 1"
+    assert model.last_call["answered_by"] == FALLBACK
+    assert "no answer within" in model.last_call["fallback_reason"]
+
+
+def test_remote_errors_fail_over_or_raise():
+    broken = FakeRemoteModel("broken", 0.0, error=RuntimeError("503 Service Unavailable"))
+
+    model = ResilientModel(broken, fallback=FakeRemoteModel("local", 0.0), deadline_seconds=2)
+    assert model.generate(MESSAGES).content == "local answer 1"
+    assert "503" in model.last_call["fallback_reason"]
+
+    with pytest.raises(RuntimeError, match="503"):
+        ResilientModel(broken, deadline_seconds=2).generate(MESSAGES)
+    with pytest.raises(TimeoutError):
+        ResilientModel(FakeRemoteModel("stuck", 1.0), deadline_seconds=0.1, hedge=False).generate(
+            MESSAGES
+        )
+
+
+def test_outcome_is_recorded_on_the_llm_span():
+    tracer = Tracer("test")
+    model = TracedModel(
+        ResilientModel(
+            FakeRemoteModel("stuck", 1.0),
+            fallback=FakeRemoteModel("local", 0.0),
+            deadline_seconds=0.1,
+            hedge=False,
+        ),
+        lambda: tracer,
+    )
+    model.generate(MESSAGES)
+
+    (span,) = tracer.spans
+    assert span["name"] == "stuck"
+    assert span["attrs"]["answered_by"] == FALLBACK
+
+
+def test_ollama_agent_model_answers_smolagents_messages():
+    with FakeOllamaServer() as server:
+        model = OllamaAgentModel(Ollama(model=LLM_MODEL, base_url=server.base_url, request_timeout=30.0))
+        message = model.generate(
+            [
+                ChatMessage(role=MessageRole.SYSTEM, content=[{"type": "text", "text": "Be brief."}]),
+                *MESSAGES,
+            ],
+            stop_sequences=["Best regards"],
+        )
+
+    assert message.role == MessageRole.ASSISTANT
+    assert message.content.startswith("Hello,")
+    assert "Best regards" not in message.content
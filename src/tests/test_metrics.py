@@ -0,0 +1,112 @@
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.db_client import DBClient
+from src.db.upload_store import UploadStore
+from src.observability import metrics, tracing
+
+
+@pytest.fixture(autouse=True)
+def fresh_metrics():
+    metrics.METRICS.reset()
+    yield
+    metrics.METRICS.reset()
+
+
+class _FakeModel:
+    model_id = "fake-model"
+
+    def generate(self, messages, **kwargs):
+        return SimpleNamespace(
+            content="done",
+            token_usage=SimpleNamespace(input_tokens=120, output_tokens=8),
+        )
+
+
+def test_prometheus_text_format():
+    registry = metrics.MetricsRegistry()
+    docs = registry.counter("docs_total", "Documents.", ("status",))
+    latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+    docs.inc(status="ok")
+    docs.inc(2, status="ok")
+    latency.observe(0.05)
+    latency.observe(5)
+
+    text = registry.render_prometheus()
+
+    assert "# TYPE docs_total counter" in text
+    assert 'docs_total{status="ok"} 3' in text
+    assert 'latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{le="1"} 1' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 2' in text
+    assert "latency_seconds_count 2" in text
+    with pytest.raises(ValueError):
+        docs.inc(pipeline="dag")
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = metrics.Histogram("h", "h", buckets=(1, 2, 4))
+    assert histogram.quantile(0.5) is None
+    for value in (0.5, 1.5, 1.5, 3):
+        histogram.observe(value)
+
+    assert histogram.count() == 4
+    assert histogram.quantile(0.5) == pytest.approx(1.5)
+    assert 2 < histogram.quantile(0.95) <= 4
+
+
+def test_stage_and_token_metrics_recorded_without_a_traced_run():
+    model = tracing.TracedModel(_FakeModel(), lambda: None, backend="hf_inference")
+    model.generate([SimpleNamespace(content="What is the total?")])
+    with pytest.raises(ValueError):
+        with tracing.span("llamaparse", tracing.IO, backend="llamaparse"):
+            raise ValueError("boom")
+
+    assert tracing.current_tracer() is None
+    assert metrics.STAGE_SECONDS.count(kind="llm", backend="hf_inference", stage="fake-model") == 1
+    assert metrics.LLM_TOKENS.value(
+        backend="hf_inference", stage="fake-model", direction="input"
+    ) == 120
+    assert metrics.STAGE_ERRORS.value(kind="io", backend="llamaparse", stage="llamaparse") == 1
+
+
+def test_db_client_queries_timed(db_path):
+    client = DBClient(db_path)
+    client.get_invoice("INV-404")
+    client.get_invoice("INV-405")
+
+    assert metrics.DB_QUERY_SECONDS.count(operation="get_invoice") == 2
+
+    # create_ticket delegates to get_or_create_ticket, timed once under its name
+    client.create_ticket("INV-404", "Amount mismatch", "diff", 1.0, 2.0)
+    assert metrics.DB_QUERY_SECONDS.count(operation="get_or_create_ticket") == 1
+    assert metrics.DB_QUERY_SECONDS.count(operation="create_ticket") == 0
+
+
+def test_workflow_result_lookups_counted(db_path, tmp_path):
+    store = UploadStore(db_path, tmp_path / "uploads")
+    store.get_cached_result("hash-1")
+    store.save_result("hash-1", {"doc_type": "ticket"})
+    store.get_cached_result("hash-1")
+
+    assert metrics.CACHE_REQUESTS.value(cache="workflow_result", result="miss") == 1
+    assert metrics.CACHE_REQUESTS.value(cache="workflow_result", result="hit") == 1
+
+
+def test_prometheus_endpoint_serves_metrics():
+    metrics.DOCUMENTS.inc(pipeline="dag", doc_type="invoice", status="ok")
+    url = metrics.start_metrics_server("127.0.0.1", 0)
+    try:
+        assert url is not None
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+    finally:
+        metrics.stop_metrics_server()
+
+    assert content_type.startswith("text/plain")
+    assert (
+        'invoice_agent_documents_total{pipeline="dag",doc_type="invoice",status="ok"} 1' in body
+    )
@@ -0,0 +1,72 @@
+from src.db.outbox import Outbox
+from src.mail.backends import FakeGmailBackend
+from src.mail.sender import OutboxSender
+from src.observability import metrics
+
+
+def test_sender_drains_outbox_in_batches(db_path):
+    outbox = Outbox(db_path)
+    for i in range(45):
+        outbox.enqueue(f"s{i}@example.com", "Invoice issue", "body")
+
+    backend = FakeGmailBackend()
+    sender = OutboxSender(outbox, backend, batch_size=20)
+    while sender.drain_once():
+        pass
+
+    assert len(backend.sent) == 45
+    assert backend.batches == 3
+    assert outbox.counts() == {"sent": 45}
+
+
+def test_batches_are_labelled_with_the_backend(db_path):
+    metrics.METRICS.reset()
+    outbox = Outbox(db_path)
+    outbox.enqueue("s@example.com", "Invoice issue", "body")
+
+    OutboxSender(outbox, FakeGmailBackend()).drain_once()
+
+    assert metrics.STAGE_SECONDS.count(kind="io", backend="fake", stage="send_batch") == 1
+    assert metrics.STAGE_SECONDS.count(kind="io", backend="gmail", stage="send_batch") == 0
+    metrics.METRICS.reset()
+
+
+def test_failed_send_is_retried_then_given_up(db_path):
+    outbox = Outbox(db_path)
+    outbox_id = outbox.enqueue("s@example.com", "Invoice issue", "body")
+
+    backend = FakeGmailBackend(failure_rate=1.0)
+    sender = OutboxSender(outbox, backend, max_attempts=3, backoff_seconds=0.0)
+
+    for _ in range(3):
+        assert sender.drain_once() == 1
+    assert sender.drain_once() == 0
+
+    row = outbox.get(outbox_id)
+    assert row["status"] == "failed"
+    assert row["attempts"] == 3
+    assert "503" in row["last_error"]
+
+
+def test_backoff_delays_retry(db_path):
+    outbox = Outbox(db_path)
+    outbox.enqueue("s@example.com", "Invoice issue", "body")
+
+    sender = OutboxSender(outbox, FakeGmailBackend(failure_rate=1.0), backoff_seconds=60)
+    assert sender.drain_once() == 1
+    # Not due again before the backoff expires
+    assert sender.drain_once() == 0
+    assert outbox.counts() == {"pending": 1}
+
+
+def test_claims_do_not_overlap(db_path):
+    outbox = Outbox(db_path)
+    for i in range(10):
+        outbox.enqueue(f"s{i}@example.com", "s", "b")
+
+    first = outbox.claim_batch(6)
+    second = outbox.claim_batch(6)
+
+    assert len(first) == 6
+    assert len(second) == 4
+    assert not {r["id"] for r in first} & {r["id"] for r in second}
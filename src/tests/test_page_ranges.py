@@ -0,0 +1,124 @@
+import threading
+import time
+
+from pypdf import PdfReader, PdfWriter
+
+from src.parsing import base_parser
+from src.parsing.base_parser import page_ranges, parse_pdf_to_markdown, stitch_pages
+
+
+class FakeDocument:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeLlamaParse:
+    """Returns "page <n>" per page, where n is encoded in the page width."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.jobs = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def load_data(self, paths):
+        with self._lock:
+            self.jobs += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        reader = PdfReader(paths[0])
+        return [FakeDocument(f"page {int(p.mediabox.width) - 100}") for p in reader.pages]
+
+
+def _pdf(tmp_path, pages):
+    writer = PdfWriter()
+    for n in range(1, pages + 1):
+        writer.add_blank_page(width=100 + n, height=200)
+    path = tmp_path / f"doc_{pages}.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    return path
+
+
+def test_page_ranges_cover_all_pages():
+    assert page_ranges(7, 3) == [(0, 3), (3, 6), (6, 7)]
+    assert page_ranges(0, 3) == []
+
+
+def test_large_pdf_is_parsed_as_ranges_in_page_order(tmp_path, monkeypatch):
+    fake = FakeLlamaParse(delay=0.05)
+    monkeypatch.setattr(base_parser, "_get_llamaparse", lambda **settings: fake)
+    monkeypatch.setattr(base_parser, "SPLIT_MIN_PAGES", 10)
+    monkeypatch.setattr(base_parser, "PAGES_PER_RANGE", 4)
+    monkeypatch.setattr(base_parser, "MAX_PARALLEL_RANGES", 3)
+
+    text = parse_pdf_to_markdown(_pdf(tmp_path, 18))
+
+    assert text == "\n\n".join(f"page {n}" for n in range(1, 19))
+    assert fake.jobs == 5
+    assert 1 < fake.max_in_flight <= 3
+
+
+def test_small_pdf_is_one_job(tmp_path, monkeypatch):
+    fake = FakeLlamaParse()
+    monkeypatch.setattr(base_parser, "_get_llamaparse", lambda **settings: fake)
+    monkeypatch.setattr(base_parser, "SPLIT_MIN_PAGES", 10)
+
+    assert parse_pdf_to_markdown(_pdf(tmp_path, 3)) == "page 1\n\npage 2\n\npage 3"
+    assert fake.jobs == 1
+
+
+def test_table_continued_with_repeated_header_is_merged():
+    pages = [
+        "# Items\n\n| Item | Qty |\n|---|---|\n| Paper | 10 |",
+        "| Item | Qty |\n|---|---|\n| Toner | 2 |\n\nSubtotal: 120.00",
+    ]
+
+    assert stitch_pages(pages) == (
+        "# Items\n\n| Item | Qty |\n|---|---|\n| Paper | 10 |\n| Toner | 2 |\n\nSubtotal: 120.00"
+    )
+
+
+def test_table_with_another_header_is_not_merged():
+    pages = [
+        "| Item | Qty |\n|---|---|\n| Paper | 10 |\n",
+        "| Toner | 2 |\n| --- | --- |\n| Pens | 5 |",
+    ]
+
+    assert stitch_pages(pages) == "\n\n".join(pages)
+
+
+def test_tables_are_stitched_only_across_range_boundaries(tmp_path, monkeypatch):
+    table_page = "| Item | Qty |\n|---|---|\n| Paper | {n} |"
+
+    def fake_parse_pages(file_path, settings, **attrs):
+        return [table_page.format(n=n) for n in range(len(PdfReader(file_path).pages))]
+
+    monkeypatch.setattr(base_parser, "_parse_pages", fake_parse_pages)
+    monkeypatch.setattr(base_parser, "SPLIT_MIN_PAGES", 4)
+    monkeypatch.setattr(base_parser, "PAGES_PER_RANGE", 2)
+
+    # One job: the pages come back joined as LlamaParse returned them
+    assert parse_pdf_to_markdown(_pdf(tmp_path, 2)) == "\n\n".join(
+        table_page.format(n=n) for n in range(2)
+    )
+
+    # Ranges [1-2] and [3-4]: only the boundary between them is stitched
+    assert parse_pdf_to_markdown(_pdf(tmp_path, 4)) == (
+        "| Item | Qty |\n|---|---|\n| Paper | 0 |\n\n"
+        "| Item | Qty |\n|---|---|\n| Paper | 1 |\n| Paper | 0 |\n\n"
+        "| Item | Qty |\n|---|---|\n| Paper | 1 |"
+    )
+
+
+def test_unrelated_tables_are_not_merged():
+    pages = [
+        "| Item | Qty |\n|---|---|\n| Paper | 10 |",
+        "| Tax | Rate | Amount |\n|---|---|---|\n| NY | 8.875% | 10.65 |",
+    ]
+
+    assert stitch_pages(pages) == "\n\n".join(pages)
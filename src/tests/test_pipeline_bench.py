@@ -0,0 +1,40 @@
+from src.bench.fake_backends import CannedParser, extract_invoice_fields, extract_ticket_fields
+from src.bench.pipeline_bench import run_pipeline_bench
+from src.bench.synthetic_invoices import MATH_ERROR, generate_documents
+from src.tools.math_tools import validate_invoice_math_tool
+
+
+def test_canned_samples_read_like_the_pdfs():
+    parser = CannedParser()
+
+    invoice = extract_invoice_fields(parser.parse("INV_2025_001.pdf"))
+    ticket = extract_ticket_fields(parser.parse("TCK_2025_001.pdf"))
+
+    assert invoice["invoice_id"] == "INV-2025-001"
+    assert invoice["total_amount"] == 4376.78
+    assert invoice["tax_amount"] == 356.78
+    assert invoice["contact_email"] == "billing@gotham-office.com"
+    assert ticket["invoice_id"] == "INV-2025-001"
+    assert ticket["recorded_amount"] == 4300.0
+
+
+def test_synthetic_documents_are_deterministic_and_consistent():
+    first = list(generate_documents(50, seed=7))
+    assert first == list(generate_documents(50, seed=7))
+
+    for doc in first:
+        if doc["doc_type"] != "invoice":
+            continue
+        result = validate_invoice_math_tool(parsed_invoice=doc["invoice"], document=doc["markdown"])
+        assert result["is_valid"] is (doc["scenario"] != MATH_ERROR), doc["name"]
+
+
+def test_pipeline_bench_report():
+    report = run_pipeline_bench(documents=40, workers=2, seed=3)
+
+    assert report["documents"] == 45  # 40 synthetic + 4 sample invoices + 1 ticket
+    assert report["errors"] == []
+    assert report["unexpected_outcomes"] == 0
+    assert report["stages"]["extract"]["count"] == 45
+    assert report["stages"]["parse"]["p95_ms"] >= report["stages"]["parse"]["p50_ms"]
+    assert report["docs_per_sec"] > 0
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from pypdf import PdfWriter
+
+from src.parsing import document_classifier
+from src.parsing.document_classifier import classify_pdf_first_page
+
+DATA_DIR = Path(__file__).resolve().parents[2] / "data"
+
+
+@pytest.mark.parametrize(
+    "pdf, expected",
+    [
+        (DATA_DIR / "sample_invoices" / "INV_2025_001.pdf", "invoice"),
+        (DATA_DIR / "sample_tickets" / "TCK_2025_001.pdf", "ticket"),
+    ],
+)
+def test_first_page_classifies_samples(pdf, expected):
+    assert classify_pdf_first_page(pdf) == expected
+
+
+def test_pdf_without_text_layer_is_left_to_llamaparse(tmp_path):
+    writer = PdfWriter()
+    writer.add_blank_page(width=612, height=792)
+    pdf = tmp_path / "scan.pdf"
+    with open(pdf, "wb") as f:
+        writer.write(f)
+
+    assert classify_pdf_first_page(pdf) is None
+
+
+def test_unreadable_file_is_left_to_llamaparse(tmp_path):
+    pdf = tmp_path / "broken.pdf"
+    pdf.write_bytes(b"not a pdf at all")
+
+    assert classify_pdf_first_page(pdf) is None
+
+
+def test_disabled_preclassification(monkeypatch):
+    monkeypatch.setattr(document_classifier, "PRECLASSIFY", False)
+
+    assert classify_pdf_first_page(DATA_DIR / "sample_invoices" / "INV_2025_001.pdf") is None
+
+
+def test_unknown_pdf_is_rejected_before_llamaparse(monkeypatch):
+    from src.tools import parsing_tools
+
+    def no_parse(*args, **kwargs):
+        raise AssertionError("LlamaParse must not be called")
+
+    monkeypatch.setattr(parsing_tools, "classify_pdf_first_page", lambda path: "unknown")
+    monkeypatch.setattr(parsing_tools, "parse_pdf_to_markdown", no_parse)
+
+    result = parsing_tools.parse_document_tool(
+        str(DATA_DIR / "sample_invoices" / "INV_2025_001.pdf")
+    )
+
+    assert result["doc_type"] == "unknown"
+    assert result["document"] is None
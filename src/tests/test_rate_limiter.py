@@ -0,0 +1,91 @@
+import multiprocessing
+import threading
+import time
+
+import pytest
+
+from src.agent import rate_limits
+from src.db.rate_limiter import BackendLimit, RateLimiter, RateLimitTimeout
+from src.observability.tracing import Tracer, activate
+
+
+def _hold_slots(db_path, backend, count, hold_seconds, results):
+    limiter = RateLimiter(db_path, {backend: BackendLimit(max_concurrent=2)})
+    for _ in range(count):
+        with limiter.slot(backend):
+            results.put((time.time(), limiter.in_flight(backend)))
+            time.sleep(hold_seconds)
+
+
+def test_token_bucket_allows_burst_then_refill_rate(tmp_path):
+    limiter = RateLimiter(tmp_path / "limits.db", {"llamaparse": BackendLimit(rate=20.0, burst=3)})
+
+    start = time.monotonic()
+    for _ in range(3):
+        assert limiter.try_acquire("llamaparse")[0] is not None
+    lease, wait = limiter.try_acquire("llamaparse")
+    assert lease is None and 0 < wait <= 0.05
+
+    for _ in range(4):
+        limiter.release(limiter.acquire("llamaparse"))
+    # 3 from the burst, then 4 more at 20/s
+    assert time.monotonic() - start >= 0.15
+
+
+def test_concurrency_limit_is_shared_across_processes(tmp_path):
+    db_path = tmp_path / "limits.db"
+    ctx = multiprocessing.get_context("spawn")
+    results = ctx.Queue()
+    workers = [
+        ctx.Process(target=_hold_slots, args=(db_path, "ollama", 3, 0.1, results))
+        for _ in range(3)
+    ]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join(timeout=60)
+
+    observed = [results.get(timeout=5)[1] for _ in range(9)]
+    assert max(observed) <= 2
+
+
+def test_expired_leases_are_reclaimed_and_waits_time_out(tmp_path):
+    limits = {"gmail": BackendLimit(max_concurrent=1)}
+    crashed = RateLimiter(tmp_path / "limits.db", limits, lease_seconds=0.2)
+    crashed.acquire("gmail")  # never released
+
+    limiter = RateLimiter(tmp_path / "limits.db", limits)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire("gmail", timeout=0.05)
+    time.sleep(0.25)
+    assert limiter.acquire("gmail", timeout=1) > 0
+
+
+def test_unknown_backends_are_not_limited(tmp_path):
+    limiter = RateLimiter(tmp_path / "limits.db", {})
+    assert limiter.try_acquire("somewhere") == (0, 0.0)
+
+
+def test_governed_records_wait_span(monkeypatch):
+    monkeypatch.setattr(
+        rate_limits, "BACKEND_LIMITS", {"hf_inference": BackendLimit(max_concurrent=1)}
+    )
+    release = threading.Event()
+
+    def hold():
+        with rate_limits.governed("hf_inference"):
+            release.wait(5)
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    time.sleep(0.1)
+    threading.Timer(0.2, release.set).start()
+
+    tracer = Tracer("test")
+    with activate(tracer), rate_limits.governed("hf_inference"):
+        pass
+    holder.join()
+
+    (wait,) = tracer.spans
+    assert wait["name"] == "wait:hf_inference"
+    assert wait["end"] - wait["start"] >= 0.05
@@ -0,0 +1,70 @@
+import queue
+import threading
+import time
+
+import pytest
+
+from src.agent import registry as agent_registry
+from src.agent.registry import AgentPoolBusy, ResourceRegistry, lease_document_agent
+
+
+def test_resource_built_once_under_concurrency():
+    registry = ResourceRegistry()
+    calls = []
+
+    def factory():
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("model", factory)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert registry.status()["model"]["state"] == "ready"
+
+
+def test_failed_resource_is_reported_and_retried():
+    registry = ResourceRegistry()
+
+    def broken():
+        raise ConnectionError("ollama not running")
+
+    with pytest.raises(ConnectionError):
+        registry.get("llm", broken)
+    assert registry.status()["llm"] == {"state": "failed", "error": "ollama not running"}
+
+    assert registry.get("llm", lambda: "ok") == "ok"
+    assert registry.status()["llm"]["state"] == "ready"
+
+
+def test_run_check_records_outcome():
+    registry = ResourceRegistry()
+
+    assert registry.run_check("ping", lambda: None) is True
+    assert registry.run_check("down", lambda: 1 / 0) is False
+    assert registry.status()["down"]["state"] == "failed"
+
+
+def test_lease_reports_busy_pool_instead_of_blocking(monkeypatch):
+    pool = queue.Queue()
+    monkeypatch.setattr(agent_registry, "_AGENT_POOL", pool)
+    monkeypatch.setattr(agent_registry, "_AGENT_POOL_CREATED", agent_registry.AGENT_POOL_SIZE)
+
+    # Every agent is leased (none back in the pool)
+    with pytest.raises(AgentPoolBusy, match="busy"):
+        with lease_document_agent(timeout=0.05):
+            pass
+
+    pool.put("agent")
+    with lease_document_agent(timeout=0.05) as agent:
+        assert agent == "agent"
+    assert pool.qsize() == 1
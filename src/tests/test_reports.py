@@ -0,0 +1,116 @@
+import random
+import sqlite3
+
+from src.db.db_client import DBClient
+from src.db.init_db import apply_schema
+from src.db.report_store import ReportStore
+
+
+def _invoice(invoice_id, supplier, date="2025-01-10", total=100.0):
+    return {
+        "invoice_id": invoice_id,
+        "supplier_name": supplier,
+        "invoice_date": date,
+        "total_amount": total,
+    }
+
+
+def _snapshot(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return {
+            table: sorted(
+                tuple(round(v, 6) if isinstance(v, float) else v for v in row)
+                for row in conn.execute(f"SELECT * FROM {table}")
+            )
+            for table in ("report_suppliers", "report_months", "report_ticket_counts")
+        }
+    finally:
+        conn.close()
+
+
+def test_reports_follow_invoice_and_ticket_writes(db_path):
+    db = DBClient(db_path)
+    db.upsert_invoice(_invoice("INV-1", "ACME", total=100.0))
+    db.upsert_invoice(_invoice("INV-2", "ACME", date="2025-02-03", total=50.0))
+    db.upsert_invoice(_invoice("INV-3", "GLOBEX", total=10.0))
+    db.create_ticket("INV-1", "Amount mismatch", "a", 90.0, 100.0)
+    db.create_ticket("INV-1", "Tax issue", "b", department="Tax", priority="Medium")
+    # Re-processing the same invoice is an update, not a new invoice
+    db.upsert_invoice(_invoice("INV-1", "ACME", total=120.0))
+
+    store = ReportStore(db_path)
+    acme = store.supplier("ACME")
+    assert acme["invoice_count"] == 2
+    assert acme["total_amount"] == 170.0
+    assert acme["ticket_count"] == 2
+    assert acme["disputed_invoices"] == 1
+    assert acme["discrepancy_rate"] == 0.5
+    assert [s["supplier_name"] for s in store.suppliers()] == ["ACME", "GLOBEX"]
+
+    assert {m["month"]: m["invoice_count"] for m in store.months()}["2025-02"] == 1
+    assert store.open_tickets_by_department() == {"Finance": 1}
+    assert store.open_tickets_by_department(priority=None) == {"Finance": 1, "Tax": 1}
+
+    # Resolving a ticket or renaming the supplier moves the counts
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE tickets SET status = 'Resolved' WHERE issue_type = 'Amount mismatch'")
+        conn.execute("UPDATE invoices SET supplier_name = 'ACME CORP' WHERE invoice_id = 'INV-1'")
+    assert store.open_tickets_by_department() == {}
+    assert store.supplier("ACME")["ticket_count"] == 0
+    assert store.supplier("ACME CORP")["disputed_invoices"] == 1
+
+
+def test_triggers_match_a_full_rebuild(db_path):
+    rng = random.Random(7)
+    db = DBClient(db_path)
+    suppliers = ["ACME", "GLOBEX", "INITECH", None]
+    for i in range(60):
+        invoice_id = f"INV-{rng.randrange(20)}"
+        db.upsert_invoice(
+            _invoice(
+                invoice_id,
+                rng.choice(suppliers),
+                date=f"2025-{rng.randrange(1, 4):02d}-01",
+                total=round(rng.uniform(1, 500), 2),
+            )
+        )
+        if rng.random() < 0.4:
+            db.create_ticket(
+                f"INV-{rng.randrange(25)}",
+                rng.choice(["Amount mismatch", "Tax issue"]),
+                "",
+                document_amount=float(i),
+                priority=rng.choice(["High", "Low"]),
+            )
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM invoices WHERE invoice_id IN ('INV-1', 'INV-2')")
+        conn.execute("DELETE FROM tickets WHERE rowid % 3 = 0")
+        conn.execute("UPDATE tickets SET invoice_id = 'INV-3' WHERE rowid % 4 = 0")
+        conn.execute("UPDATE tickets SET status = 'Closed' WHERE rowid % 5 = 0")
+
+    maintained = _snapshot(db_path)
+    ReportStore(db_path).rebuild()
+
+    assert maintained == _snapshot(db_path)
+
+
+def test_apply_schema_backfills_reports_of_an_existing_db(db_path):
+    db = DBClient(db_path)
+    db.upsert_invoice(_invoice("INV-1", "ACME"))
+    db.create_ticket("INV-1", "Amount mismatch", "a")
+    with sqlite3.connect(db_path) as conn:
+        for table in ("report_suppliers", "report_months", "report_ticket_counts"):
+            conn.execute(f"DROP TABLE {table}")
+
+    apply_schema(db_path)
+
+    assert ReportStore(db_path).supplier("ACME")["ticket_count"] == 1
+    assert ReportStore(db_path).open_tickets_by_department() == {"Finance": 1}
+
+
+def test_empty_reports(db_path):
+    store = ReportStore(db_path)
+    assert store.suppliers() == []
+    assert store.months() == []
+    assert store.open_tickets_by_department() == {}
@@ -0,0 +1,109 @@
+import sqlite3
+
+from src.agent.rereconciler import Rereconciler
+from src.db.db_client import DBClient
+from src.db.invoice_changes import InvoiceChangeQueue
+from src.db.upload_store import UploadStore
+
+
+def _invoice(total):
+    return {"invoice_id": "INV-1", "supplier_name": "ACME", "total_amount": total, "tax_amount": 5.0}
+
+
+def _processed_document(db_path, tmp_path, total_in_db, total_on_pdf):
+    """An uploaded invoice whose workflow found a mismatch and opened a ticket."""
+    db = DBClient(db_path)
+    db.upsert_invoice(_invoice(total_in_db))
+    parsed = _invoice(total_on_pdf)
+    db.create_ticket("INV-1", "Amount mismatch", "totals differ", total_in_db, total_on_pdf)
+    store = UploadStore(db_path, tmp_path / "uploads")
+    store.save_result(
+        "hash-1",
+        {
+            "doc_type": "invoice",
+            "parsed_invoice": parsed,
+            "reconciliation": {"is_match": False, "differences": ["total_amount"]},
+        },
+    )
+    return db, store
+
+
+def test_invoice_writes_queue_one_change_per_invoice(db_path):
+    db = DBClient(db_path)
+    queue = InvoiceChangeQueue(db_path)
+    db.upsert_invoice(_invoice(100.0))
+    db.upsert_invoice(_invoice(110.0))
+
+    (change,) = queue.claim(10)
+    assert change["invoice_id"] == "INV-1"
+    assert change["row_version"] == 2
+    assert queue.claim(10) == []  # leased
+
+    # Changed again while being processed: stays queued with the new version
+    db.upsert_invoice(_invoice(120.0))
+    assert queue.done("INV-1", 2) is False
+    assert queue.done("INV-1", 3) is True
+    assert queue.pending() == 0
+
+
+def test_correction_rereconciles_documents_and_resolves_ticket(db_path, tmp_path):
+    db, store = _processed_document(db_path, tmp_path, total_in_db=100.0, total_on_pdf=120.0)
+    worker = Rereconciler(db_path)
+    worker.process_once()  # the initial writes
+
+    # Finance corrects the stored total to what the supplier billed
+    db.upsert_invoice(_invoice(120.0))
+    (outcome,) = worker.process_once()
+
+    assert outcome["documents"] == 1
+    assert outcome["mismatches"] == 0
+    (ticket,) = db.list_tickets_for_invoice("INV-1")
+    assert outcome["resolved_tickets"] == [ticket["ticket_id"]]
+    assert ticket["status"] == "Resolved"
+    assert "120.00" in ticket["resolution"]
+
+    (content_hash, result), = store.results_for_invoice("INV-1")
+    assert result["reconciliation"] == {"is_match": True, "differences": []}
+    assert result["db_invoice"]["row_version"] == 2
+    # Nothing left to do for this PDF: a re-upload is answered from the refreshed result
+    assert store.get_cached_result(content_hash)["reconciliation"]["is_match"] is True
+    assert worker.process_once() == []
+
+
+def test_unrelated_correction_keeps_ticket_open(db_path, tmp_path):
+    db, store = _processed_document(db_path, tmp_path, total_in_db=100.0, total_on_pdf=120.0)
+    worker = Rereconciler(db_path)
+
+    db.upsert_invoice(_invoice(105.0))
+    (outcome,) = worker.process_once()
+
+    assert outcome["mismatches"] == 1
+    assert outcome["resolved_tickets"] == []
+    assert db.list_tickets_for_invoice("INV-1")[0]["status"] == "Open"
+    # A new discrepancy: the next upload re-runs the workflow to ticket it
+    assert store.get_cached_result("hash-1") is None
+
+
+def test_tax_tickets_are_resolved_and_other_issues_stay_open(db_path, tmp_path):
+    db, _ = _processed_document(db_path, tmp_path, total_in_db=100.0, total_on_pdf=100.0)
+    tax = db.create_ticket("INV-1", "Tax issue", "tax differs", 5.0, 7.5)
+    duplicate = db.create_ticket("INV-1", "Duplicate invoice", "billed twice", 100.0, 100.0)
+    worker = Rereconciler(db_path)
+
+    db.upsert_invoice({**_invoice(100.0), "tax_amount": 7.5})
+    (outcome,) = worker.process_once()
+
+    assert tax["ticket_id"] in outcome["resolved_tickets"]
+    assert "tax_amount (7.50)" in db.get_ticket(tax["ticket_id"])["resolution"]
+    assert db.get_ticket(duplicate["ticket_id"])["status"] == "Open"
+
+
+def test_edits_without_a_version_bump_are_not_queued(db_path):
+    DBClient(db_path).upsert_invoice(_invoice(100.0))
+    queue = InvoiceChangeQueue(db_path)
+    queue.done("INV-1", 1)
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE invoices SET customer_name = 'X' WHERE invoice_id = 'INV-1'")
+
+    assert queue.pending() == 0
@@ -0,0 +1,45 @@
+import pytest
+
+from src.agent.run_ledger import RunLedger, bind_tools_to_ledger
+from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
+from src.tools.math_tools import validate_invoice_math_tool
+
+
+def test_summary_built_from_recorded_tool_outputs():
+    ledger = RunLedger()
+    reconcile, math = bind_tools_to_ledger(
+        [reconcile_invoice_with_db_tool, validate_invoice_math_tool], lambda: ledger
+    )
+
+    parsed = {"invoice_id": "INV-1", "total_amount": 100.0, "tax_amount": 10.0}
+    reconcile(parsed_invoice=parsed, db_invoice={"total_amount": 90.0, "tax_amount": 10.0})
+    with pytest.raises(Exception):
+        math(parsed_invoice=parsed)  # missing argument, recorded as an error
+
+    summary = ledger.build_summary()
+
+    assert summary["reconciliation"]["is_match"] is False
+    assert summary["math_check"] is None
+    assert [c["tool"] for c in summary["tool_calls"]] == [
+        "reconcile_invoice_with_db_tool",
+        "validate_invoice_math_tool",
+    ]
+    assert summary["tool_calls"][1]["error"]
+
+
+def test_last_successful_call_wins_and_shared_tools_untouched():
+    ledger = RunLedger()
+    (reconcile,) = bind_tools_to_ledger([reconcile_invoice_with_db_tool], lambda: ledger)
+
+    reconcile(parsed_invoice={"total_amount": 1.0}, db_invoice=None)
+    reconcile(parsed_invoice={"total_amount": 1.0}, db_invoice={"total_amount": 1.0})
+
+    assert ledger.build_summary()["reconciliation"]["is_match"] is True
+    # The shared tool object is not instrumented
+    assert reconcile_invoice_with_db_tool.forward is not reconcile.forward
+
+
+def test_no_recording_without_active_ledger():
+    (reconcile,) = bind_tools_to_ledger([reconcile_invoice_with_db_tool], lambda: None)
+
+    assert reconcile(parsed_invoice={}, db_invoice=None)["is_match"] is None
@@ -0,0 +1,103 @@
+import json
+import sqlite3
+
+from src.db.db_client import DBClient
+from src.db.document_store import DocumentStore
+from src.db.init_db import apply_schema
+from src.db.search_index import SearchIndex, match_query
+from src.tools.chat_tools import create_record_search_tool
+
+
+def _seed(db_path):
+    db = DBClient(db_path)
+    db.upsert_invoice(
+        {"invoice_id": "INV-2025-001", "supplier_name": "Gotham Office Supplies", "total_amount": 10}
+    )
+    db.upsert_invoice(
+        {"invoice_id": "INV-2025-002", "supplier_name": "Wayne Hardware", "total_amount": 20}
+    )
+    db.create_ticket(
+        "INV-2025-002",
+        "Tax issue",
+        "NYC sales tax charged twice on the hardware invoice",
+        department="Tax",
+    )
+    DocumentStore(db_path).put("# Invoice\nGotham Office Supplies\nToner cartridges x 12", "a.pdf")
+    return db
+
+
+def test_match_query_quotes_terms():
+    assert match_query("INV-2025-001") == '"INV-2025-001"*'
+    assert match_query('say "hi"', prefix=False) == '"say" """hi"""'
+    assert match_query("  - ") is None
+
+
+def test_search_ranks_and_highlights_across_kinds(db_path):
+    _seed(db_path)
+    index = SearchIndex(db_path)
+
+    hits = index.search("gotham")
+    assert [h["kind"] for h in hits] == ["invoice", "document"]
+    assert [h["id"] for h in hits if h["kind"] == "invoice"] == ["INV-2025-001"]
+    assert [h["relevance"] for h in hits] == [1.0, 1.0]
+    assert all("**Gotham**" in h["snippet"] for h in hits)
+
+    (ticket,) = index.search("sales tax", kinds=("ticket",))
+    assert ticket["invoice_id"] == "INV-2025-002"
+    assert "**sales** **tax**" in ticket["snippet"]
+
+    # IDs need no escaping; the last term is a prefix
+    assert sorted(h["id"] for h in index.search("INV-2025-00", kinds=("invoice",))) == [
+        "INV-2025-001",
+        "INV-2025-002",
+    ]
+    assert index.search("toner", kinds=("ticket",)) == []
+    assert [h["kind"] for h in index.search("supplier_name: wayne", raw=True)] == ["invoice"]
+
+
+def test_index_follows_updates_and_deletes(db_path):
+    db = _seed(db_path)
+    index = SearchIndex(db_path)
+
+    db.upsert_invoice({"invoice_id": "INV-2025-001", "supplier_name": "Acme Paper"})
+    assert index.search("gotham", kinds=("invoice",)) == []
+    assert index.search("acme")[0]["id"] == "INV-2025-001"
+
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("DELETE FROM tickets")
+    assert index.search("tax", kinds=("ticket",)) == []
+
+
+def test_apply_schema_indexes_existing_rows(db_path):
+    _seed(db_path)
+    with sqlite3.connect(db_path) as conn:
+        for table in ("invoices_fts", "tickets_fts", "documents_fts"):
+            conn.execute(f"DROP TABLE {table}")
+
+    apply_schema(db_path)
+
+    kinds = {h["kind"] for h in SearchIndex(db_path).search("gotham OR tax", raw=True)}
+    assert kinds == {"invoice", "ticket", "document"}
+
+
+def test_record_search_tool(db_path):
+    _seed(db_path)
+    search_records = create_record_search_tool(db_path)
+
+    hits = json.loads(search_records(query="hardware"))
+    assert {h["kind"] for h in hits} == {"invoice", "ticket"}
+    assert search_records(query="nothing-like-this").startswith("No invoices")
+
+
+def test_long_documents_do_not_outrank_records(db_path):
+    db = _seed(db_path)
+    db.upsert_invoice({"invoice_id": "INV-2025-003", "supplier_name": "Acme Toner", "total_amount": 5})
+    store = DocumentStore(db_path)
+    for n in range(3):
+        store.put(f"Toner order {n}\n" + "toner cartridges and paper\n" * 40, f"toner_{n}.pdf")
+
+    hits = SearchIndex(db_path).search("toner", limit=3)
+
+    # The best invoice ranks with the best document, whatever their raw BM25
+    assert [h["kind"] for h in hits][:2] == ["invoice", "document"]
+    assert hits[2]["relevance"] <= 1.0
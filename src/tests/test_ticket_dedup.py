@@ -0,0 +1,100 @@
+import sqlite3
+import threading
+
+from src.db.db_client import DBClient, ticket_dedup_key
+from src.db.init_db import apply_schema
+
+
+def _ticket_count(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+
+
+def test_retry_returns_existing_ticket_without_writing(db_path):
+    db = DBClient(db_path)
+    first, created = db.get_or_create_ticket("INV-1", "Amount mismatch", "diff", 4300.0, 4376.78)
+    again, created_again = db.get_or_create_ticket(
+        "INV-1", "amount_mismatch", "reworded by the model", 4300, 4376.780001
+    )
+
+    assert created is True and created_again is False
+    assert again["ticket_id"] == first["ticket_id"]
+    assert again["description"] == "diff"
+    assert _ticket_count(db_path) == 1
+
+
+def test_other_amounts_or_issues_get_their_own_ticket(db_path):
+    db = DBClient(db_path)
+    ids = {
+        db.create_ticket("INV-1", "Amount mismatch", "d", 4300.0, 4376.78)["ticket_id"],
+        db.create_ticket("INV-1", "Amount mismatch", "d", 4300.0, 4400.00)["ticket_id"],
+        db.create_ticket("INV-1", "Tax issue", "d", 4300.0, 4376.78)["ticket_id"],
+        db.create_ticket("INV-2", "Amount mismatch", "d", 4300.0, 4376.78)["ticket_id"],
+    }
+
+    assert len(ids) == 4
+    assert ticket_dedup_key("INV-1", "Tax issue") != ticket_dedup_key("INV-1", "Tax issue", 0.0)
+
+
+def test_concurrent_identical_creates_store_one_ticket(db_path):
+    db = DBClient(db_path)
+    ticket_ids = []
+    lock = threading.Lock()
+
+    def worker():
+        ticket = db.create_ticket("INV-1", "Amount mismatch", "diff", 10.0, 12.0)
+        with lock:
+            ticket_ids.append(ticket["ticket_id"])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(set(ticket_ids)) == 1
+    assert _ticket_count(db_path) == 1
+
+
+def test_schema_upgrade_adds_dedup_key_to_old_tickets_table(tmp_path):
+    db_path = tmp_path / "old.db"
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(
+            "CREATE TABLE tickets (ticket_id TEXT PRIMARY KEY, invoice_id TEXT, "
+            "created_date TEXT, created_by TEXT, department TEXT, status TEXT, "
+            "priority TEXT, issue_type TEXT, recorded_amount REAL, "
+            "document_amount REAL, description TEXT)"
+        )
+        # Pre-existing duplicates keep a NULL key and do not block the index
+        conn.executemany(
+            "INSERT INTO tickets (ticket_id, invoice_id) VALUES (?, 'INV-1')",
+            [("TCK-2025-0001",), ("TCK-2025-0002",)],
+        )
+
+    apply_schema(db_path)
+    db = DBClient(db_path)
+    first = db.create_ticket("INV-1", "Amount mismatch", "diff", 1.0, 2.0)
+
+    assert db.create_ticket("INV-1", "Amount mismatch", "diff", 1.0, 2.0) == first
+    assert _ticket_count(db_path) == 3
+
+
+def test_id_spellings_share_a_ticket(db_path):
+    db = DBClient(db_path)
+    first, created = db.get_or_create_ticket("INV_2025_001", "Amount mismatch", "d", 90, 100)
+    again, created_again = db.get_or_create_ticket("INV-2025-001", "amount_mismatch", "d", 90, 100)
+
+    assert created is True and created_again is False
+    assert again["ticket_id"] == first["ticket_id"]
+
+
+def test_recurring_discrepancy_after_resolution_opens_a_new_ticket(db_path):
+    db = DBClient(db_path)
+    first, _ = db.get_or_create_ticket("INV-1", "Amount mismatch", "d", 90, 100)
+    assert db.resolve_ticket(first["ticket_id"], "fixed")
+
+    second, created = db.get_or_create_ticket("INV-1", "Amount mismatch", "d", 90, 100)
+
+    assert created is True
+    assert second["ticket_id"] != first["ticket_id"]
+    assert db.get_or_create_ticket("INV-1", "Amount mismatch", "d", 90, 100) == (second, False)
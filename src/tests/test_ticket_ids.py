@@ -0,0 +1,68 @@
+import sqlite3
+import threading
+
+from src.db.db_client import DBClient
+from src.db.ticket_ids import TicketIdAllocator
+
+
+def _counter(db_path, year):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(
+            "SELECT next_value FROM ticket_id_counters WHERE year = ?", (year,)
+        ).fetchone()[0]
+
+
+def test_ids_are_sequential_and_reserved_in_blocks(db_path):
+    allocator = TicketIdAllocator(db_path, block_size=10)
+
+    ids = [allocator.next_id(2025) for _ in range(12)]
+
+    assert ids[:3] == ["TCK-2025-0001", "TCK-2025-0002", "TCK-2025-0003"]
+    assert len(set(ids)) == 12
+    # Two blocks reserved for twelve IDs
+    assert _counter(db_path, 2025) == 21
+    assert allocator.next_id(2026) == "TCK-2026-0001"
+
+
+def test_allocators_of_different_processes_never_overlap(db_path):
+    first = TicketIdAllocator(db_path, block_size=5)
+    second = TicketIdAllocator(db_path, block_size=5)
+
+    ids = [a.next_id(2025) for _ in range(7) for a in (first, second)]
+
+    assert len(set(ids)) == len(ids)
+
+
+def test_sequence_starts_after_existing_numeric_ids(db_path):
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO tickets (ticket_id, invoice_id) VALUES (?, 'INV-1')",
+            [("TCK-2025-001",), ("TCK-2025-0042",), ("TCK-2025-AB12",)],
+        )
+
+    assert TicketIdAllocator(db_path).next_id(2025) == "TCK-2025-0043"
+
+
+def test_concurrent_create_ticket_has_no_collisions(db_path):
+    db = DBClient(db_path)
+    created = []
+    lock = threading.Lock()
+
+    def worker(n):
+        for i in range(50):
+            # Distinct amounts, identical ones would be deduplicated
+            ticket = db.create_ticket(
+                "INV-1", "Amount mismatch", "diff", document_amount=n * 100 + i
+            )
+            with lock:
+                created.append(ticket["ticket_id"])
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(created) == len(set(created)) == 200
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM tickets").fetchone()[0] == 200
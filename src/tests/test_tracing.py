@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.db.trace_store import TraceStore
+from src.observability import tracing
+from src.tools.reconciliation_tools import reconcile_invoice_with_db_tool
+
+
+class _FakeModel:
+    model_id = "fake-model"
+
+    def generate(self, messages, **kwargs):
+        return SimpleNamespace(
+            content="final_answer('done')",
+            token_usage=SimpleNamespace(input_tokens=120, output_tokens=8),
+        )
+
+
+def test_traced_run_persists_nested_spans(db_path):
+    with tracing.traced_run("document_workflow", db_path, file="a.pdf") as tracer:
+        with tracing.span("llamaparse", backend="llamaparse") as s:
+            s["output_bytes"] = 42
+            with tracing.span("inner"):
+                pass
+        with pytest.raises(ValueError):
+            with tracing.span("ollama.chat", tracing.LLM, backend="ollama"):
+                raise ValueError("boom")
+
+    spans = TraceStore(db_path).get_run(tracer.run_id)
+    by_name = {s["name"]: s for s in spans}
+
+    assert by_name["document_workflow"]["kind"] == "run"
+    assert by_name["document_workflow"]["attrs"] == {"file": "a.pdf"}
+    assert by_name["llamaparse"]["parent_id"] == 0
+    assert by_name["llamaparse"]["output_bytes"] == 42
+    assert by_name["inner"]["parent_id"] == by_name["llamaparse"]["span_id"]
+    assert by_name["ollama.chat"]["status"] == "error"
+    assert by_name["ollama.chat"]["error"] == "boom"
+    assert all(s["duration_ms"] is not None for s in spans)
+
+
+def test_spans_outside_a_run_are_ignored():
+    with tracing.span("llamaparse") as s:
+        s["output_bytes"] = 1
+
+    assert tracing.current_tracer() is None
+
+
+def test_tools_and_model_calls_recorded_with_sizes_and_tokens(db_path):
+    holder = {"tracer": None}
+    (reconcile,) = tracing.trace_tools([reconcile_invoice_with_db_tool], lambda: holder["tracer"])
+    model = tracing.TracedModel(_FakeModel(), lambda: holder["tracer"])
+
+    with tracing.traced_run("chat", db_path) as tracer:
+        holder["tracer"] = tracer
+        model.generate([SimpleNamespace(content="What is the total?")])
+        reconcile(parsed_invoice={"total_amount": 1.0}, db_invoice=None)
+        holder["tracer"] = None
+
+    # Shared objects are untouched and calls outside the run are not traced
+    assert reconcile_invoice_with_db_tool.forward is not reconcile.forward
+    assert model.model_id == "fake-model"
+
+    runs = TraceStore(db_path).list_runs()
+    assert runs[0]["run_id"] == tracer.run_id
+    assert runs[0]["total_prompt_tokens"] == 120
+    assert runs[0]["total_completion_tokens"] == 8
+
+    tool_span = next(s for s in TraceStore(db_path).get_run(tracer.run_id) if s["kind"] == "tool")
+    assert tool_span["name"] == "reconcile_invoice_with_db_tool"
+    assert tool_span["input_bytes"] > 0
+    assert tool_span["output_bytes"] > 0
+
+
+def test_old_runs_are_pruned(db_path):
+    store = TraceStore(db_path, keep_runs=2)
+    for i in range(4):
+        tracer = tracing.Tracer("run")
+        with tracer.span("run", tracing.RUN):
+            pass
+        tracer.spans[0]["start"] = float(i)
+        store.save_run(tracer.run_id, tracer.spans)
+
+    assert [r["start_ts"] for r in store.list_runs()] == [3.0, 2.0]
@@ -0,0 +1,85 @@
+from src.db.db_client import DBClient
+from src.db.upload_store import UploadStore
+
+
+INVOICE = {
+    "invoice_id": "INV-2025-001",
+    "supplier_name": "GOTHAM OFFICE SUPPLIES INC.",
+    "total_amount": 4376.78,
+    "tax_amount": 356.78,
+}
+
+
+def test_identical_uploads_share_one_file(db_path, tmp_path):
+    store = UploadStore(db_path, tmp_path / "uploads")
+
+    first = store.save(b"%PDF-1.4 same bytes", "a.pdf")
+    second = store.save(b"%PDF-1.4 same bytes", "renamed copy.pdf")
+    other = store.save(b"%PDF-1.4 other bytes", "a.pdf")
+
+    assert first["content_hash"] == second["content_hash"]
+    assert second["upload_count"] == 2
+    assert other["stored_path"] != first["stored_path"]
+    assert len(list((tmp_path / "uploads").iterdir())) == 2
+
+
+def test_cached_result_invalidated_when_invoice_changes(db_path, tmp_path):
+    store = UploadStore(db_path, tmp_path / "uploads")
+    db = DBClient(db_path)
+    db.upsert_invoice(INVOICE)
+
+    upload = store.save(b"%PDF-1.4 invoice", "INV_2025_001.pdf")
+    result = {"doc_type": "invoice", "parsed_invoice": INVOICE}
+    store.save_result(upload["content_hash"], result)
+
+    assert store.get_cached_result(upload["content_hash"]) == result
+
+    db.upsert_invoice({**INVOICE, "total_amount": 4300.0})
+    assert store.get_cached_result(upload["content_hash"]) is None
+
+
+def test_cached_result_for_unknown_invoice(db_path, tmp_path):
+    store = UploadStore(db_path, tmp_path / "uploads")
+    upload = store.save(b"%PDF-1.4 new invoice", "new.pdf")
+    store.save_result(
+        upload["content_hash"],
+        {"doc_type": "invoice", "parsed_invoice": {"invoice_id": "INV-NEW"}},
+    )
+
+    assert store.get_cached_result(upload["content_hash"]) is not None
+
+    # The invoice appearing in the DB afterwards invalidates the cache
+    DBClient(db_path).upsert_invoice({"invoice_id": "INV-NEW"})
+    assert store.get_cached_result(upload["content_hash"]) is None
+
+
+def test_cached_result_is_per_instruction(db_path, tmp_path):
+    store = UploadStore(db_path, tmp_path / "uploads")
+    DBClient(db_path).upsert_invoice(INVOICE)
+    upload = store.save(b"%PDF-1.4 invoice", "INV_2025_001.pdf")
+    store.save_result(upload["content_hash"], {"parsed_invoice": INVOICE}, "")
+
+    assert store.get_cached_result(upload["content_hash"], "  ") is not None
+    assert store.get_cached_result(upload["content_hash"], "Don't email the supplier") is None
+
+    store.save_result(upload["content_hash"], {"parsed_invoice": INVOICE}, "Set priority High")
+    assert store.get_cached_result(upload["content_hash"], "set priority High") is None
+    assert store.get_cached_result(upload["content_hash"], "Set  priority High ") is not None
+    assert store.get_cached_result(upload["content_hash"]) is None
+
+
+def test_rechecked_result_is_tagged_with_the_version_it_was_checked_against(db_path, tmp_path):
+    store = UploadStore(db_path, tmp_path / "uploads")
+    db = DBClient(db_path)
+    db.upsert_invoice(INVOICE)
+    upload = store.save(b"%PDF-1.4 invoice", "INV_2025_001.pdf")
+    store.save_result(upload["content_hash"], {"parsed_invoice": INVOICE})
+
+    # Checked against version 2, but the invoice was written again meanwhile
+    db.upsert_invoice({**INVOICE, "total_amount": 4300.0})
+    db.upsert_invoice({**INVOICE, "total_amount": 4200.0})
+    store.update_result(upload["content_hash"], {"parsed_invoice": INVOICE}, checked_version=2)
+    assert store.get_cached_result(upload["content_hash"]) is None
+
+    store.update_result(upload["content_hash"], {"parsed_invoice": INVOICE}, checked_version=3)
+    assert store.get_cached_result(upload["content_hash"]) is not None
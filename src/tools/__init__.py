@@ -1,7 +1,21 @@
-from .parsing_tools import parse_document_tool
-from .math_tools import validate_invoice_math_tool
-from .reconciliation_tools import reconcile_invoice_with_db_tool
-from .email_tools import draft_email_tool, send_email_tool
+from importlib import import_module
+
+# Tools are resolved on first access: each tool module imports smolagents
+# (and some llama_index / Gmail), which should only load when an agent is built.
+_LAZY_EXPORTS = {
+    "parse_document_tool": ".parsing_tools",
+    "validate_invoice_math_tool": ".math_tools",
+    "reconcile_invoice_with_db_tool": ".reconciliation_tools",
+    "draft_email_tool": ".email_tools",
+    "send_email_tool": ".email_tools",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
     "parse_document_tool",
@@ -10,5 +24,3 @@ __all__ = [
     "draft_email_tool",
     "send_email_tool",
 ]
-
-
@@ -1,12 +1,20 @@
 import json
+from pathlib import Path
 from typing import Any, Dict, Optional
 
 from smolagents import tool
 from llama_index.core import Document, VectorStoreIndex
-from llama_index.embeddings.ollama import OllamaEmbedding
+
+from src.agent.rate_limits import governed
+from src.agent.registry import EMBED_MODEL, get_embed_model
+from src.db.db_client import DBClient
+from src.db.search_index import SearchIndex
+from src.tools.db_tools import DB_PATH
 
 
 RAG_TOP_K: int = 4
+RECORD_SEARCH_LIMIT: int = 8
+RECORD_LOOKUP_LIMIT: int = 5
 
 
 def create_structured_fields_tool(
@@ -46,7 +54,7 @@ def create_structured_fields_tool(
 
 def create_rag_search_tool(
     raw_text: str,
-    embed_model_name: str = "all-minilm",
+    embed_model_name: str = EMBED_MODEL,
     top_k: int = RAG_TOP_K,
 ) -> tuple[tool, Optional[VectorStoreIndex]]:
     """
@@ -54,7 +62,7 @@ def create_rag_search_tool(
 
     Args:
         raw_text: The document text to index
-        embed_model_name: Name of the embedding model (default: all-minilm)
+        embed_model_name: Name of the embedding model (default: `embedding.model` in config.yaml)
         top_k: Number of top results to return (default: 4)
 
     Returns:
@@ -63,12 +71,13 @@ def create_rag_search_tool(
     # Build index if we have text
     index: Optional[VectorStoreIndex] = None
     if raw_text and raw_text.strip():
-        embed_model = OllamaEmbedding(model_name=embed_model_name)
+        embed_model = get_embed_model(embed_model_name)
         docs = [Document(text=raw_text)]
-        index = VectorStoreIndex.from_documents(
-            docs,
-            embed_model=embed_model,
-        )
+        with governed("ollama"):
+            index = VectorStoreIndex.from_documents(
+                docs,
+                embed_model=embed_model,
+            )
 
     @tool
     def search_document(query: str) -> str:
@@ -83,7 +92,8 @@ def create_rag_search_tool(
             return "Document text is not available for search."
 
         retriever = index.as_retriever(similarity_top_k=top_k)
-        nodes = retriever.retrieve(query)
+        with governed("ollama"):
+            nodes = retriever.retrieve(query)
 
         if not nodes:
             return f"No relevant sections found for: {query}"
@@ -95,3 +105,77 @@ def create_rag_search_tool(
         return f"Found relevant sections:\n\n{context}"
 
     return search_document, index
+
+
+def create_record_search_tool(
+    db_path: Path = DB_PATH,
+    limit: int = RECORD_SEARCH_LIMIT,
+) -> tool:
+    """
+    Create a tool for keyword search across all stored invoices, tickets
+    and parsed documents (SQLite FTS5), not just the loaded document.
+
+    Args:
+        db_path: Path of the finance database
+        limit: Number of hits to return (default: 8)
+
+    Returns:
+        A smolagents tool function
+    """
+    index = SearchIndex(db_path)
+
+    @tool
+    def search_records(query: str) -> str:
+        """
+        Keyword search over every invoice, ticket and parsed document in the
+        database (supplier / customer names, invoice and ticket IDs, ticket
+        descriptions, document text). Matched words are in **bold**.
+
+        Args:
+            query: Keywords, e.g. a supplier name, an invoice ID or "tax mismatch"
+        """
+        hits = index.search(query, limit=limit)
+        if not hits:
+            return f"No invoices, tickets or documents match: {query}"
+        return json.dumps(hits, indent=2, default=str, ensure_ascii=False)
+
+    return search_records
+
+
+def create_record_lookup_tool(
+    db_path: Path = DB_PATH,
+    limit: int = RECORD_LOOKUP_LIMIT,
+) -> tool:
+    """
+    Create a tool that finds stored invoices / suppliers by an ID or name
+    written differently (fuzzy_index.py), where keyword search finds nothing.
+
+    Args:
+        db_path: Path of the finance database
+        limit: Number of candidates per kind (default: 5)
+
+    Returns:
+        A smolagents tool function
+    """
+    db = DBClient(db_path)
+
+    @tool
+    def lookup_similar_records(text: str) -> str:
+        """
+        Find stored invoices whose ID, and suppliers whose name, look like the
+        text even when written differently (INV_2025_001 vs INV-2025-001, O
+        instead of 0, one typo, "Acme Inc." vs "ACME"). Each candidate has a
+        score from 0 to 1 (1.0 = same ID / name once normalized).
+
+        Args:
+            text: An invoice ID or supplier name as written on the document
+        """
+        found = {
+            "invoices": db.lookup_invoices(text, limit=limit),
+            "suppliers": db.lookup_suppliers(text, limit=limit),
+        }
+        if not found["invoices"] and not found["suppliers"]:
+            return f"No stored invoice or supplier looks like: {text}"
+        return json.dumps(found, indent=2, default=str, ensure_ascii=False)
+
+    return lookup_similar_records
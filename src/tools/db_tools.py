@@ -5,13 +5,16 @@ from smolagents import tool
 from src.db.db_client import DBClient
 
 
-DB_PATH = Path("data/finance.db") 
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+DB_PATH = PROJECT_ROOT / "data" / "finance.db"
 
 
 @tool
 def get_invoice_from_db_tool(invoice_id: str) -> Optional[Dict[str, Any]]:
     """
-    Fetch a single invoice by its ID from the database.
+    Fetch a single invoice by its ID from the database. IDs written
+    differently (INV_2025_001 vs INV-2025-001, spaces, O instead of 0)
+    match the same record.
 
     Args:
         invoice_id: The unique identifier of the invoice to fetch.
@@ -20,7 +23,7 @@ def get_invoice_from_db_tool(invoice_id: str) -> Optional[Dict[str, Any]]:
         The invoice record as a dictionary, or `None` if not found.
     """
     db = DBClient(DB_PATH)
-    return db.get_invoice(invoice_id)
+    return db.find_invoice(invoice_id)
 
 
 @tool
@@ -35,8 +38,8 @@ def upsert_invoice_in_db_tool(invoice: Dict[str, Any]) -> str:
         A short status message indicating the invoice was upserted.
     """
     db = DBClient(DB_PATH)
-    db.upsert_invoice(invoice)
-    return f"Invoice {invoice.get('invoice_id')} upserted successfully."
+    invoice_id = db.upsert_invoice(invoice)
+    return f"Invoice {invoice_id} upserted successfully."
 
 
 @tool
@@ -49,6 +52,8 @@ def create_ticket_in_db_tool(
 ) -> Dict[str, Any]:
     """
     Create a new ticket in the database for a given invoice issue.
+    Idempotent: if the same issue (invoice, issue type and amounts) already
+    has a ticket, that ticket is returned with `already_existed` set to True.
 
     Args:
         invoice_id: The ID of the invoice related to the ticket.
@@ -58,16 +63,16 @@ def create_ticket_in_db_tool(
         document_amount: The amount found in the document, if applicable.
 
     Returns:
-        The created ticket record as a dictionary.
+        The ticket record as a dictionary, plus `already_existed`.
     """
     db = DBClient(DB_PATH)
-    ticket = db.create_ticket(
+    ticket, created = db.get_or_create_ticket(
         invoice_id=invoice_id,
         issue_type=issue_type,
         description=description,
         recorded_amount=recorded_amount,
         document_amount=document_amount,
     )
-    return ticket
+    return {**ticket, "already_existed": not created}
 
 
@@ -1,16 +1,20 @@
+import hashlib
 import json
-from typing import Any, Dict, Optional
+from typing import Any, Dict
 from smolagents import tool
 from llama_index.core.llms import ChatMessage
-from llama_index.tools.google import GmailToolSpec
 from src.agent.llm_client import get_llm
+from src.agent.rate_limits import governed
+from src.agent.registry import LLM_MODEL
+from src.db.llm_cache import LLMCache
+from src.db.outbox import Outbox
+from src.mail.templates import render_template_email
+from src.observability import metrics, tracing
+from src.tools.db_tools import DB_PATH
 
 # Type alias for clarity
 ContextDict = Dict[str, Any]
 
-# Singleton GmailToolSpec instance
-_GMAIL_SPEC: Optional[GmailToolSpec] = None
-
 # Prompts
 EMAIL_SYSTEM_PROMPT = (
     "You are an assistant that drafts professional but concise emails "
@@ -35,18 +39,11 @@ EMAIL_USER_PROMPT_TEMPLATE = (
     "depending on what is appropriate from the context.\n"
 )
 
+# Editing a prompt invalidates the drafts cached with the previous one
+EMAIL_PROMPT_VERSION = hashlib.sha256(
+    (EMAIL_SYSTEM_PROMPT + EMAIL_USER_PROMPT_TEMPLATE).encode("utf-8")
+).hexdigest()[:12]
 
-def _get_gmail_spec() -> GmailToolSpec:
-    """
-    Return a singleton GmailToolSpec instance (handles OAuth and Gmail API).
-
-    GmailToolSpec expects `credentials.json` (client secrets) and will create
-    `token.json` on first use after the OAuth flow.
-    """
-    global _GMAIL_SPEC
-    if _GMAIL_SPEC is None:
-        _GMAIL_SPEC = GmailToolSpec()
-    return _GMAIL_SPEC
 
 @tool
 def draft_email_tool(
@@ -68,6 +65,23 @@ def draft_email_tool(
         A plain-text email body that can be sent as-is to the recipient.
         The text is intended to be clear, concise, and business-appropriate.
     """
+    # Full document text never belongs in the prompt, the handle is enough
+    context = {k: v for k, v in context.items() if k != "raw_text"}
+
+    # Standard issues (math error, amount / tax mismatch, new invoice) are
+    # rendered from a template, no LLM call needed
+    body = render_template_email(context)
+    metrics.cache_lookup("email_template", body is not None)
+    if body is not None:
+        return body
+
+    # Anything else goes to the LLM, cached by context hash
+    cache = LLMCache(DB_PATH)
+    cache_key = LLMCache.key_for(LLM_MODEL, EMAIL_PROMPT_VERSION, recipient, context)
+    cached = cache.get("email_draft", cache_key)
+    if cached is not None:
+        return cached
+
     llm = get_llm()
 
     system_msg = ChatMessage(
@@ -83,8 +97,15 @@ def draft_email_tool(
         ),
     )
 
-    response = llm.chat([system_msg, user_msg])
-    return str(response.message.content)
+    with governed("ollama"), tracing.span(
+        "email_draft", tracing.LLM, backend="ollama"
+    ) as s:
+        s["input_bytes"] = tracing.payload_size(user_msg.content)
+        response = llm.chat([system_msg, user_msg])
+        tracing.record_llm_usage(s, response)
+    body = str(response.message.content)
+    cache.put("email_draft", cache_key, body)
+    return body
 
 @tool
 def send_email_tool(
@@ -95,6 +116,9 @@ def send_email_tool(
     """
     Send an email via Gmail using the configured OAuth credentials.
 
+    The message is written to the outbox and delivered by the background
+    sender (batched, with retries), so this returns immediately.
+
     Args:
         recipient: Email address to send the message to.
         subject: Subject line for the email.
@@ -102,25 +126,8 @@ def send_email_tool(
 
     Returns:
         A short status message describing the result of the send
-        operation, usually including a draft or message identifier
-        returned by the Gmail API.
+        operation, including the outbox identifier of the queued message.
     """
-    gmail_spec = _get_gmail_spec()
-
-    # Create a draft email
-    draft = gmail_spec.create_draft(
-        to=[recipient],
-        subject=subject,
-        message=body,
-    )
-
-    draft_id = draft.get("id")
-    if not draft_id:
-        raise RuntimeError("Gmail draft did not return an 'id' field.")
-
-    # Send the draft
-    gmail_spec.send_draft(draft_id=draft_id)
-
-    return f"Email sent to {recipient} via Gmail draft {draft_id}"
-
-
+    outbox_id = Outbox(DB_PATH).enqueue(recipient, subject, body)
+    metrics.EMAILS.inc(status="queued")
+    return f"Email to {recipient} queued for sending (outbox id {outbox_id})"
@@ -1,6 +1,9 @@
 from typing import Any, Dict, List, Optional
 from smolagents import tool
 
+from src.db.document_store import DocumentStore
+from src.tools.db_tools import DB_PATH
+
 
 JSONDict = Dict[str, Any]
 
@@ -20,7 +23,7 @@ def _parse_number(s: str | None) -> Optional[float]:
 @tool
 def validate_invoice_math_tool(
     parsed_invoice: JSONDict,
-    raw_text: str,
+    document: str,
 ) -> JSONDict:
     """
     Check whether the arithmetic inside an invoice is consistent.
@@ -28,8 +31,9 @@ def validate_invoice_math_tool(
     Args:
         parsed_invoice: Parsed invoice as a JSON-serializable dict. Should contain
             numeric fields like 'tax_amount' and 'total_amount' when available.
-        raw_text: Full markdown/text representation of the invoice, including the
-            line-items table.
+        document: Handle of the invoice text returned by parse_document_tool
+            ('doc://<hash>'). The markdown, including the line-items table, is
+            looked up from it.
 
     Returns:
         A dictionary with:
@@ -39,6 +43,8 @@ def validate_invoice_math_tool(
             subtotal: Subtotal inferred from the document (from the table or text),
                 or None if it could not be determined.
     """
+    raw_text = DocumentStore(DB_PATH).resolve(document)
+
     issues: List[str] = []
     line_items_ok = True
 
@@ -3,10 +3,12 @@ from typing import Any, Dict, Optional
 from smolagents import tool
 
 
+from src.db.document_store import DocumentStore, file_content_hash
 from src.parsing.base_parser import parse_pdf_to_markdown
-from src.parsing.document_classifier import classify_document_from_text
+from src.parsing.document_classifier import classify_document_from_text, classify_pdf_first_page
 from src.parsing.invoice_parser import parse_invoice_text, ParsedInvoice
 from src.parsing.ticket_parser import parse_ticket_text, ParsedTicket
+from src.tools.db_tools import DB_PATH
 
 @tool
 def parse_document_tool(file_path: str) -> Dict[str, Any]:
@@ -21,8 +23,12 @@ def parse_document_tool(file_path: str) -> Dict[str, Any]:
         A dictionary with:
             doc_type: String label for the detected document type
                 ("invoice", "ticket", or "unknown").
-            raw_text: Full markdown/text content of the document as
-                returned by the PDF parser.
+            document: Handle of the full markdown/text content
+                ('doc://<hash>'). Pass it to tools that need the text
+                (e.g. validate_invoice_math_tool); never copy the text itself.
+                None when the first page already shows the PDF is neither
+                an invoice nor a ticket (it is then not parsed at all).
+            char_count: Length of the document text, for reference.
             parsed_invoice: Parsed invoice fields as a dictionary, or
                 None if the document is not an invoice.
             parsed_ticket: Parsed ticket fields as a dictionary, or
@@ -32,8 +38,27 @@ def parse_document_tool(file_path: str) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"File not found: {path}")
 
-    # Parse with LlamaParse
-    full_text = parse_pdf_to_markdown(path)
+    # Route on the first page (local, free) before paying for a full parse
+    pre_type = classify_pdf_first_page(path)
+    if pre_type == "unknown":
+        return {
+            "doc_type": "unknown",
+            "document": None,
+            "char_count": 0,
+            "parsed_invoice": None,
+            "parsed_ticket": None,
+        }
+
+    # Parse with LlamaParse, keep the text out of the agent's context. A PDF
+    # parsed before (e.g. by a run that failed during extraction) is reused.
+    documents = DocumentStore(DB_PATH)
+    source_hash = file_content_hash(path)
+    document = documents.find_by_source(source_hash)
+    if document is not None:
+        full_text = documents.get(document)
+    else:
+        full_text = parse_pdf_to_markdown(path, doc_type=pre_type)
+        document = documents.put(full_text, source_path=str(path), source_hash=source_hash)
 
     # Classify
     classified = classify_document_from_text(full_text)
@@ -44,13 +69,14 @@ def parse_document_tool(file_path: str) -> Dict[str, Any]:
 
     # Parse according to doc_type
     if doc_type == "invoice":
-        parsed_invoice = parse_invoice_text(full_text)
+        parsed_invoice = parse_invoice_text(full_text, document=document)
     elif doc_type == "ticket":
-        parsed_ticket = parse_ticket_text(full_text)
+        parsed_ticket = parse_ticket_text(full_text, document=document)
 
     return {
         "doc_type": doc_type,
-        "raw_text": full_text,
+        "document": document,
+        "char_count": len(full_text),
         "parsed_invoice": parsed_invoice.model_dump() if parsed_invoice else None,
         "parsed_ticket": parsed_ticket.model_dump() if parsed_ticket else None,
     }
@@ -1,7 +1,5 @@
 import streamlit as st
 
-from src.agent.chat_agent import DocumentChatAgent
-
 
 def render_chat_tab() -> None:
     st.subheader("Ask questions about invoices / tickets")
@@ -29,6 +27,9 @@ def render_chat_tab() -> None:
     ):
         # Create new chat agent for this document
         # The agent maintains conversation history internally
+        # (imported here so smolagents / llama_index load on first chat only)
+        from src.agent.chat_agent import DocumentChatAgent
+
         st.session_state["chat_agent"] = DocumentChatAgent(
             raw_text=doc_ctx["raw_text"],
             parsed_invoice=doc_ctx.get("parsed_invoice"),
@@ -0,0 +1,59 @@
+from typing import Optional
+
+import streamlit as st
+
+from src.observability.metrics import (
+    CACHE_REQUESTS,
+    DB_QUERY_SECONDS,
+    DOCUMENT_SECONDS,
+    DOCUMENTS,
+    EMAILS,
+    LLM_TOKENS,
+    METRICS,
+    PDF_PARSE_SECONDS,
+    STAGE_SECONDS,
+)
+
+
+def _table(title: str, rows: list) -> None:
+    st.markdown(f"#### {title}")
+    if not rows:
+        st.caption("Nothing recorded yet.")
+        return
+    st.dataframe(rows, hide_index=True, use_container_width=True)
+
+
+def _cache_rows() -> list:
+    totals: dict = {}
+    for row in CACHE_REQUESTS.samples():
+        entry = totals.setdefault(row["cache"], {"cache": row["cache"], "hit": 0, "miss": 0})
+        entry[row["result"]] += int(row["value"])
+    for entry in totals.values():
+        lookups = entry["hit"] + entry["miss"]
+        entry["hit_rate"] = f"{entry['hit'] / lookups:.0%}" if lookups else "-"
+    return list(totals.values())
+
+
+def render_metrics_tab(endpoint_url: Optional[str]) -> None:
+    """Admin view of the process metrics (same numbers as the Prometheus endpoint)."""
+    st.subheader("Metrics (this process)")
+
+    if endpoint_url:
+        st.caption(f"Prometheus endpoint: {endpoint_url}")
+    else:
+        st.caption("Prometheus endpoint not running (disabled in config.yaml or port taken).")
+
+    if st.button("Refresh"):
+        st.rerun()
+
+    _table("Documents", DOCUMENTS.samples())
+    _table("Document latency", DOCUMENT_SECONDS.samples())
+    _table("Stage latency", STAGE_SECONDS.samples())
+    _table("LLM tokens", LLM_TOKENS.samples())
+    _table("PDF parsing", PDF_PARSE_SECONDS.samples())
+    _table("Cache hit rates", _cache_rows())
+    _table("DB queries", DB_QUERY_SECONDS.samples())
+    _table("Emails", EMAILS.samples())
+
+    with st.expander("Prometheus text"):
+        st.code(METRICS.render_prometheus(), language="text")
@@ -0,0 +1,33 @@
+import streamlit as st
+
+from src.agent.registry import REGISTRY
+
+
+_STATE_ICONS = {
+    "ready": "🟢",
+    "loading": "🟡",
+    "failed": "🔴",
+}
+
+
+def render_readiness() -> None:
+    """Sidebar panel showing which shared models / agents are warmed up."""
+    status = REGISTRY.status()
+
+    with st.sidebar:
+        st.markdown("### Model readiness")
+        if not status:
+            st.caption("Warm-up not started yet.")
+            return
+
+        for name, info in sorted(status.items()):
+            icon = _STATE_ICONS.get(info["state"], "⚪")
+            line = f"{icon} `{name}` — {info['state']}"
+            if "seconds" in info:
+                line += f" ({info['seconds']:.1f}s)"
+            st.markdown(line)
+            if info.get("error"):
+                st.caption(info["error"])
+
+        if st.button("Refresh status", key="refresh_readiness"):
+            st.rerun()
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import streamlit as st
+
+from src.db.db_client import DBClient
+from src.db.report_store import ReportStore
+
+
+def render_reports_tab(db_path: Path) -> None:
+    """Supplier, monthly and ticket analytics from the trigger-maintained report tables."""
+    st.subheader("Reports")
+
+    store = ReportStore(db_path)
+
+    st.markdown("#### Open tickets by department")
+    priority = st.selectbox("Priority", ["High", "Medium", "Low", "All"], index=0)
+    open_counts = store.open_tickets_by_department(None if priority == "All" else priority)
+    if open_counts:
+        st.bar_chart(open_counts)
+    else:
+        st.caption("No open tickets.")
+
+    st.markdown("#### Discrepancy rate per supplier")
+    suppliers = store.suppliers()
+    if suppliers:
+        st.dataframe(
+            [{**row, "supplier_name": row["supplier_name"] or "(unknown)"} for row in suppliers],
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "discrepancy_rate": st.column_config.ProgressColumn(
+                    "discrepancy_rate", min_value=0.0, max_value=1.0, format="%.2f"
+                ),
+            },
+        )
+    else:
+        st.caption("No invoices yet.")
+
+    supplier_query = st.text_input(
+        "Find a supplier", placeholder="Name as written on a document, e.g. gotham ofice supply"
+    )
+    if supplier_query.strip():
+        matches = DBClient(db_path).lookup_suppliers(supplier_query)
+        rows = [
+            {**(store.supplier(m["supplier_name"]) or {}), "match_score": m["score"]}
+            for m in matches
+        ]
+        if rows:
+            st.dataframe(rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("No stored supplier looks like that.")
+
+    st.markdown("#### Per month")
+    months = store.months()
+    if months:
+        st.dataframe(
+            [{**row, "month": row["month"] or "(undated)"} for row in months],
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        st.caption("Nothing recorded yet.")
+
+    with st.expander("Tickets by status / priority / department"):
+        st.dataframe(store.ticket_counts(), hide_index=True, use_container_width=True)
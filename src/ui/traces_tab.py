@@ -0,0 +1,115 @@
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List
+
+import streamlit as st
+
+from src.db.trace_store import TraceStore
+
+if TYPE_CHECKING:
+    import altair as alt
+    import pandas as pd
+
+
+def _run_label(run: Dict[str, Any]) -> str:
+    started = datetime.fromtimestamp(run["start_ts"]).strftime("%Y-%m-%d %H:%M:%S")
+    seconds = (run["duration_ms"] or 0) / 1000
+    flag = " ⚠️" if run["status"] == "error" else ""
+    return f"{started} · {run['name']} · {seconds:.1f}s{flag}"
+
+
+def _spans_frame(spans: List[Dict[str, Any]]) -> "pd.DataFrame":
+    # pandas / altair are only needed once the tab is rendered
+    import pandas as pd
+
+    df = pd.DataFrame(spans)
+    run_start = df["start_ts"].min()
+    df["start_ms"] = (df["start_ts"] - run_start) * 1000
+    df["end_ms"] = df["start_ms"] + df["duration_ms"].fillna(0)
+    df["backend"] = df["backend"].fillna(df["kind"])
+    # Waterfall rows in start order, labelled uniquely
+    df["label"] = [f"{i:02d} {name}" for i, name in enumerate(df["name"])]
+    return df
+
+
+def _waterfall(df: "pd.DataFrame") -> "alt.Chart":
+    import altair as alt
+
+    return (
+        alt.Chart(df)
+        .mark_bar()
+        .encode(
+            x=alt.X("start_ms:Q", title="ms since run start"),
+            x2="end_ms:Q",
+            y=alt.Y("label:N", sort=None, title=None),
+            color=alt.Color("backend:N", title="backend / kind"),
+            tooltip=[
+                "name",
+                "kind",
+                "backend",
+                alt.Tooltip("duration_ms:Q", format=".1f"),
+                "status",
+                "input_bytes",
+                "output_bytes",
+                "prompt_tokens",
+                "completion_tokens",
+                "error",
+            ],
+        )
+        .properties(height=max(120, 22 * len(df)))
+    )
+
+
+def render_traces_tab(db_path: Path) -> None:
+    """Waterfall of the spans of a recent traced run."""
+    st.subheader("Run traces")
+
+    store = TraceStore(db_path)
+    runs = store.list_runs(limit=50)
+    if not runs:
+        st.info("No traced runs yet. Run the document workflow or ask a question first.")
+        return
+
+    run = st.selectbox("Run", runs, format_func=_run_label)
+    df = _spans_frame(store.get_run(run["run_id"]))
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Wall time", f"{(run['duration_ms'] or 0) / 1000:.2f} s")
+    col2.metric("Prompt tokens", int(run["total_prompt_tokens"] or 0))
+    col3.metric("Completion tokens", int(run["total_completion_tokens"] or 0))
+    if run["error"]:
+        st.error(run["error"])
+
+    st.altair_chart(_waterfall(df), use_container_width=True)
+
+    # Time spent in each backend; only leaf calls, so nested spans are not counted twice
+    leaves = df[df["kind"].isin(["llm", "io"])]
+    if not leaves.empty:
+        st.markdown("#### Time per backend")
+        per_backend = (
+            leaves.groupby("backend")
+            .agg(calls=("name", "count"), total_ms=("duration_ms", "sum"))
+            .sort_values("total_ms", ascending=False)
+        )
+        st.table(per_backend)
+
+    with st.expander("All spans"):
+        st.dataframe(
+            df[
+                [
+                    "span_id",
+                    "parent_id",
+                    "name",
+                    "kind",
+                    "backend",
+                    "start_ms",
+                    "duration_ms",
+                    "status",
+                    "input_bytes",
+                    "output_bytes",
+                    "prompt_tokens",
+                    "completion_tokens",
+                ]
+            ],
+            hide_index=True,
+        )
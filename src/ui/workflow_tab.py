@@ -1,17 +1,38 @@
+import time
 from pathlib import Path
+from typing import Any, Dict
 
 import streamlit as st
-from src.agent.smol_document_agent import SmolDocumentAgent
+from src.agent.registry import DOCUMENT_EXECUTOR, AgentPoolBusy, lease_document_agent
+from src.db.db_client import DBClient
+from src.db.document_store import DocumentStore, is_handle
+from src.db.upload_store import UploadStore
+from src.observability import metrics
 
 
-def save_uploaded_file(uploaded_file, upload_dir: Path) -> Path | None:
+def save_uploaded_file(uploaded_file, store: UploadStore) -> Dict[str, Any] | None:
+    """Store the upload under its SHA-256 and return its metadata row."""
     if uploaded_file is None:
         return None
-    safe_name = uploaded_file.name.replace(" ", "_")
-    file_path = upload_dir / safe_name
-    with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-    return file_path
+    return store.save(uploaded_file.getvalue(), uploaded_file.name)
+
+
+def _document_text(result: Dict[str, Any], db_path: Path) -> str:
+    """Resolve the document handle of a workflow result to its text."""
+    document = result.get("document")
+    if is_handle(document):
+        try:
+            return DocumentStore(db_path).get(document)
+        except KeyError:
+            return ""
+    # Results cached before document handles existed
+    return result.get("raw_text") or ""
+
+
+EXECUTORS = {
+    "agent": "LLM agent",
+    "dag": "Fixed workflow (no LLM)",
+}
 
 
 def render_workflow_tab(data_dir: Path, upload_dir: Path) -> None:
@@ -25,6 +46,22 @@ def render_workflow_tab(data_dir: Path, upload_dir: Path) -> None:
 
     with st.expander("Agent settings", expanded=False):
         st.caption(f"Database path: `{data_dir / 'finance.db'}`")
+        force_rerun = st.checkbox(
+            "Re-run even if this exact document was already processed",
+            value=False,
+        )
+        executor = st.radio(
+            "Run the document with",
+            list(EXECUTORS),
+            index=list(EXECUTORS).index(DOCUMENT_EXECUTOR),
+            format_func=EXECUTORS.get,
+            horizontal=True,
+        )
+        if executor == "dag":
+            st.caption(
+                "The fixed workflow runs the tools as a dependency graph without "
+                "the LLM. It cannot follow instructions: with one, the agent runs."
+            )
 
     user_instruction = st.text_area(
         "Optional instruction to the agent",
@@ -46,21 +83,70 @@ def render_workflow_tab(data_dir: Path, upload_dir: Path) -> None:
         st.warning("Please upload a PDF first.")
         return
 
-    file_path = save_uploaded_file(uploaded_file, upload_dir)
+    store = UploadStore(data_dir / "finance.db", upload_dir)
+    upload = save_uploaded_file(uploaded_file, store)
+    file_path = Path(upload["stored_path"])
     st.info(f"Uploaded file saved to `{file_path}`")
 
-    agent = SmolDocumentAgent()
-    result = agent.run(file_path=file_path, user_instruction=user_instruction)
+    start = time.perf_counter()
+    result = (
+        None
+        if force_rerun
+        else store.get_cached_result(upload["content_hash"], user_instruction)
+    )
+    if result is not None:
+        # Counted like a run, its latency being the cache lookup
+        metrics.record_document("cached", result, time.perf_counter() - start)
+        st.success(
+            "This exact document was already processed with the same instruction "
+            "and its invoice has not changed since, showing the previous result."
+        )
+    else:
+        if executor == "dag" and not user_instruction.strip():
+            # Imports the tools (and smolagents) on first use, like the agent lease
+            from src.agent.document_dag import run_document_dag
+
+            result = run_document_dag(file_path)
+        else:
+            # smolagents and the tools are imported by the first lease
+            try:
+                with lease_document_agent() as agent:
+                    result = agent.run(file_path=file_path, user_instruction=user_instruction)
+            except AgentPoolBusy as e:
+                st.error(str(e))
+                return
+        # Only complete runs are worth reusing
+        if result.get("doc_type") != "error" and not result.get("error"):
+            store.save_result(upload["content_hash"], result, user_instruction)
+
+    raw_text = _document_text(result, data_dir / "finance.db")
 
     st.session_state["doc_context"] = {
-        "raw_text": result.get("raw_text"),
+        "raw_text": raw_text,
         "parsed_invoice": result.get("parsed_invoice"),
         "parsed_ticket": result.get("parsed_ticket"),
     }
 
+    if result.get("error"):
+        st.error(result["error"])
+
     st.markdown("### Detected document type")
     st.write(result.get("doc_type"))
 
+    if result.get("agent_note"):
+        st.caption(f"Agent: {result['agent_note']}")
+
+    if result.get("rereconciled_at"):
+        st.caption(
+            f"Reconciliation refreshed on {result['rereconciled_at']} "
+            "after the stored invoice changed."
+        )
+
+    if result.get("resumed_stages"):
+        st.caption(
+            "Resumed a failed run, reused: " + ", ".join(result["resumed_stages"])
+        )
+
     if result.get("parsed_invoice"):
         st.markdown("### Parsed invoice")
         st.json(result["parsed_invoice"])
@@ -81,6 +167,23 @@ def render_workflow_tab(data_dir: Path, upload_dir: Path) -> None:
         st.markdown("### Reconciliation result")
         st.json(result["reconciliation"])
 
+    reconciliation = result.get("reconciliation")
+    if reconciliation and reconciliation.get("is_match") is None and result.get("parsed_invoice"):
+        # Stored as a new invoice: near-identical IDs may be the same one mistyped
+        invoice_id = result["parsed_invoice"].get("invoice_id") or ""
+        similar = [
+            c for c in DBClient(data_dir / "finance.db").lookup_invoices(invoice_id)
+            if c["invoice_id"] != invoice_id and c["score"] < 1.0
+        ]
+        if similar:
+            st.markdown("### Similar invoice IDs in the DB")
+            st.caption("Not merged automatically; check whether the document mistyped one of them.")
+            st.dataframe(similar, hide_index=True, use_container_width=True)
+
+    if result.get("db_upsert"):
+        st.markdown("### Database update")
+        st.write(result["db_upsert"])
+
     if result.get("ticket"):
         st.markdown("### Created ticket")
         st.json(result["ticket"])
@@ -93,6 +196,11 @@ def render_workflow_tab(data_dir: Path, upload_dir: Path) -> None:
         st.markdown("### Email send status")
         st.write(result["email_status"])
 
+    if result.get("tool_calls"):
+        with st.expander("Tool calls"):
+            st.table(result["tool_calls"])
+            if result.get("run_id"):
+                st.caption(f"Trace: `{result['run_id']}` (see the Traces tab)")
+
     with st.expander("Show raw parsed text (first 1000 chars)"):
-        raw = result.get("raw_text") or ""
-        st.text(raw[:1000])
+        st.text(raw_text[:1000])
@@ -1,9 +1,17 @@
 import streamlit as st
 from pathlib import Path
 
+from src.agent.registry import start_warm_up
+from src.agent.rereconciler import start_rereconciler
+from src.mail.sender import start_outbox_sender
+from src.observability.metrics import start_metrics_server
 from src.ui.header import inject_custom_header
+from src.ui.readiness import render_readiness
 from src.ui.workflow_tab import render_workflow_tab
 from src.ui.chat_tab import render_chat_tab
+from src.ui.traces_tab import render_traces_tab
+from src.ui.reports_tab import render_reports_tab
+from src.ui.metrics_tab import render_metrics_tab
 
 
 PROJECT_ROOT = Path(__file__).resolve().parent
@@ -33,6 +41,19 @@ def main() -> None:
         st.session_state["chat_agent"] = None
         st.session_state["chat_agent_doc_id"] = None
 
+    # Load models / build agents once per process, in the background
+    start_warm_up()
+    render_readiness()
+
+    # Deliver emails queued by the workflow
+    start_outbox_sender(DATA_DIR / "finance.db")
+
+    # Re-check documents / tickets of invoices edited since they were processed
+    start_rereconciler(DATA_DIR / "finance.db")
+
+    # Prometheus scrape endpoint (localhost only)
+    metrics_url = start_metrics_server()
+
     logo_path = STATIC_DIR / "ghost.png"
     inject_custom_header(logo_path, "Invoice & Ticket Reconciliation Agent")
 
@@ -43,8 +64,14 @@ def main() -> None:
         "when inconsistencies are detected."
     )
 
-    doc_tab, query_tab = st.tabs(
-        ["Document workflow", "Ask about invoices/tickets"]
+    doc_tab, query_tab, reports_tab, traces_tab, metrics_tab = st.tabs(
+        [
+            "Document workflow",
+            "Ask about invoices/tickets",
+            "Reports",
+            "Traces",
+            "Metrics (admin)",
+        ]
     )
 
     with doc_tab:
@@ -53,6 +80,15 @@ def main() -> None:
     with query_tab:
         render_chat_tab()
 
+    with reports_tab:
+        render_reports_tab(DATA_DIR / "finance.db")
+
+    with traces_tab:
+        render_traces_tab(DATA_DIR / "finance.db")
+
+    with metrics_tab:
+        render_metrics_tab(metrics_url)
+
 
 if __name__ == "__main__":
     main()